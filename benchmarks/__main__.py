@@ -0,0 +1,61 @@
+# Command line entry point: python -m benchmarks [options]
+#
+# Runs the benchmark suite, prints the results, and compares them against
+# benchmarks/baseline.json. Exits with status 1 if anything regressed: more
+# commands per operation, or a slower p50 relative to the calibration
+# benchmark.
+
+import argparse
+import sys
+
+from benchmarks import suite
+from wdframework import TransportConfig
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="timed calls per benchmark")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds the fake server delays every command")
+    parser.add_argument("--elements", type=int, default=1000,
+                        help="size of the synthetic page")
+    parser.add_argument("--pooled", action="store_true",
+                        help="send commands over the pooled keep-alive "
+                             "transport")
+    parser.add_argument("--baseline", default=suite.BASELINE,
+                        help="baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed growth of a p50 relative to the "
+                             "calibration benchmark, as a fraction")
+    parser.add_argument("--commands-only", action="store_true",
+                        help="only compare command counts")
+    parser.add_argument("--save", action="store_true",
+                        help="store the results as the new baseline instead "
+                             "of comparing")
+    args = parser.parse_args(argv)
+
+    results = suite.run(args.iterations, args.latency, args.elements,
+                        TransportConfig() if args.pooled else None)
+    for result in results:
+        print(result)
+
+    if args.save:
+        suite.save_baseline(results, args.baseline)
+        print("Baseline written to %s" % args.baseline)
+        return 0
+    try:
+        baseline = suite.load_baseline(args.baseline)
+    except FileNotFoundError:
+        print("No baseline at %s; run with --save to create one"
+              % args.baseline)
+        return 0
+    regressions = suite.compare(
+        results, baseline, None if args.commands_only else args.tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
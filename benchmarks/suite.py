@@ -0,0 +1,245 @@
+# Benchmarks of the framework's own overhead, run against FakeWebDriverServer
+# so that no browser or network is involved. Each benchmark reports how many
+# WebDriver commands one operation costs, its throughput, and its p50/p99
+# latency. Results can be compared against a stored baseline. The command
+# counts are deterministic and compared exactly. Absolute latencies depend on
+# the machine and its load, so they are only reported; each benchmark's p50 is
+# also expressed relative to a calibration benchmark (one plain WebDriver
+# command) timed alongside it, and that ratio is compared with a tolerance.
+
+import json
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wdframework import Page, Selector, Session, TransportConfig
+from wdframework.stats import percentile
+from wdframework.testing import FakeWebDriverServer
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+HOST = "http://bench/"
+
+
+def synthetic_page(elements: int = 1000, comments: int = 50) -> str:
+    """
+    Build a page with 'elements' list items spread over nested sections, each
+    with an id, classes and text, plus 'comments' HTML comments.
+
+    :param elements: Number of list items
+    :param comments: Number of comments
+
+    :return: The HTML
+    """
+    parts = ["<html><head><title>Benchmark</title></head><body>"]
+    per_section = 100
+    for i in range(elements):
+        if i % per_section == 0:
+            if i:
+                parts.append("</ul></section>")
+            parts.append('<section class="s%d"><ul>' % (i // per_section))
+        parts.append('<li id="item-%d" class="item %s"><span>Item %d</span>'
+                     '</li>' % (i, "odd" if i % 2 else "even", i))
+        if comments and i % max(1, elements // comments) == 0:
+            parts.append("<!-- comment %d -->" % i)
+    if elements:
+        parts.append("</ul></section>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+class BenchmarkResult:
+    """
+    The measurements of one benchmark.
+    """
+    __slots__ = ("name", "iterations", "commands_per_op", "ops_per_second",
+                 "p50_ms", "p99_ms", "relative")
+
+    def __init__(self, name: str, latencies: List[float], commands: int,
+                 elapsed: float):
+        latencies = sorted(latencies)
+        self.name = name
+        self.iterations = len(latencies)
+        self.commands_per_op = commands / len(latencies)
+        self.ops_per_second = len(latencies) / elapsed if elapsed else 0.0
+        self.p50_ms = percentile(latencies, 0.50) * 1000
+        self.p99_ms = percentile(latencies, 0.99) * 1000
+        # p50 relative to the calibration benchmark of the same run
+        self.relative = None
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return "%-22s %6.1f cmd/op %9.1f op/s  p50 %7.2f ms  p99 %7.2f ms" \
+            "  %5.2fx calibration" % (
+                self.name, self.commands_per_op, self.ops_per_second,
+                self.p50_ms, self.p99_ms, self.relative or 0.0)
+
+
+def measure(name: str, server: FakeWebDriverServer, operation: Callable,
+            iterations: int, warmup: int = 3,
+            calibration: Callable = None) -> BenchmarkResult:
+    """
+    Time 'operation' and count the commands it sends.
+
+    :param name: Name of the benchmark
+    :param server: The server the operation talks to
+    :param operation: Function taking no arguments
+    :param iterations: Number of timed calls
+    :param warmup: Number of untimed calls first
+    :param calibration: Function sending one plain command. If given, it is
+        timed right before every call of 'operation', and the result's
+        'relative' is the ratio of their p50s; interleaving them cancels out
+        the machine getting faster or slower during the run
+
+    :return: The measurements
+    """
+    for _ in range(warmup):
+        operation()
+    server.reset_commands()
+    latencies = []
+    calibrations = []
+    commands = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if calibration is not None:
+            op_start = time.perf_counter()
+            calibration()
+            calibrations.append(time.perf_counter() - op_start)
+        sent = server.get_command_count()
+        op_start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - op_start)
+        commands += server.get_command_count() - sent
+    elapsed = time.perf_counter() - start - sum(calibrations)
+    result = BenchmarkResult(name, latencies, commands, elapsed)
+    if calibrations:
+        result.relative = result.p50_ms / (
+            percentile(sorted(calibrations), 0.50) * 1000)
+    return result
+
+
+def run(iterations: int = 200, latency: float = 0.0, elements: int = 1000,
+        transport: TransportConfig = None) -> List[BenchmarkResult]:
+    """
+    Run every benchmark.
+
+    :param iterations: Timed calls per benchmark
+    :param latency: Seconds the server delays every command by
+    :param elements: Size of the synthetic page
+    :param transport: TransportConfig for the Sessions, if any
+
+    :return: The results, in a fixed order, starting with the calibration
+        benchmark
+    """
+    with FakeWebDriverServer({HOST: synthetic_page(elements)},
+                             latency) as server:
+        def new_session():
+            return Session("chrome", HOST, transport=transport,
+                           remote_url=server.get_url())
+
+        session = new_session()
+        session.start()
+        target = "#item-%d" % (elements // 2)
+        page = Page(session)
+
+        def session_lifecycle():
+            s = new_session()
+            s.start()
+            s.close()
+
+        driver = session.get_driver_env().get_driver()
+
+        def calibration():
+            # The cost of one command without the framework: the HTTP round
+            # trip, Selenium's client and the server
+            return driver.title
+
+        def bench(name, operation, count=iterations, warmup=3):
+            return measure(name, server, operation, count, warmup,
+                           calibration)
+
+        calibrated = measure("calibration", server, calibration, iterations)
+        calibrated.relative = 1.0
+        results = [
+            calibrated,
+            bench("selector_get", lambda: Selector(session, target).get()),
+            bench("selector_get_text",
+                  lambda: Selector(session, target).get_text()),
+            bench("wait_until", lambda: Selector(session, target).wait_until(
+                lambda e: e.is_displayed())),
+            bench("wait_for",
+                  lambda: Selector(session, target).wait_for("visible")),
+            bench("page_get_comments", page.get_comments),
+            # Fewer iterations; each one launches a (fake) browser
+            bench("session_lifecycle", session_lifecycle,
+                  max(1, iterations // 10), warmup=1),
+        ]
+        session.close()
+    return results
+
+
+def load_baseline(path: str = BASELINE) -> dict:
+    """
+    :param path: Path of a baseline written by save_baseline()
+
+    :return: Dict of benchmark name -> result dict
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results: List[BenchmarkResult], path: str = BASELINE):
+    """
+    Store results as the baseline to compare later runs against.
+
+    :param results: The results to store
+    :param path: Path of the file to write
+    """
+    with open(path, "w") as f:
+        json.dump({r.name: r.to_dict() for r in results}, f, indent=2,
+                  sort_keys=True)
+        f.write("\n")
+
+
+def compare(results: List[BenchmarkResult], baseline: dict,
+            tolerance: float = None) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    A benchmark regressed if it sends more commands per operation than the
+    baseline. With a 'tolerance', it also regressed if its p50 relative to
+    the calibration benchmark is more than 'tolerance' (a fraction) higher
+    than in the baseline. Absolute latencies are never compared; they vary
+    too much between machines and runs.
+
+    :param results: The results of this run
+    :param baseline: A baseline from load_baseline()
+    :param tolerance: Allowed increase of the relative p50, or 'None' to
+        only compare command counts
+
+    :return: A description of every regression; empty if there are none
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        if result.commands_per_op > base["commands_per_op"]:
+            regressions.append(
+                "%s: %.1f commands per operation, baseline %.1f"
+                % (result.name, result.commands_per_op,
+                   base["commands_per_op"]))
+        if tolerance is None or result.relative is None or \
+                not base.get("relative"):
+            continue
+        if result.relative > base["relative"] * (1 + tolerance):
+            regressions.append(
+                "%s: p50 %.2fx calibration, baseline %.2fx (+%d%%)"
+                % (result.name, result.relative, base["relative"],
+                   (result.relative / base["relative"] - 1) * 100))
+    return regressions
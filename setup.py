@@ -3,4 +3,5 @@ from distutils.core import setup
 setup(name='PyWebDriverFramework',
       version='0.0.1',
       description='Selenium WebDriver wrapper framework',
-      packages=['wdframework', 'wdframework.loadables'])
+      packages=['wdframework', 'wdframework.aio', 'wdframework.loadables',
+                'wdframework.testing'])
@@ -0,0 +1,104 @@
+# Minimal stand-ins for WebDriver objects so framework logic can be tested
+# without launching a browser. Only what the framework tests need is modelled.
+
+from selenium.common.exceptions import WebDriverException
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver.commands.append(("switch_to_window", handle))
+        self._driver.current_window_handle_value = handle
+
+
+class FakeDriver:
+    def __init__(self):
+        self.commands = []
+        self.window_handles_value = ["main"]
+        self.current_window_handle_value = "main"
+        self.current_url = "about:blank"
+        self.quit_called = False
+        self.healthy = True
+        self.switch_to = FakeSwitchTo(self)
+        self.script_results = []
+        self.async_script_results = []
+        self.async_supported = True
+
+    def _command(self, *command):
+        if not self.healthy:
+            raise WebDriverException("session deleted because of page crash")
+        self.commands.append(command)
+
+    @property
+    def current_window_handle(self):
+        self._command("get_current_window_handle")
+        return self.current_window_handle_value
+
+    @property
+    def window_handles(self):
+        self._command("get_window_handles")
+        return list(self.window_handles_value)
+
+    def close(self):
+        self._command("close", self.current_window_handle_value)
+        self.window_handles_value.remove(self.current_window_handle_value)
+
+    def delete_all_cookies(self):
+        self._command("delete_all_cookies")
+
+    def execute_script(self, script, *args):
+        self._command("execute_script", script, args)
+        return self.script_results.pop(0) if self.script_results else None
+
+    def execute_async_script(self, script, *args):
+        self._command("execute_async_script", script, args)
+        if not self.async_supported:
+            raise WebDriverException("unknown command: execute/async")
+        result = self.async_script_results.pop(0) \
+            if self.async_script_results else None
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def set_script_timeout(self, seconds):
+        self._command("set_script_timeout", seconds)
+
+    def find_element(self, by, value):
+        # Tests stub the find_element_by_* helper for the strategy they use
+        return getattr(self, "find_element_by_" + by.replace(" ", "_"))(value)
+
+    def find_elements(self, by, value):
+        return getattr(self, "find_elements_by_" + by.replace(" ", "_"))(value)
+
+    def get_screenshot_as_base64(self):
+        self._command("get_screenshot")
+        return "iVBORw0KGgo="
+
+    @property
+    def page_source(self):
+        self._command("get_page_source")
+        return "<html><body>%s</body></html>" % self.current_url
+
+    def get_log(self, log_type):
+        self._command("get_log", log_type)
+        return [{"level": "SEVERE", "message": "error on " + self.current_url}]
+
+    def get(self, url):
+        self._command("get", url)
+        self.current_url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+def fake_session(driver=None, host="http://localhost/"):
+    """
+    Build a Session whose browser is a FakeDriver (or 'driver', if given).
+    """
+    import wdframework
+
+    driver = driver or FakeDriver()
+    pool = wdframework.DriverPool(launcher=lambda b, c: driver)
+    return wdframework.Session("chrome", host, pool), driver
@@ -0,0 +1,162 @@
+import os
+import sys
+
+import pytest
+from selenium.common.exceptions import MoveTargetOutOfBoundsException, \
+    NoSuchElementException
+from selenium.webdriver.common.keys import Keys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import ActionBatch, Selector, Session, Tracer
+from wdframework.testing import FakeWebDriverServer, webdriver_server
+
+FIELDS = 10
+
+PAGE = ('<html><body><form id="form">%s'
+        '<input type="checkbox" id="agree">'
+        '<select id="country"><option>NL</option></select>'
+        '<button id="go" type="submit">Go</button></form>'
+        '<input type="checkbox" id="hidden" hidden></body></html>'
+        % "".join('<input type="text" id="f%d" value="old">' % i
+                  for i in range(FIELDS)))
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        yield server
+
+
+@pytest.fixture
+def session(server):
+    session = Session("chrome", "http://app/", remote_url=server.get_url())
+    session.start()
+    yield session
+    session.close()
+
+
+def value(session, locator):
+    return Selector(session, locator).get().get_property("value")
+
+
+def test_fill_is_one_command(server, session):
+    batch = Selector.batch(session)
+    batch.fill([(Selector(session, "#f%d" % i), "v%d" % i)
+                for i in range(FIELDS)])
+    batch.click(Selector(session, "#agree"))
+    assert len(batch) == 2 * FIELDS + 1
+
+    server.reset_commands()
+    stats = batch.flush()
+    assert server.get_command_count() == 1
+    assert stats == {"actions": 2 * FIELDS + 1, "commands": 1,
+                     "fallbacks": 0, "commands_saved": 4 * FIELDS + 1}
+    assert len(batch) == 0
+    assert [value(session, "#f%d" % i) for i in range(FIELDS)] == \
+        ["v%d" % i for i in range(FIELDS)]
+    assert Selector(session, "#agree").is_selected()
+
+
+def test_actions_the_script_cant_perform_fall_back(server, session):
+    batch = ActionBatch(session)
+    batch.send_keys(Selector(session, "#f0"), "a" + Keys.ENTER) \
+        .send_keys(Selector(session, "#f1"), "b") \
+        .click(Selector(session, "#hidden"))
+    server.reset_commands()
+    stats = batch.flush()
+    assert stats["fallbacks"] == 2
+    # Script, fallback, script, fallback
+    assert stats["commands"] == server.get_command_count() == 6
+    assert value(session, "#f0") == "olda" + Keys.ENTER
+    assert value(session, "#f1") == "oldb"
+    assert Selector(session, "#hidden").is_selected()
+
+
+def test_missing_element(session):
+    batch = ActionBatch(session)
+    batch.clear(Selector(session, "#f0")).clear(Selector(session, "#nope")) \
+        .clear(Selector(session, "#f1"))
+    with pytest.raises(NoSuchElementException):
+        batch.flush()
+    # Actions before the missing element were performed, the rest weren't
+    assert value(session, "#f0") == ""
+    assert value(session, "#f1") == "old"
+    assert batch.get_stats()["flushes"] == 1
+
+
+def test_selectors_must_share_the_session(server, session):
+    other = Session("chrome", "http://app/", remote_url=server.get_url())
+    with pytest.raises(ValueError):
+        ActionBatch(session).click(Selector(other, "#go"))
+
+
+def test_trusted_input(server):
+    tracer = Tracer()
+    session = Session("chrome", "http://app/", remote_url=server.get_url(),
+                      tracer=tracer)
+    session.start()
+    batch = ActionBatch(session, trusted_input=True)
+    batch.clear(Selector(session, "#f0")) \
+        .send_keys(Selector(session, "#f0"), "ab") \
+        .send_keys(Selector(session, "#f1"), "c") \
+        .click(Selector(session, "#agree"))
+    server.reset_commands()
+    stats = batch.flush()
+    # One script for the clear, one to locate the elements, one for actions
+    assert stats["commands"] == server.get_command_count() == 3
+    assert server.get_commands()[-1][1].endswith("/actions")
+    assert value(session, "#f0") == "ab"
+    assert value(session, "#f1") == "oldc"
+    assert Selector(session, "#agree").is_selected()
+    assert "actions" in [r.name for r in tracer.get_records()]
+    session.close()
+
+
+def _replace_actions_route(monkeypatch, handler):
+    routes = [(method, pattern, handler if method == "POST" and
+               pattern.pattern.endswith("/actions$") else route)
+              for method, pattern, route in webdriver_server._ROUTES]
+    monkeypatch.setattr(webdriver_server, "_ROUTES",
+                        [r for r in routes if r[2] is not None])
+
+
+def _trusted_batch(session):
+    return ActionBatch(session, trusted_input=True) \
+        .send_keys(Selector(session, "#f0"), "ab") \
+        .click(Selector(session, "#agree"))
+
+
+def test_trusted_input_falls_back_without_actions_endpoint(
+        monkeypatch, session):
+    _replace_actions_route(monkeypatch, None)
+    stats = _trusted_batch(session).flush()
+    assert stats["fallbacks"] == 2
+    assert value(session, "#f0") == "oldab"
+    assert Selector(session, "#agree").is_selected()
+
+
+def test_trusted_input_failing_partway_isnt_repeated(monkeypatch, session):
+    def fail_after_typing(server, session, body):
+        webdriver_server._perform_actions(server, session, body)
+        raise webdriver_server.WebDriverError(
+            "move target out of bounds", "Target is out of bounds")
+    _replace_actions_route(monkeypatch, fail_after_typing)
+    batch = _trusted_batch(session)
+    with pytest.raises(MoveTargetOutOfBoundsException):
+        batch.flush()
+    assert value(session, "#f0") == "oldab"
+    assert batch.get_stats()["fallbacks"] == 0
+
+
+def test_context_manager(session):
+    with ActionBatch(session) as batch:
+        batch.clear(Selector(session, "#f0"))
+    assert value(session, "#f0") == ""
+
+    with pytest.raises(RuntimeError):
+        with ActionBatch(session) as batch:
+            batch.clear(Selector(session, "#f1"))
+            raise RuntimeError()
+    assert value(session, "#f1") == "old"
+    assert batch.get_stats()["flushes"] == 0
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework.aio import AsyncDriverEnvironment, AsyncSelector, \
+    AsyncSession, HttpClient
+from wdframework.exceptions import TimeoutException
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = ('<html><head><title>Search</title></head><body>'
+        '<input name="q" value=""><a href="/results">Search</a>'
+        '<p id="hidden" style="display: none">x</p></body></html>')
+
+
+def _run(coroutine):
+    # asyncio.run() needs Python 3.7
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE,
+                              "http://app/results": "<title>Results</title>"}
+                             ) as server:
+        yield server
+
+
+def test_selector_round_trip(server):
+    async def run():
+        async with AsyncSession("chrome", "http://app/",
+                                server.get_url()) as session:
+            search = AsyncSelector(session, "q", "name")
+            await search.send_keys("cats")
+            assert await search.get_attribute("value") == "cats"
+            assert await search.get_text() == "cats"
+            assert await search.is_displayed()
+            assert not await AsyncSelector(session, "#hidden").is_displayed()
+            with pytest.raises(NoSuchElementException):
+                await AsyncSelector(session, "#missing").get()
+            await AsyncSelector(session, "Search", "link_text").click()
+            assert await session.get_driver_env().get_title() == "Results"
+    _run(run())
+    assert server.get_session_count() == 0
+
+
+def test_wait_until_times_out(server):
+    async def run():
+        async with AsyncSession("chrome", "http://app/",
+                                server.get_url()) as session:
+            with pytest.raises(TimeoutException):
+                await AsyncSelector(session, "#missing").wait_until(
+                    AsyncSelector.is_displayed, timeout=0.05)
+    _run(run())
+
+
+def test_sessions_run_concurrently_on_one_loop(server):
+    server.set_latency(0.05)
+    sessions = 8
+
+    async def one(client):
+        async with AsyncSession("chrome", "http://app/", server.get_url(),
+                                client=client) as session:
+            for _ in range(3):
+                await AsyncSelector(session, "q", "name").get()
+
+    async def run():
+        client = HttpClient(pool_size=sessions)
+        await asyncio.gather(*[one(client) for _ in range(sessions)])
+        await client.close()
+
+    _run(run())
+    # Run serially, the server would never see two commands at once
+    assert server.get_max_in_flight() >= sessions // 2
+
+
+def test_concurrent_first_commands_share_one_session(server):
+    server.set_latency(0.02)
+
+    async def run():
+        env = AsyncDriverEnvironment(server.get_url())
+        await asyncio.gather(env.get_title(), env.get_current_url(),
+                             env.get_title())
+        assert server.get_session_count() == 1
+        await env.close()
+    _run(run())
+    assert [c for c in server.get_commands()
+            if c == ("POST", "/session")] == [("POST", "/session")]
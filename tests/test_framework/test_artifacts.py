@@ -0,0 +1,170 @@
+import gzip
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import wdframework
+import wdframework.artifacts
+from wdframework import ArtifactCollector, Session
+from wdframework.artifacts import optimize_png
+from wdframework.exceptions import ArtifactException, SessionException
+from wdframework.testing import FakeWebDriverServer
+from fake_driver import FakeDriver
+
+PAGE = '<html><body><h1 id="title">Checkout</h1></body></html>'
+
+
+def _png(pixels: bytes, level: int, parts: int = 1) -> bytes:
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + \
+            struct.pack(">I", zlib.crc32(kind + data))
+    data = zlib.compress(pixels, level)
+    size = len(data) // parts + 1
+    return b"\x89PNG\r\n\x1a\n" + \
+        chunk(b"IHDR", struct.pack(">IIBBBBB", 64, 64, 8, 2, 0, 0, 0)) + \
+        b"".join(chunk(b"IDAT", data[i:i + size])
+                 for i in range(0, len(data), size)) + \
+        chunk(b"IEND", b"")
+
+
+def _idat(png: bytes) -> bytes:
+    offset, image = 8, []
+    while offset < len(png):
+        length, kind = struct.unpack(">I4s", png[offset:offset + 8])
+        if kind == b"IDAT":
+            image.append(png[offset + 8:offset + 8 + length])
+        offset += 12 + length
+    return zlib.decompress(b"".join(image))
+
+
+def test_optimize_png_is_lossless():
+    pixels = b"".join(b"\x00" + bytes([i % 7, 255, 0]) * 64 for i in range(64))
+    png = _png(pixels, 0, parts=3)
+    optimized = optimize_png(png)
+    assert len(optimized) < len(png)
+    assert _idat(optimized) == pixels
+    assert optimized.count(b"IDAT") == 1
+    assert optimize_png(b"not a png") == b"not a png"
+    assert optimize_png(optimized) == optimized
+
+
+def test_session_captures_in_the_background(tmp_path):
+    collector = ArtifactCollector(str(tmp_path))
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        session = Session("chrome", "http://app/",
+                          remote_url=server.get_url(), artifacts=collector)
+        session.start()
+        paths = session.capture_artifacts("tests/checkout::test pay")
+        session.close()
+    assert collector.flush(5)
+    names = sorted(os.path.basename(path) for path in paths)
+    assert names == ["tests_checkout_test_pay.browser.log.json.gz",
+                     "tests_checkout_test_pay.html.gz",
+                     "tests_checkout_test_pay.png"]
+    with gzip.open(str(tmp_path / "tests_checkout_test_pay.html.gz")) as f:
+        assert b"Checkout" in f.read()
+    with open(str(tmp_path / "tests_checkout_test_pay.png"), "rb") as f:
+        assert f.read().startswith(b"\x89PNG")
+    stats = collector.get_stats()
+    assert stats["captures"] == 1 and stats["files"] == 3
+    assert stats["pending"] == 0 and stats["failures"] == 0
+    collector.close()
+    with pytest.raises(ArtifactException):
+        collector.capture(None, "late")
+
+
+def test_repeated_names_are_numbered(tmp_path):
+    collector = ArtifactCollector(str(tmp_path))
+    env = wdframework.DriverEnvironment(
+        "chrome", wdframework.DriverPool(launcher=lambda b, c: FakeDriver()))
+    first = collector.capture(env, "flaky", source=False, logs=())
+    second = collector.capture(env, "flaky", source=False, logs=())
+    collector.close()
+    assert [os.path.basename(p) for p in first + second] == \
+        ["flaky.png", "flaky-2.png"]
+    assert all(os.path.exists(p) for p in first + second)
+
+
+def test_capture_racing_close(tmp_path):
+    collector = ArtifactCollector(str(tmp_path))
+
+    class ClosingDriver(FakeDriver):
+        def get_screenshot_as_base64(self):
+            # The collector is closed while the screenshot is fetched
+            collector.close()
+            return super().get_screenshot_as_base64()
+    pool = wdframework.DriverPool(launcher=lambda b, c: ClosingDriver())
+    env = wdframework.DriverEnvironment("chrome", pool)
+    with pytest.raises(ArtifactException):
+        collector.capture(env, "late", source=False, logs=())
+    assert collector.get_stats()["pending"] == 0
+
+
+def test_capture_doesnt_wait_for_writes_and_memory_is_bounded(
+        tmp_path, monkeypatch):
+    release = threading.Event()
+    original = wdframework.artifacts.optimize_png
+
+    def slow_optimize(data):
+        release.wait(5)
+        return original(data)
+    monkeypatch.setattr(wdframework.artifacts, "optimize_png", slow_optimize)
+
+    # Room for one screenshot only
+    collector = ArtifactCollector(str(tmp_path), workers=1, max_pending=8)
+    env = wdframework.DriverEnvironment(
+        "chrome", wdframework.DriverPool(launcher=lambda b, c: FakeDriver()))
+    first = collector.capture(env, "first", source=False, logs=())
+    assert not os.path.exists(first[0])
+    assert collector.get_stats()["pending"] == 8
+
+    second = threading.Thread(
+        target=collector.capture, args=(env, "second"),
+        kwargs={"source": False, "logs": ()})
+    second.start()
+    second.join(0.2)
+    assert second.is_alive()
+    release.set()
+    second.join(5)
+    collector.close()
+    assert os.path.exists(str(tmp_path / "second.png"))
+    assert collector.get_stats()["files"] == 2
+
+
+def test_session_without_collector():
+    session = Session("chrome", "http://app/")
+    with pytest.raises(SessionException):
+        session.capture_artifacts("test")
+
+
+def failing_test(session):
+    session.get_driver_env().go_to_url("http://app/cart")
+    assert False
+
+
+def passing_test(session):
+    pass
+
+
+def launch_fake_driver(browser_string, capabilities):
+    return FakeDriver()
+
+
+def test_runner_captures_failed_tests(tmp_path):
+    runner = wdframework.ParallelRunner(
+        "chrome", "http://app/", workers=2, launcher=launch_fake_driver,
+        artifacts=ArtifactCollector(str(tmp_path)))
+    report = runner.run([failing_test, passing_test])
+    assert [r.passed for r in report.get_results()] == [False, True]
+    name = "test_artifacts.failing_test"
+    assert sorted(os.listdir(str(tmp_path))) == [
+        name + ".browser.log.json.gz", name + ".html.gz", name + ".png"]
+    with gzip.open(str(tmp_path / (name + ".browser.log.json.gz"))) as f:
+        assert json.load(f)[0]["message"] == "error on http://app/cart"
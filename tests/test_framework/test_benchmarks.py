@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from benchmarks import suite
+from wdframework.dom import parse_html
+
+
+def test_synthetic_page():
+    root = parse_html(suite.synthetic_page(250, 10))
+    assert len(root.select("li.item")) == 250
+    assert len(root.select("section")) == 3
+    assert root.select_one("#item-249").text_content() == "Item 249"
+    assert len(list(root.iter_comments())) == 10
+
+
+def test_command_counts_match_baseline():
+    results = suite.run(iterations=3, elements=100)
+    baseline = suite.load_baseline()
+    assert sorted(r.name for r in results) == sorted(baseline)
+    # Latency depends on the machine; only command counts are checked here
+    assert suite.compare(results, baseline) == []
+    assert results[0].name == "calibration" and results[0].relative == 1.0
+    for result in results:
+        assert result.iterations >= 1 and result.p50_ms <= result.p99_ms
+        assert result.relative > 0
+
+
+def test_compare_reports_regressions():
+    result = suite.BenchmarkResult("get", [0.002] * 10, 20, 0.02)
+    result.relative = 2.0
+    baseline = {"get": {"commands_per_op": 1.0, "p50_ms": 1.0,
+                        "relative": 1.0}}
+    assert len(suite.compare([result], baseline)) == 1
+    assert len(suite.compare([result], baseline, tolerance=0.5)) == 2
+    # Absolute latency alone is never a regression
+    assert suite.compare([result], {"get": {"commands_per_op": 2.0,
+                                            "p50_ms": 1.0,
+                                            "relative": 2.0}},
+                         tolerance=0.5) == []
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import Page, Selector, Session
+from wdframework.loadables.component import Component
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = ('<html><body><ul id="rows">%s</ul><span class="name">page</span>'
+        '</body></html>' % "".join(
+            '<li id="row-%d"><span class="name">row %d</span>'
+            '<a href="/r%d">open</a></li>' % (i, i, i) for i in range(3)))
+
+
+class Row(Component):
+    def __init__(self, owner, index):
+        super().__init__(owner, Selector(owner.get_session(),
+                                         "#row-%d" % index))
+        self.name = self.find(".name")
+        self.link = self.find("open", by="link_text")
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE,
+                              "http://app/r1": PAGE}) as server:
+        yield server
+
+
+@pytest.fixture
+def session(server):
+    session = Session("chrome", "http://app/", remote_url=server.get_url())
+    session.start()
+    yield session
+    session.close()
+
+
+def finds(server):
+    return len([path for _, path in server.get_commands()
+                if path.endswith(("/element", "/elements"))])
+
+
+def test_children_are_found_inside_the_container(server, session):
+    row = Row(Page(session), 1)
+    server.reset_commands()
+    assert row.name.get_text() == "row 1"
+    # The container, then the child inside of it
+    assert finds(server) == 2
+    assert row.link.get_attribute("href") == "/r1"
+    assert row.name.get_text() == "row 1"
+    # The container is located once
+    assert finds(server) == 4
+
+
+def test_container_is_located_again_after_navigation(server, session):
+    row = Row(Page(session), 1)
+    row.name.get_text()
+    session.get_driver_env().go_to_url("http://app/r1")
+    server.reset_commands()
+    assert row.name.get_text() == "row 1"
+    assert finds(server) == 2
+
+
+def test_stale_container_is_located_again(server, session):
+    row = Row(Page(session), 2)
+    row.name.get_text()
+    # Re-rendered behind the DriverEnvironment's back
+    session.get_driver_env().get_driver().get("http://app/")
+    assert row.name.get_text() == "row 2"
+    assert session.get_element_cache_stats().get_stats()["stale"] == 1
+
+
+def test_scripts_use_the_combined_locator(session):
+    row = Row(Page(session), 0)
+    assert row.name.get_query().locator == "#row-0 .name"
+    assert row.name.wait_for("visible") is row.name
+    assert row.name.snapshot(["text"]).text == "row 0"
+    # Link text can't be combined with CSS into one query
+    assert row.link.get_text() == "open"
+    with pytest.raises(ValueError):
+        row.link.wait_for("visible")
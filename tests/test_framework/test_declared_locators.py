@@ -0,0 +1,101 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import Locator, Page, Selector, Session
+from wdframework.loadables.component import Component
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = ('<html><body><form id="search"><input name="q">'
+        '<button hidden>Go</button></form>'
+        '<div id="results"><p class="hit">one</p></div></body></html>')
+
+
+class SearchForm(Component):
+    __slots__ = ()
+
+    query = Locator("input[name=q]")
+    submit = Locator("button")
+    field = Locator(".//input", by="xpath")
+
+
+class SearchPage(Page):
+    __slots__ = ()
+
+    search = Locator("input[name=q]")
+    button = Locator("button")
+    results = Locator("//div[@id='results']", by="xpath")
+
+
+class ResultsPage(SearchPage):
+    __slots__ = ()
+
+    hit = Locator("hit", by="class_name")
+    button = None
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        yield server
+
+
+@pytest.fixture
+def session(server):
+    session = Session("chrome", "http://app/", remote_url=server.get_url())
+    session.start()
+    yield session
+    session.close()
+
+
+def test_selectors_are_created_lazily_and_memoized(server, session):
+    server.reset_commands()
+    page = SearchPage(session)
+    assert page._selectors == {}
+    assert page.search is page.search
+    assert isinstance(page.search, Selector)
+    assert page.search.get_owner() is page
+    assert list(page._selectors) == ["search"]
+    assert server.get_command_count() == 0
+    assert page.results.get_tag_name() == "div"
+
+
+def test_instances_are_compact(session):
+    page = SearchPage(session)
+    assert not hasattr(page, "__dict__")
+    with pytest.raises(AttributeError):
+        page.search = Selector(session, "#other")
+
+
+def test_registry_includes_inherited_locators():
+    assert list(SearchPage.get_declared_locators()) == [
+        "search", "button", "results"]
+    assert list(ResultsPage.get_declared_locators()) == [
+        "search", "results", "hit"]
+    assert isinstance(SearchPage.search, Locator)
+
+
+def test_check_states_is_one_script(server, session):
+    page = ResultsPage(session)
+    server.reset_commands()
+    assert page.check_states() == {"search": True, "results": True,
+                                   "hit": True}
+    assert server.get_command_count() == 1
+    assert SearchPage(session).check_states("visible", ["button"]) == {
+        "button": False}
+    with pytest.raises(ValueError):
+        page.check_states("shown")
+
+
+def test_component_locators_are_scoped(session):
+    form = SearchForm(SearchPage(session), Selector(session, "#search"))
+    assert form.query.get_container() is not None
+    assert form.query.get_query().locator == "#search input[name=q]"
+    assert form.check_states("hidden", ["submit"]) == {"submit": True}
+    # Found inside the container, but not with a script
+    assert form.field.get_attribute("name") == "q"
+    with pytest.raises(ValueError):
+        form.check_states()
@@ -0,0 +1,130 @@
+import os
+import sys
+
+import pytest
+from selenium.common.exceptions import InvalidSelectorException, \
+    NoSuchElementException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import Page, Selector, Session
+from wdframework.dom import parse_html
+from wdframework.dom_snapshot import DomSnapshot
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = ('<html><body><h1 id="title">Orders</h1>'
+        '<table id="orders"><tr class="order paid"><td>1</td><td>$5</td></tr>'
+        '<tr class="order"><td>2</td><td>$7</td></tr>'
+        '<tr class="order paid" hidden><td>3</td><td>$9</td></tr></table>'
+        '<input name="q" value="cats" disabled>'
+        '<a href="/next">  Next   page </a></body></html>')
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        yield server
+
+
+@pytest.fixture
+def session(server):
+    session = Session("chrome", "http://app/", remote_url=server.get_url())
+    session.start()
+    yield session
+    session.close()
+
+
+def test_selectors_against_page_snapshot(server, session):
+    server.reset_commands()
+    snapshot = Page(session).snapshot()
+    assert server.get_command_count() == 1
+
+    title = Selector(session, "#title")
+    assert snapshot.query(title).get_text() == title.get_text() == "Orders"
+    server.reset_commands()
+    rows = snapshot.query(Selector(session, "tr.paid")).get_multiple()
+    assert [r.text_content() for r in rows] == ["1$5", "3$9"]
+    assert snapshot.query(Selector(session, "//tr[2]/td[2]", "xpath")) \
+        .get_text() == "$7"
+    search = snapshot.query(Selector(session, "q", "name"))
+    assert search.get_text() == "cats" and not search.is_enabled()
+    assert snapshot.query(Selector(session, "Next page", "link_text")) \
+        .get_attribute("href") == "/next"
+    assert not snapshot.query(Selector(session, "tr.order:last-child")) \
+        .is_displayed()
+    assert not snapshot.query(Selector(session, "#missing")).is_present()
+    # None of that went to the browser
+    assert server.get_command_count() == 0
+
+
+def test_container_snapshot(session):
+    snapshot = Page(session).snapshot(Selector(session, "#orders"))
+    assert [e.tag for e in snapshot.get_root().element_children()] == [
+        "table"]
+    assert len(snapshot.find("class_name", "order")) == 3
+    assert snapshot.find("id", "title") == []
+    with pytest.raises(NoSuchElementException):
+        Page(session).snapshot(Selector(session, "#missing"))
+
+
+def test_missing_element_raises(session):
+    snapshot = Page(session).snapshot()
+    with pytest.raises(NoSuchElementException):
+        snapshot.query(Selector(session, ".nope")).get_text()
+    with pytest.raises(InvalidSelectorException):
+        snapshot.find("css_selector", "tr::before")
+    with pytest.raises(InvalidSelectorException):
+        snapshot.find("xpath", "count(//tr)")
+
+
+@pytest.mark.parametrize("css", [
+    "#orders tr.paid", "table > tr.order", "tr.order.paid", "tr.order td",
+    ".order:first-child", "tr:not(.paid)", "[hidden]", "td", "#title, #q"])
+def test_indexed_css_matches_full_scan(css):
+    snapshot = DomSnapshot(PAGE)
+    expected = parse_html(PAGE).select(css)
+    found = snapshot.find("css_selector", css)
+    assert [e.outer_html() for e in found] == \
+        [e.outer_html() for e in expected]
+
+
+def test_universal_selector():
+    snapshot = DomSnapshot('<div id="a"><p>One</p><ul><li>Two</li></ul>'
+                           '</div>')
+    assert [e.tag for e in snapshot.find("css_selector", "*")] == [
+        "div", "p", "ul", "li"]
+    assert [e.tag for e in snapshot.find("css_selector", "div *")] == [
+        "p", "ul", "li"]
+    assert [e.tag for e in snapshot.find("css_selector", "#a > *")] == [
+        "p", "ul"]
+    assert [e.tag for e in snapshot.find("css_selector", "* > li")] == ["li"]
+
+
+@pytest.mark.parametrize("by,locator", [
+    ("css_selector", "tr:nth-of-type(1)"), ("css_selector", ":checked"),
+    ("css_selector", "tr:nth-child(odd)"), ("xpath", "(//tr)[1]"),
+    ("xpath", "//tr/following-sibling::tr"),
+    ("xpath", "//tr[position()>1]")])
+def test_unsupported_locators_raise(by, locator):
+    with pytest.raises(InvalidSelectorException):
+        DomSnapshot(PAGE).find(by, locator)
+
+
+@pytest.mark.parametrize("xpath,expected", [
+    ("//td", ["1", "$5", "2", "$7", "3", "$9"]),
+    ("//tr/td[1]", ["1", "2", "3"]),
+    ("//tr[last()]/td", ["3", "$9"]),
+    ("/html/body/h1", ["Orders"]),
+    ("//tr[@class='order']/td[2]", ["$7"]),
+    ("//tr[contains(@class, 'paid') and not(@hidden)]/td[1]", ["1"]),
+    ("//td[text()='$9']/..//td[1]", ["3"]),
+    ("//a[normalize-space(.)='Next page']", ["  Next   page "]),
+    ("//*[@id='orders']/*[2]/td[starts-with(., '$')]", ["$7"]),
+])
+def test_xpath(xpath, expected):
+    found = parse_html(PAGE).xpath(xpath)
+    assert [e.text_content() for e in found] == expected
+
+
+def test_fake_server_supports_xpath(session):
+    assert Selector(session, "//tr[2]/td[1]", "xpath").get_text() == "2"
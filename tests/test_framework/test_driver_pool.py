@@ -0,0 +1,71 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import wdframework
+from fake_driver import FakeDriver
+
+
+def _pool(**kwargs):
+    launched = []
+
+    def launcher(browser_string, capabilities):
+        driver = FakeDriver()
+        launched.append(driver)
+        return driver
+    return wdframework.DriverPool(launcher=launcher, **kwargs), launched
+
+
+def test_released_driver_is_reused_and_reset():
+    pool, launched = _pool()
+    env = wdframework.DriverEnvironment("chrome", pool)
+    driver = env.get_driver()
+    driver.window_handles_value.append("popup")
+    env.close()
+
+    assert not driver.quit_called
+    assert ("close", "popup") in driver.commands
+    assert ("delete_all_cookies",) in driver.commands
+    assert driver.current_url == "about:blank"
+
+    second = wdframework.DriverEnvironment("CHROME", pool)
+    assert second.get_driver() is driver
+    stats = pool.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["launches"] == 1
+
+
+def test_drivers_are_keyed_by_browser_and_capabilities():
+    pool, launched = _pool()
+    pool.prelaunch("chrome")
+    assert pool.acquire("firefox") is not launched[0]
+    assert pool.acquire("chrome", {"headless": True}) is not launched[0]
+    assert pool.acquire("chrome") is launched[0]
+
+
+def test_retired_after_max_uses():
+    pool, launched = _pool(max_uses=2)
+    for _ in range(3):
+        pool.release(pool.acquire("chrome"))
+    assert len(launched) == 2
+    assert launched[0].quit_called
+    assert pool.get_stats()["retired"] == 1
+
+
+def test_unhealthy_driver_is_replaced():
+    pool, launched = _pool()
+    pool.prelaunch("chrome")
+    launched[0].healthy = False
+    driver = pool.acquire("chrome")
+    assert driver is launched[1]
+    assert launched[0].quit_called
+    assert pool.get_stats()["unhealthy"] == 1
+
+
+def test_close_quits_idle_drivers():
+    pool, launched = _pool()
+    pool.prelaunch("chrome", 2)
+    pool.close()
+    assert all(driver.quit_called for driver in launched)
@@ -0,0 +1,83 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+from selenium import webdriver
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import DriverPool, Selector, Session
+from wdframework.exceptions import DriverEnvironmentException
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = '<html><body><h1 id="title">Home</h1></body></html>'
+BOOT = 0.3
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        yield server
+
+
+def _slow_pool(server, launched):
+    def launcher(browser_string, capabilities):
+        launched.append(threading.current_thread().name)
+        time.sleep(BOOT)
+        return webdriver.Remote(server.get_url(), {"browserName": "chrome"})
+    return DriverPool(launcher=launcher)
+
+
+def test_launch_overlaps_with_setup(server):
+    launched = []
+    pool = _slow_pool(server, launched)
+    session = Session("chrome", "http://app/", pool, eager=True)
+    # Setup that doesn't need the browser runs while it boots
+    session.get_store().put("account", "alice")
+    time.sleep(BOOT / 2)
+    session.start()
+    assert Selector(session, "#title").get().text == "Home"
+    stats = session.get_launch_stats().get_stats()
+    session.close()
+    pool.close()
+
+    assert launched and launched[0] != threading.current_thread().name
+    assert stats["background"] and stats["launched"]
+    assert stats["launch_time"] >= BOOT
+    assert stats["overlap"] >= BOOT / 2
+    assert stats["waited"] < BOOT
+    assert stats["overlap"] + stats["waited"] >= BOOT
+
+
+def test_lazy_launch_waits_for_everything(server):
+    session = Session("chrome", "http://app/", remote_url=server.get_url())
+    assert not session.get_launch_stats().get_stats()["launched"]
+    session.start()
+    stats = session.get_launch_stats().get_stats()
+    session.close()
+    assert not stats["background"]
+    assert stats["overlap"] == 0.0
+    assert stats["waited"] == pytest.approx(stats["launch_time"], abs=0.01)
+
+
+def test_launch_error_is_raised_by_get_driver():
+    def launcher(browser_string, capabilities):
+        raise DriverEnvironmentException("no browser here")
+    session = Session("chrome", "http://app/",
+                      DriverPool(launcher=launcher), eager=True)
+    with pytest.raises(DriverEnvironmentException) as e:
+        session.start()
+    assert "no browser here" in str(e.value)
+    session.close()
+
+
+def test_close_before_the_launch_finishes(server):
+    launched = []
+    pool = _slow_pool(server, launched)
+    session = Session("chrome", "http://app/", pool, eager=True)
+    session.close()
+    # The browser went back into the pool instead of being abandoned
+    assert pool.get_stats()["idle"] == 1
+    pool.close()
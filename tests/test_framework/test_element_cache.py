@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+import wdframework
+from fake_driver import fake_session
+
+
+class FakeElement:
+    def __init__(self, text, stale=False):
+        self.text = text
+        self.stale = stale
+
+    def get_attribute(self, name):
+        if self.stale:
+            raise StaleElementReferenceException("stale")
+        return self.text
+
+
+def _driver_with_elements(driver, elements):
+    finds = []
+
+    def find_element_by_css_selector(locator):
+        finds.append(locator)
+        return elements.pop(0)
+    driver.find_element_by_css_selector = find_element_by_css_selector
+    return finds
+
+
+def test_cached_element_is_reused_until_navigation():
+    session, driver = fake_session()
+    finds = _driver_with_elements(driver, [FakeElement("a"),
+                                           FakeElement("b")])
+    selector = wdframework.Selector(session, "#q", cache=True)
+    assert selector.get_attribute("x") == "a"
+    assert selector.get_attribute("x") == "a"
+    assert len(finds) == 1
+
+    session.get_driver_env().go_to_url("http://localhost/other")
+    assert selector.get_attribute("x") == "b"
+    assert len(finds) == 2
+    assert session.get_element_cache_stats().get_stats() == {
+        "hits": 1, "misses": 2, "stale": 0, "invalidated": 1}
+
+
+def test_stale_cached_element_is_relocated_once():
+    session, driver = fake_session()
+    finds = _driver_with_elements(driver, [FakeElement("a", stale=True),
+                                           FakeElement("b")])
+    selector = wdframework.Selector(session, "#q", cache=True)
+    assert selector.get_attribute("x") == "b"
+    assert len(finds) == 2
+    assert selector.get_attribute("x") == "b"
+    assert len(finds) == 2
+    assert session.get_element_cache_stats().get_stats()["stale"] == 1
+
+
+def test_uncached_selector_finds_every_time():
+    session, driver = fake_session()
+    finds = _driver_with_elements(driver, [FakeElement("a"),
+                                           FakeElement("b")])
+    selector = wdframework.Selector(session, "#q")
+    assert selector.get_text() == "a"
+    assert selector.get_text() == "b"
+    assert len(finds) == 2
+    assert session.get_element_cache_stats().get_stats()["misses"] == 0
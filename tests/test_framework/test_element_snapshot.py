@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import wdframework
+from fake_driver import fake_session
+
+
+def test_snapshot_is_one_script_call():
+    session, driver = fake_session()
+    driver.script_results.append({"text": "", "value": "hello",
+                                  "classes": ["a", "b"]})
+    selector = wdframework.Selector(session, "#q")
+    snapshot = selector.snapshot(["text", "value", "classes"])
+
+    scripts = [c for c in driver.commands if c[0] == "execute_script"]
+    assert len(scripts) == 1
+    assert scripts[0][2] == ("css_selector", "#q",
+                             ("text", "value", "classes"))
+    assert snapshot.get_text() == "hello"
+    assert snapshot.get_css_classes() == ["a", "b"]
+    assert snapshot.displayed is None
+
+
+def test_snapshot_is_immutable():
+    session, driver = fake_session()
+    driver.script_results.append({"attributes": {"id": "q"}})
+    snapshot = wdframework.Selector(session, "#q").snapshot(["attributes"])
+    with pytest.raises(AttributeError):
+        snapshot.text = "changed"
+    with pytest.raises(TypeError):
+        snapshot.attributes["id"] = "changed"
+    assert snapshot.get_attribute("id") == "q"
+
+
+def test_snapshot_missing_element():
+    session, driver = fake_session()
+    with pytest.raises(NoSuchElementException):
+        wdframework.Selector(session, "#missing").snapshot()
+
+
+def test_snapshot_unknown_field():
+    session, driver = fake_session()
+    with pytest.raises(ValueError):
+        wdframework.Selector(session, "#q").snapshot(["colour"])
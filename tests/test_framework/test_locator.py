@@ -0,0 +1,118 @@
+import os
+import sys
+
+import pytest
+
+import wdframework.locator
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import Selector, Session
+from wdframework.locator import combine, compile_locator, \
+    relative_to_container
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = ('<html><body><ul id="list"><li class="item">one</li>'
+        '<li class="item"><a href="/two">two</a></li></ul>'
+        '<li class="item">outside</li></body></html>')
+
+
+def test_compiled_locators_are_interned():
+    compiled = compile_locator("ID", "main")
+    assert compiled is compile_locator("ID", "main")
+    assert (compiled.by, compiled.strategy, compiled.value) == \
+        ("id", "css selector", '[id="main"]')
+    with pytest.raises(AttributeError):
+        compiled.value = "#other"
+
+
+def test_interned_locators_are_bounded(monkeypatch):
+    monkeypatch.setattr(wdframework.locator, "_MAX_INTERNED", 2)
+    first = compile_locator("css_selector", "#lru-1")
+    compile_locator("css_selector", "#lru-2")
+    assert compile_locator("css_selector", "#lru-1") is first
+    compile_locator("css_selector", "#lru-3")
+    assert len(wdframework.locator._interned) == 2
+    # '#lru-2' was the least recently used
+    assert ("css_selector", "#lru-2") not in wdframework.locator._interned
+    assert compile_locator("css_selector", "#lru-1") is first
+
+
+def test_selectors_share_compiled_locators():
+    first = Selector(None, "#main")
+    assert first.get_compiled_locator() is \
+        Selector(None, "#main").get_compiled_locator()
+
+
+def test_invalid_locators_are_rejected():
+    with pytest.raises(ValueError):
+        Selector(None, "#main", by="css")
+    with pytest.raises(ValueError):
+        Selector(None, "")
+    with pytest.raises(ValueError):
+        compile_locator("xpath", None)
+
+
+def css(container, child, by="css_selector"):
+    return combine(compile_locator("css_selector", container),
+                   compile_locator(by, child))
+
+
+def xpath(container, child):
+    return combine(compile_locator("xpath", container),
+                   compile_locator("xpath", child))
+
+
+def test_combine_css():
+    assert css("#list", "li").locator == "#list li"
+    assert css("#list ", " > li").locator == "#list > li"
+    assert css("#a, #b", "li, p").locator == "#a li, #a p, #b li, #b p"
+    assert css("[title='x, y']", "li").locator == "[title='x, y'] li"
+    assert css("ul:not(.a, .b)", "li").locator == "ul:not(.a, .b) li"
+    assert css("#list", "item", "class_name").locator == \
+        '#list [class~="item"]'
+    assert css("#list", "//li", "xpath") is None
+    assert css("#list", "two", "link_text") is None
+
+
+def test_combine_xpath():
+    assert xpath("//ul", "li").locator == "//ul/li"
+    assert xpath("//ul", ".//a").locator == "//ul//a"
+    assert xpath("//ul", "//a").locator == "//ul//a"
+    assert xpath("//ul", ".").locator == "//ul"
+    assert xpath("//ul | //ol", "li[@x='a|b']").locator == \
+        "//ul/li[@x='a|b'] | //ol/li[@x='a|b']"
+    assert xpath("//ul", "/html") is None
+
+
+def test_relative_to_container():
+    def relative(by, locator):
+        return relative_to_container(compile_locator(by, locator)).locator
+    assert relative("xpath", "//li | ./a | //p") == ".//li | ./a | .//p"
+    assert relative("xpath", "li") == "li"
+    assert relative("css_selector", "li") == "li"
+
+
+def test_with_container_finds_with_one_command():
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        session = Session("chrome", "http://app/",
+                          remote_url=server.get_url())
+        session.start()
+        server.reset_commands()
+        items = Selector.with_container(session, "#list", ".item")
+        assert [e.text for e in items.get_multiple()] == ["one", "two"]
+        container = Selector(session, "//ul[@id='list']", by="xpath")
+        link = Selector.with_container(session, container, ".//a", "xpath")
+        assert link.get_text() == "two"
+        finds = [path for _, path in server.get_commands()
+                 if path.endswith(("/element", "/elements"))]
+        assert len(finds) == 2
+        with pytest.raises(ValueError):
+            Selector.with_container(session, "#list", "two", "link_text")
+        # '//' means the same inside a container whether the elements are
+        # found from it or with the combined query
+        scoped = Selector(session, "//li", "xpath", container=container)
+        assert [e.text for e in scoped.get_multiple()] == ["one", "two"]
+        combined = Selector(session, scoped.get_query().locator, "xpath")
+        assert [e.text for e in combined.get_multiple()] == ["one", "two"]
+        session.close()
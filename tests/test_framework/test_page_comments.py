@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import Page, Session
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = ('<!--top--><html><body><!--a--><div><!--b--></div>'
+        '<div><!--c--><p>x</p><!--d--></div></body></html>')
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        yield server
+
+
+@pytest.fixture
+def page(server):
+    session = Session("chrome", "http://app/", remote_url=server.get_url())
+    session.start()
+    yield Page(session)
+    session.close()
+
+
+def test_get_comments(page):
+    assert page.get_comments() == ["top", "a", "b", "c", "d"]
+    assert page.get_comments(offset=1, limit=2) == ["a", "b"]
+    assert page.get_comments(offset=10) == []
+    assert page.get_comments(limit=0) == []
+
+
+def test_paths(page):
+    assert page.get_comments(offset=3, with_paths=True) == [
+        ("c", "/html[1]/body[1]/div[2]/comment()[1]"),
+        ("d", "/html[1]/body[1]/div[2]/comment()[2]")]
+    assert page.get_comments(limit=1, with_paths=True) == [
+        ("top", "/comment()[1]")]
+
+
+def test_chunks_are_fetched_lazily(server, page):
+    server.reset_commands()
+    comments = page.iter_comments(chunk_size=2)
+    assert next(comments) == "top"
+    assert server.get_command_count() == 1
+    assert list(comments) == ["a", "b", "c", "d"]
+    # Chunks of 2, 2 and 1 comments
+    assert server.get_command_count() == 3
+
+
+def test_limit_caps_round_trips(server, page):
+    server.reset_commands()
+    assert page.get_comments(limit=3) == ["top", "a", "b"]
+    assert server.get_command_count() == 1
+
+
+def test_invalid_arguments(page):
+    with pytest.raises(ValueError):
+        page.get_comments(offset=-1)
+    with pytest.raises(ValueError):
+        list(page.iter_comments(chunk_size=0))
@@ -0,0 +1,117 @@
+import os
+import sys
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import Locator, Page, Session, WaitPolicy
+from wdframework.exceptions import TimeoutException
+from wdframework.testing import FakeWebDriverServer, webdriver_server
+from wdframework.testing.webdriver_server import WebDriverError
+
+PAGE = ('<html><body><div id="app"><ul id="results"></ul></div>'
+        '<div id="spinner" hidden></div></body></html>')
+
+
+class ResultsPage(Page):
+    __slots__ = ()
+
+    app = Locator("#app", ready=True)
+    results = Locator("#results", ready=True)
+    spinner = Locator("#spinner")
+    missing = Locator("#missing")
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        yield server
+
+
+@pytest.fixture
+def session(server):
+    session = Session("chrome", "http://app/", remote_url=server.get_url())
+    session.start()
+    yield session
+    session.close()
+
+
+def test_one_script(server, session):
+    page = ResultsPage(session)
+    server.reset_commands()
+    timings = page.wait_until_loaded()
+    # Setting the script timeout, then the script
+    assert server.get_command_count() == 2
+    assert set(timings) == {"elapsed", "ready_state", "selectors",
+                            "network_idle", "since_navigation"}
+    assert session.get_wait_stats().get_stats()["waits"] == 1
+    page.wait_until_loaded(ready=["spinner"], state="hidden", idle=None)
+
+
+def test_timeout_names_unmet_conditions(session):
+    page = ResultsPage(session)
+    with pytest.raises(TimeoutException) as e:
+        page.wait_until_loaded(ready=["missing"], timeout=0.05)
+    assert "not met: selectors" in str(e.value)
+    with pytest.raises(ValueError):
+        page.wait_until_loaded(state="loaded")
+
+
+def test_polls_without_async_scripts(server, session):
+    session.get_driver_env().mark_async_js_unsupported()
+    page = ResultsPage(session)
+    server.reset_commands()
+    assert page.wait_until_loaded()["elapsed"] >= 0
+    assert server.get_command_count() == 1
+    with pytest.raises(TimeoutException):
+        page.wait_until_loaded(ready=["missing"], policy=WaitPolicy(
+            timeout=0.05, interval=0.01))
+
+
+def _replace_async_route(monkeypatch, handler):
+    routes = [(method, pattern, handler if
+               pattern.pattern.endswith("/execute/async$") else route)
+              for method, pattern, route in webdriver_server._ROUTES]
+    monkeypatch.setattr(webdriver_server, "_ROUTES",
+                        [r for r in routes if r[2] is not None])
+
+
+def test_script_errors_are_raised(monkeypatch, session):
+    def unload(server, session, body):
+        # Such as a navigation while waiting
+        raise WebDriverError("javascript error",
+                             "document unloaded while waiting for result")
+    _replace_async_route(monkeypatch, unload)
+    with pytest.raises(WebDriverException):
+        ResultsPage(session).wait_until_loaded(timeout=1)
+    assert session.get_driver_env().supports_async_js()
+
+
+def test_polls_for_the_time_left(monkeypatch, session):
+    # The server doesn't know the command at all
+    _replace_async_route(monkeypatch, None)
+    clock = [100.0]
+    driver_env = session.get_driver_env()
+    execute_async_wait = driver_env.execute_async_wait
+
+    def slow_execute_async_wait(*args, **kwargs):
+        result = execute_async_wait(*args, **kwargs)
+        clock[0] += 2
+        return result
+    monkeypatch.setattr(driver_env, "execute_async_wait",
+                        slow_execute_async_wait)
+    monkeypatch.setattr("wdframework.loadables.page.time.monotonic",
+                        lambda: clock[0])
+    policy = WaitPolicy()
+    timeouts = []
+
+    def poll(check, description, timeout, stats):
+        timeouts.append(timeout)
+        raise TimeoutException(description)
+    monkeypatch.setattr(policy, "poll", poll)
+    with pytest.raises(TimeoutException):
+        ResultsPage(session).wait_until_loaded(timeout=5, policy=policy)
+    assert timeouts == [3]
+    assert not driver_env.supports_async_js()
@@ -0,0 +1,125 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import Page, PerformanceLog, Session
+from wdframework.exceptions import BudgetExceededException
+from wdframework.testing import FakeWebDriverServer
+
+PAGES = {"http://app/": "<html><body><h1>Home</h1></body></html>",
+         "http://app/search": "<html><body><ul></ul></body></html>"}
+
+
+class AppPage(Page):
+    __slots__ = ()
+
+    budgets = {"ttfb": 0.2, "dom_content_loaded": 1.0}
+
+
+class SearchPage(AppPage):
+    __slots__ = ()
+
+    budgets = {"dom_content_loaded": 0.5, "resource_count": 2}
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer(PAGES) as server:
+        yield server
+
+
+def _session(server, log=None):
+    session = Session("chrome", "http://app/", remote_url=server.get_url(),
+                      perf_log=log)
+    session.start()
+    return session
+
+
+def test_budgets_are_merged_and_validated():
+    assert SearchPage.get_budgets() == {
+        "ttfb": 0.2, "dom_content_loaded": 0.5, "resource_count": 2}
+    assert Page.get_budgets() == {}
+    with pytest.raises(ValueError):
+        class Typo(Page):
+            budgets = {"ttbf": 0.2}
+    with pytest.raises(ValueError):
+        class Negative(Page):
+            budgets = {"load": -1}
+
+
+def test_timing_is_read_in_seconds(server):
+    server.set_timing("http://app/", {"ttfb": 150}, [
+        {"name": "http://app/a.js", "initiator_type": "script", "start": 40,
+         "duration": 300, "transfer_size": 1200},
+        {"name": "http://app/b.css", "initiator_type": "link", "start": 40,
+         "duration": 100, "transfer_size": 800}])
+    session = _session(server)
+    timing = session.get_driver_env().get_navigation_timing(max_resources=1)
+    session.close()
+    assert timing["url"] == "http://app/"
+    assert timing["metrics"]["ttfb"] == 0.15
+    assert timing["metrics"]["load"] == 0.03
+    assert timing["metrics"]["resource_count"] == 2
+    assert timing["metrics"]["resource_transfer_size"] == 2000
+    assert [r["name"] for r in timing["resources"]] == ["http://app/a.js"]
+    assert timing["resources"][0]["duration"] == 0.3
+
+
+def test_page_within_budget(server):
+    session = _session(server)
+    timing = AppPage(session).check_budgets()
+    assert timing["page"] == "AppPage"
+    assert AppPage(session).wait_until_loaded(idle=None)["elapsed"] >= 0
+    session.close()
+
+
+def test_exceeded_budget_fails(server):
+    server.set_timing("http://app/search", {"ttfb": 250,
+                                            "dom_content_loaded": 700})
+    session = _session(server)
+    session.get_driver_env().go_to_url("http://app/search")
+    with pytest.raises(BudgetExceededException) as e:
+        SearchPage(session).wait_until_loaded(idle=None)
+    assert set(e.value.exceeded) == {"ttfb", "dom_content_loaded"}
+    assert e.value.exceeded["ttfb"] == (0.25, 0.2)
+    assert "dom_content_loaded 0.700s > 0.500s" in str(e.value)
+    # AppPage allows the slower DOMContentLoaded
+    with pytest.raises(BudgetExceededException) as e:
+        AppPage(session).check_budgets()
+    assert set(e.value.exceeded) == {"ttfb"}
+    session.close()
+
+
+def test_every_navigation_is_logged_once(server):
+    log = PerformanceLog()
+    session = _session(server, log)
+    env = session.get_driver_env()
+    env.go_to_url("http://app/search")
+    AppPage(session).check_budgets()
+    AppPage(session).check_budgets()
+    env.back()
+    session.close()
+    timings = log.get_timings()
+    assert [t["url"] for t in timings] == [
+        "http://app/", "http://app/search", "http://app/"]
+    assert [t["page"] for t in timings] == [None, "AppPage", None]
+    assert log.get_timings(page="AppPage") == [timings[1]]
+    assert session.get_perf_log() is log
+
+
+def test_timings_are_aggregated_across_runs(server, tmp_path):
+    path = str(tmp_path / "timings.jsonl")
+    for ttfb in (100, 200, 300):
+        server.set_timing("http://app/", {"ttfb": ttfb})
+        _session(server, PerformanceLog(path)).close()
+    log = PerformanceLog(path)
+    assert len(log.get_timings()) == 3
+    stats = log.get_stats(url="http://app/")
+    assert stats["ttfb"]["count"] == 3
+    assert stats["ttfb"]["mean"] == pytest.approx(0.2)
+    assert stats["ttfb"]["p50"] == 0.2
+    assert stats["ttfb"]["max"] == 0.3
+    assert log.get_stats(url="http://other/") == {}
@@ -0,0 +1,158 @@
+import os
+import pickle
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import BrowserProfile, DriverEnvironment, DriverPool, Session
+from wdframework.exceptions import DriverEnvironmentException
+from wdframework.profile import resolve_browser
+from wdframework.testing import FakeWebDriverServer
+
+
+class FakeDriver:
+    def __init__(self, capabilities=None, driver_path=None):
+        self.capabilities = capabilities
+        self.driver_path = driver_path
+        self.window_size = None
+
+    def set_window_size(self, width, height):
+        self.window_size = (width, height)
+
+
+def test_aliases():
+    assert resolve_browser("ff") == "firefox"
+    assert resolve_browser("IE") == "internetexplorer"
+    assert resolve_browser("internet_explorer") == "internetexplorer"
+    assert resolve_browser("phantom") == "phantomjs"
+    assert resolve_browser("Chrome") == "chrome"
+    with pytest.raises(DriverEnvironmentException):
+        resolve_browser("netscape")
+
+
+def test_alias_methods_launch_the_canonical_driver(monkeypatch):
+    switch = DriverEnvironment._BrowserSwitch
+    monkeypatch.setattr(switch, "firefox", staticmethod(FakeDriver))
+    monkeypatch.setattr(switch, "internetexplorer", staticmethod(FakeDriver))
+    monkeypatch.setattr(switch, "phantomjs", staticmethod(FakeDriver))
+    for alias in ("ff", "ie", "internet_explorer", "phantom"):
+        driver = switch().string_to_browser(alias, {"a": 1}, "/bin/driver")
+        assert isinstance(driver, FakeDriver)
+        assert driver.capabilities == {"a": 1}
+        assert driver.driver_path == "/bin/driver"
+    with pytest.raises(DriverEnvironmentException):
+        switch().string_to_browser("netscape")
+
+
+def test_fast_chrome_capabilities():
+    capabilities = BrowserProfile.fast(window_size=(800, 600))\
+        .to_capabilities("chrome")
+    assert capabilities["browserName"] == "chrome"
+    assert capabilities["pageLoadStrategy"] == "eager"
+    options = capabilities["chromeOptions"]
+    assert "--headless" in options["args"]
+    assert "--window-size=800,600" in options["args"]
+    assert "--disable-remote-fonts" in options["args"]
+    assert options["prefs"][
+        "profile.managed_default_content_settings.images"] == 2
+
+
+def test_fast_firefox_capabilities():
+    capabilities = BrowserProfile.fast().to_capabilities("ff")
+    assert capabilities["browserName"] == "firefox"
+    assert capabilities["pageLoadStrategy"] == "eager"
+    options = capabilities["moz:firefoxOptions"]
+    assert "-headless" in options["args"]
+    assert options["prefs"]["permissions.default.image"] == 2
+    assert options["prefs"]["browser.display.use_document_fonts"] == 0
+    assert options["prefs"]["ui.prefersReducedMotion"] == 1
+
+
+def test_extra_options_apply_last():
+    profile = BrowserProfile(arguments=["--lang=en"],
+                             preferences={"intl.accept_languages": "en"},
+                             capabilities={"pageLoadStrategy": "none"})
+    capabilities = profile.to_capabilities("chrome")
+    assert capabilities["chromeOptions"]["args"] == ["--lang=en"]
+    assert capabilities["chromeOptions"]["prefs"] == {
+        "intl.accept_languages": "en"}
+    assert capabilities["pageLoadStrategy"] == "none"
+    assert BrowserProfile().to_capabilities("phantom") == dict(
+        BrowserProfile().to_capabilities("phantomjs"))
+
+
+def test_validation_and_copies():
+    with pytest.raises(ValueError):
+        BrowserProfile(page_load_strategy="lazy")
+    with pytest.raises(ValueError):
+        BrowserProfile(window_size=(0, 600))
+    profile = BrowserProfile.fast()
+    changed = profile.with_options(headless=False)
+    assert profile.get_options()["headless"]
+    assert not changed.get_options()["headless"]
+    assert pickle.loads(pickle.dumps(profile)) == profile
+
+
+def test_launch_resizes_browsers_without_a_size_argument(monkeypatch):
+    switch = DriverEnvironment._BrowserSwitch
+    monkeypatch.setattr(switch, "chrome", staticmethod(FakeDriver))
+    monkeypatch.setattr(switch, "edge", staticmethod(FakeDriver))
+    profile = BrowserProfile.fast(driver_path="/bin/driver",
+                                  window_size=(800, 600))
+    chrome = profile.launch("chrome")
+    assert chrome.driver_path == "/bin/driver"
+    assert chrome.window_size is None
+    edge = profile.launch("edge")
+    assert edge.capabilities["pageLoadStrategy"] == "eager"
+    assert edge.window_size == (800, 600)
+
+
+def test_remote_session_sends_profile():
+    with FakeWebDriverServer({"http://app/": "<p>hi</p>"}) as server:
+        session = Session("safari", "http://app/",
+                          remote_url=server.get_url(),
+                          profile=BrowserProfile.fast(window_size=(800, 600)))
+        session.start()
+        requested = server.get_requested_capabilities()[0]
+        assert requested["desiredCapabilities"]["pageLoadStrategy"] == \
+            "eager"
+        commands = server.get_commands()
+        # Safari can't be sized with an argument
+        driver = session.get_driver_env().get_driver()
+        size = driver.get_window_size()
+        assert (size["width"], size["height"]) == (800, 600)
+        # The animations stylesheet is added after navigating
+        assert commands[-1][1].endswith("/execute/sync")
+        assert commands[-2][1].endswith("/url")
+        session.close()
+
+
+def test_pool_acquires_by_profile_capabilities():
+    launched = []
+
+    def launcher(browser_string, capabilities):
+        launched.append(capabilities)
+        return FakeDriver(capabilities)
+
+    pool = DriverPool(launcher=launcher)
+    profile = BrowserProfile(page_load_strategy="eager",
+                             disable_animations=False)
+    env = DriverEnvironment("chrome", pool, profile=profile)
+    env.get_driver()
+    assert launched == [profile.to_capabilities("chrome")]
+
+
+def test_pool_launches_with_the_profile(monkeypatch):
+    switch = DriverEnvironment._BrowserSwitch
+    monkeypatch.setattr(switch, "edge", staticmethod(FakeDriver))
+    pool = DriverPool()
+    profile = BrowserProfile(driver_path="/bin/driver",
+                             window_size=(800, 600))
+    driver = DriverEnvironment("edge", pool, profile=profile).get_driver()
+    assert driver.driver_path == "/bin/driver"
+    assert driver.window_size == (800, 600)
+    assert pool.get_stats()["misses"] == 1
+    assert hash(profile) == hash(profile.with_options())
+    assert {profile, profile.with_options()} == {profile}
@@ -0,0 +1,129 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import RemoteNode, RemoteScheduler, Selector, Session
+from wdframework.exceptions import RemoteSchedulerException
+from wdframework.testing import FakeWebDriverServer
+from wdframework.wait import WaitPolicy
+
+PAGES = {"http://app/": '<html><body><h1 id="title">Home</h1></body></html>'}
+
+
+@pytest.fixture
+def servers():
+    servers = [FakeWebDriverServer(PAGES).start() for _ in range(3)]
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+def _dead_url():
+    # A port nothing listens on any more
+    server = FakeWebDriverServer().start()
+    url = server.get_url()
+    server.stop()
+    return url
+
+
+def _session(scheduler):
+    session = Session("chrome", "http://app/", scheduler=scheduler)
+    session.start()
+    return session
+
+
+def test_sessions_go_to_the_least_loaded_node(servers):
+    a, b = servers[:2]
+    scheduler = RemoteScheduler([(a.get_url(), 1), (b.get_url(), 3)])
+    sessions = [_session(scheduler) for _ in range(4)]
+    assert (a.get_session_count(), b.get_session_count()) == (1, 3)
+    assert Selector(sessions[0], "#title").get().text == "Home"
+    assert scheduler.get_stats()["in_use"] == 4
+
+    sessions.pop(0).close()
+    sessions.pop(0).close()
+    assert scheduler.get_stats()["in_use"] == 2
+    sessions.append(_session(scheduler))
+    for session in sessions:
+        session.close()
+    stats = scheduler.get_stats()
+    assert stats["in_use"] == 0
+    assert all(node["in_use"] == 0 for node in stats["nodes"].values())
+    assert sum(node["launches"] for node in stats["nodes"].values()) == 5
+
+
+def test_failing_node_is_blacklisted_and_session_retried(servers):
+    dead = _dead_url()
+    healthy = servers[0]
+    # The dead node has more room, so it is tried first
+    scheduler = RemoteScheduler([RemoteNode(dead, 4),
+                                 RemoteNode(healthy.get_url(), 2)])
+    first = _session(scheduler)
+    second = _session(scheduler)
+    assert healthy.get_session_count() == 2
+    stats = scheduler.get_stats()
+    assert stats["retries"] == 1
+    assert stats["nodes"][dead]["failures"] == 1
+    assert stats["nodes"][dead]["blacklisted_for"] > 0
+    assert stats["nodes"][dead]["in_use"] == 0
+    first.close()
+    second.close()
+
+
+def test_refused_session_is_retried_elsewhere(servers):
+    full = FakeWebDriverServer(PAGES, max_sessions=0).start()
+    try:
+        scheduler = RemoteScheduler([(full.get_url(), 2),
+                                     servers[0].get_url()])
+        session = _session(scheduler)
+        assert servers[0].get_session_count() == 1
+        assert scheduler.get_stats()["nodes"][full.get_url()]["failures"] == 1
+        session.close()
+    finally:
+        full.stop()
+
+
+def test_slow_node_is_blacklisted_but_keeps_its_session(servers):
+    slow, fast = servers[:2]
+    slow.set_latency(0.2)
+    scheduler = RemoteScheduler([(slow.get_url(), 2), fast.get_url()],
+                                slow_launch=0.1)
+    first = _session(scheduler)
+    second = _session(scheduler)
+    assert (slow.get_session_count(), fast.get_session_count()) == (1, 1)
+    stats = scheduler.get_stats()["nodes"][slow.get_url()]
+    assert stats["slow_launches"] == 1 and stats["in_use"] == 1
+    assert stats["blacklisted_for"] > 0
+    first.close()
+    second.close()
+
+
+def test_waits_for_a_free_slot(servers):
+    scheduler = RemoteScheduler([servers[0].get_url()], queue_timeout=5.0,
+                                policy=WaitPolicy(interval=0.01))
+    first = _session(scheduler)
+    threading.Timer(0.1, first.close).start()
+    second = _session(scheduler)
+    assert servers[0].get_session_count() == 1
+    second.close()
+
+
+def test_no_node_available(servers):
+    scheduler = RemoteScheduler([servers[0].get_url()], queue_timeout=0.1)
+    session = _session(scheduler)
+    with pytest.raises(RemoteSchedulerException) as e:
+        _session(scheduler)
+    assert "no node was available" in str(e.value)
+    session.close()
+
+    scheduler = RemoteScheduler([_dead_url(), _dead_url()],
+                                queue_timeout=0.1)
+    with pytest.raises(RemoteSchedulerException) as e:
+        _session(scheduler)
+    assert str(e.value).count("\n") == 2
+    with pytest.raises(RemoteSchedulerException):
+        RemoteScheduler([])
@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import DriverPool, Selector, Session
+from wdframework.exceptions import DriverEnvironmentException, \
+    ReplayDivergenceException
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = ('<html><body><h1 id="title">Cart</h1><ul><li class="item">a</li>'
+        '<li class="item">b</li></ul><input name="q"></body></html>')
+
+
+def flow(session, locator="#title"):
+    session.start()
+    session.get_store().put("title", Selector(session, locator).get_text())
+    Selector(session, "q", "name").send_keys("cats")
+    session.get_store().put("items", len(Selector(session, ".item")
+                                         .get_multiple()))
+    return session.get_store().get("title"), session.get_store().get("items")
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        session = Session("chrome", "http://app/",
+                          remote_url=server.get_url(), record_to=path)
+        assert flow(session) == ("Cart", 2)
+        session.close()
+    return path
+
+
+def test_recording_is_one_json_object_per_line(recording):
+    with open(recording) as f:
+        entries = [json.loads(line) for line in f]
+    assert entries[0] == {"format": "wdframework-replay", "version": 1}
+    assert [e["c"] for e in entries[1:3]] == ["newSession", "get"]
+    assert entries[-1]["c"] == "quit"
+
+
+def test_replay_without_a_browser(recording):
+    # The server is gone; everything is answered from the recording
+    session = Session("chrome", "http://app/", replay_from=recording)
+    assert flow(session) == ("Cart", 2)
+    session.close()
+
+
+def test_replay_flags_divergent_command(recording):
+    session = Session("chrome", "http://app/", replay_from=recording)
+    with pytest.raises(ReplayDivergenceException) as e:
+        flow(session, "h1")
+    assert "expected parameters" in str(e.value)
+
+
+def test_replay_flags_missing_commands(recording):
+    session = Session("chrome", "http://app/", replay_from=recording)
+    session.start()
+    with pytest.raises(ReplayDivergenceException) as e:
+        session.close()
+    assert "expected findElement, got quit" in str(e.value)
+
+
+def test_replay_flags_extra_commands(recording):
+    session = Session("chrome", "http://app/", replay_from=recording)
+    flow(session)
+    with pytest.raises(ReplayDivergenceException) as e:
+        Selector(session, "#title").click()
+    assert "expected quit, got findElement" in str(e.value)
+
+
+def test_recording_from_pool_excludes_reset(tmp_path):
+    path = str(tmp_path / "pooled.jsonl")
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        pool = DriverPool(launcher=lambda browser, caps: __import__(
+            "selenium.webdriver", fromlist=["Remote"]).Remote(
+            server.get_url(), {"browserName": "chrome"}))
+        session = Session("chrome", "http://app/", pool, record_to=path)
+        flow(session)
+        session.close()
+        pool.close()
+    with open(path) as f:
+        commands = [json.loads(line).get("c") for line in f]
+    assert "deleteAllCookies" not in commands and "quit" not in commands
+    session = Session("chrome", "http://app/", replay_from=path)
+    assert flow(session) == ("Cart", 2)
+    session.close()
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / "other.jsonl"
+    path.write_text('{"hello": 1}\n')
+    session = Session("chrome", "http://app/", replay_from=str(path))
+    with pytest.raises(ReplayDivergenceException):
+        session.start()
+
+
+def test_record_and_replay_are_exclusive():
+    with pytest.raises(DriverEnvironmentException):
+        Session("chrome", "http://app/", record_to="a", replay_from="b")
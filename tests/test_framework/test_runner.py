@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import wdframework
+from fake_driver import FakeDriver
+
+
+def launch_fake_driver(browser_string, capabilities):
+    return FakeDriver()
+
+
+def passing_test(session):
+    assert session.get_host() == "http://localhost/"
+
+
+def failing_test(session):
+    assert False, "expected failure"
+
+
+def crashing_test(session):
+    session.get_driver_env().get_driver().healthy = False
+    raise RuntimeError("browser crashed")
+
+
+def test_results_are_aggregated_in_order():
+    runner = wdframework.ParallelRunner("chrome", "http://localhost/",
+                                        workers=2, tests_per_worker=2,
+                                        launcher=launch_fake_driver)
+    report = runner.run([passing_test, failing_test, crashing_test,
+                         passing_test, passing_test])
+    results = report.get_results()
+    assert [r.passed for r in results] == [True, False, False, True, True]
+    assert "expected failure" in results[1].error
+    assert results[2].error == "RuntimeError: browser crashed"
+    summary = report.get_summary()
+    assert summary["tests"] == 5
+    assert summary["failed"] == 2
+    # Workers are recycled after two tests each
+    assert summary["worker_pids"] >= 3
+
+
+def test_default_worker_count_is_bounded_by_memory():
+    assert wdframework.ParallelRunner.default_worker_count(1 << 60) == 1
+    assert wdframework.ParallelRunner.default_worker_count(1) >= 1
@@ -0,0 +1,16 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework.stats import percentile
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 0.0) == 1 and percentile(values, 1.0) == 100
+    assert percentile([0.2, 0.4], 0.50) == 0.2
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.50) == 0.0
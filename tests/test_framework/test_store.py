@@ -0,0 +1,140 @@
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import wdframework
+from wdframework import MemoryBackend, SQLiteBackend, Store
+from wdframework.exceptions import StoreException
+from wdframework.wait import WaitPolicy
+from fake_driver import FakeDriver
+
+FAST = WaitPolicy(interval=0.01, max_interval=0.05)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return Store()
+    return Store(SQLiteBackend(str(tmp_path / "store.db")))
+
+
+def test_put_is_write_once(store):
+    store.put("user", {"name": "alice"})
+    assert store.get("user") == {"name": "alice"}
+    assert store.get("missing") is None
+    with pytest.raises(StoreException):
+        store.put("user", {"name": "bob"})
+    assert not store.put_if_absent("user", {"name": "bob"})
+    assert store.put_if_absent("other", 1)
+    with pytest.raises(StoreException):
+        store.put("", 1)
+    with pytest.raises(StoreException):
+        store.put("key", None)
+
+
+def test_get_or_compute_runs_loader_once(store):
+    calls = []
+
+    def loader():
+        calls.append(None)
+        time.sleep(0.1)
+        return "seeded"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        store.get_or_compute("account", loader, policy=FAST)))
+        for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["seeded"] * 8
+    assert len(calls) == 1
+
+
+def test_failed_loader_is_retried(store):
+    def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        store.get_or_compute("account", failing)
+    assert store.get("account") is None
+    assert store.get_or_compute("account", lambda: 42) == 42
+
+
+def test_claim_of_dead_process_is_taken_over(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "store.db"))
+    process = multiprocessing.Process(target=time.sleep, args=(0,))
+    process.start()
+    process.join()
+    # As left behind by a worker that died while computing
+    backend.put_if_absent("account", ("wdframework-store-pending",
+                                      process.pid, "token"))
+    store = Store(backend)
+    assert store.get("account") is None
+    assert store.get_or_compute("account", lambda: 7, timeout=1,
+                                policy=FAST) == 7
+
+
+def _race(path, key, value, results):
+    results.put(Store(SQLiteBackend(path)).put_if_absent(key, value))
+
+
+def test_put_if_absent_is_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "store.db")
+    SQLiteBackend(path)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_race,
+                                         args=(path, "key", i, results))
+                 for i in range(6)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert sorted(results.get() for _ in processes) == [False] * 5 + [True]
+    assert Store(SQLiteBackend(path)).get("key") in range(6)
+
+
+def _launch(browser_string, capabilities):
+    return FakeDriver()
+
+
+def _seed():
+    with open(os.environ["WDF_STORE_TEST_LOG"], "a") as f:
+        f.write("%d\n" % os.getpid())
+    time.sleep(0.1)
+    return "account-1"
+
+
+def _uses_shared_account(session):
+    assert session.get_store().get_or_compute(
+        "account", _seed, policy=FAST) == "account-1"
+
+
+def test_runner_workers_share_the_store(tmp_path, monkeypatch):
+    log = tmp_path / "computed.log"
+    monkeypatch.setenv("WDF_STORE_TEST_LOG", str(log))
+    store = Store(SQLiteBackend(str(tmp_path / "store.db")))
+    runner = wdframework.ParallelRunner("chrome", "http://localhost/",
+                                        workers=3, launcher=_launch,
+                                        store=store)
+    report = runner.run([_uses_shared_account] * 6)
+    assert report.get_summary()["passed"] == 6
+    assert len(log.read_text().splitlines()) == 1
+    assert store.get("account") == "account-1"
+
+
+def test_memory_backend_is_copied_not_shared():
+    store = Store(MemoryBackend())
+    store.put("a", 1)
+    copy = pickle.loads(pickle.dumps(store))
+    copy.put("b", 2)
+    assert copy.get("a") == 1
+    assert store.get("b") is None
@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import Selector, SharedBrowser, Tracer
+from wdframework.exceptions import DriverEnvironmentException
+from wdframework.scripts import OPEN_WINDOW_JS
+from wdframework.testing import FakeWebDriverServer
+
+PAGES = {"http://app/" + path: '<html><body><h1 id="title">%s</h1></body>'
+         '</html>' % title
+         for path, title in (("", "Home"), ("cart", "Cart"), ("help", "Help"))}
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer(PAGES) as server:
+        yield server
+
+
+@pytest.fixture
+def shared(server):
+    shared = SharedBrowser("chrome", remote_url=server.get_url())
+    yield shared
+    shared.close()
+
+
+def test_sessions_are_isolated_in_tabs(server, shared):
+    cart = shared.open_session("http://app/cart")
+    help_ = shared.open_session("http://app/help")
+    cart.start()
+    help_.start()
+    for _ in range(3):
+        assert Selector(cart, "#title").get().text == "Cart"
+        assert Selector(help_, "#title").get().text == "Help"
+    help_.get_driver_env().go_to_url("http://app/")
+    cart.get_driver_env().refresh()
+    help_.get_driver_env().back()
+    assert cart.get_driver_env().get_driver().current_url == "http://app/cart"
+    assert help_.get_driver_env().get_driver().current_url == \
+        "http://app/help"
+    assert cart.get_driver_env().get_driver().current_window_handle != \
+        help_.get_driver_env().get_driver().current_window_handle
+    cart.close()
+    help_.close()
+
+    assert server.get_session_count() == 1
+    stats = shared.get_stats()
+    assert stats["tabs_opened"] == 2 and stats["windows_opened"] == 1
+    assert stats["tabs_open"] == 0
+    assert stats["switches"] >= 6
+
+
+def test_closed_tabs_are_reused(shared):
+    first = shared.open_session("http://app/cart")
+    first.start()
+    closed = first.get_driver_env().get_driver()
+    handle = closed.current_window_handle
+    first.close()
+    with pytest.raises(DriverEnvironmentException):
+        closed.current_url
+
+    second = shared.open_session("http://app/help")
+    second.start()
+    driver = second.get_driver_env().get_driver()
+    assert driver.current_window_handle == handle
+    assert len(driver.window_handles) == 1
+    # Quitting a tab's driver only closes its window
+    driver.quit()
+    assert shared.get_driver_env().get_driver().window_handles == []
+
+
+def test_popups_are_closed_with_their_tab(shared):
+    first = shared.open_session("http://app/cart")
+    first.start()
+    driver = first.get_driver_env().get_driver()
+    window = driver.current_window_handle
+    driver.execute_script(OPEN_WINDOW_JS)
+    popup, = [h for h in driver.window_handles if h != window]
+    driver.switch_to.window(popup)
+    first.close()
+
+    second = shared.open_session("http://app/help")
+    second.start()
+    driver = second.get_driver_env().get_driver()
+    assert driver.current_window_handle == window
+    assert driver.window_handles == [window]
+    assert driver.current_url == "http://app/help"
+
+
+def test_closing_the_browser_closes_open_tabs(server):
+    shared = SharedBrowser("chrome", remote_url=server.get_url())
+    session = shared.open_session("http://app/cart")
+    session.start()
+    driver = session.get_driver_env().get_driver()
+    shared.close()
+    with pytest.raises(DriverEnvironmentException, match="The tab is closed"):
+        driver.current_url
+    session.close()
+    assert shared.get_stats()["tabs_open"] == 0
+
+
+def test_threads_take_turns(shared):
+    tracer = Tracer()
+    sessions = [shared.open_session("http://app/" + path, tracer=tracer)
+                for path in ("", "cart", "help")]
+    errors = []
+
+    def run(session, title):
+        try:
+            session.start()
+            for _ in range(10):
+                assert Selector(session, "#title").get().text == title
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=run, args=(session, title))
+               for session, title in zip(sessions, ("Home", "Cart", "Help"))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert not errors
+    stats = shared.get_stats()
+    assert stats["tabs_opened"] == 3 and stats["tabs_open"] == 0
+    assert stats["lock_wait_max"] >= 0
+    assert len({r.thread for r in tracer.get_records()}) == 3
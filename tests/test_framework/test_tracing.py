@@ -0,0 +1,120 @@
+import json
+import os
+import sys
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import Page, Selector, Session, Tracer
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = '<html><body><p id="a">one</p><input name="q"></body></html>'
+
+
+class SearchPage(Page):
+    pass
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        yield server
+
+
+def traced_session(server, tracer):
+    session = Session("chrome", "http://app/", remote_url=server.get_url(),
+                      tracer=tracer)
+    session.start()
+    return session
+
+
+def test_commands_attributed_to_selector_and_owner(server):
+    tracer = Tracer("search")
+    session = traced_session(server, tracer)
+    page = SearchPage(session)
+    Selector(session, "#a", owner=page).get_text()
+    Selector(session, "q", "name").send_keys("cats")
+    session.close()
+
+    records = tracer.get_records()
+    get_text = [r for r in records if r.kind == "selector"
+                and r.name == "get_text"]
+    assert len(get_text) == 1
+    assert get_text[0].locator == "#a" and get_text[0].owner == "SearchPage"
+    # The get() inside get_text() is part of it, not a record of its own
+    assert not any(r.kind == "selector" and r.name == "get" for r in records)
+    finds = [r for r in records if r.name == "findElement"]
+    assert [(r.locator, r.owner) for r in finds] == [
+        ("#a", "SearchPage"), ("q", None)]
+    # Navigation happened outside of any Selector
+    assert any(r.name == "get" and r.kind == "command" and r.locator is None
+               for r in records)
+
+
+def test_failed_calls_and_waits_are_recorded(server):
+    tracer = Tracer()
+    session = traced_session(server, tracer)
+    with pytest.raises(NoSuchElementException):
+        Selector(session, "#missing").click()
+    Selector(session, "#a").wait_for("visible", timeout=1)
+    session.close()
+    click = [r for r in tracer.get_records() if r.name == "click"][0]
+    assert click.locator == "#missing"
+    wait = [r for r in tracer.get_records() if r.name == "wait_for"][0]
+    assert wait.kind == "wait" and wait.wait_time == wait.duration
+
+
+def test_histograms(server):
+    tracer = Tracer()
+    session = traced_session(server, tracer)
+    for _ in range(5):
+        Selector(session, "#a").is_displayed()
+    session.close()
+    by_locator = tracer.get_histograms(by="locator", kind="selector")
+    assert list(by_locator) == ["#a"]
+    histogram = by_locator["#a"]
+    assert histogram["count"] == 5
+    assert sum(count for _, count in histogram["buckets"]) == 5
+    assert histogram["p50"] <= histogram["p99"] <= histogram["max"]
+    assert tracer.get_histograms(kind="command")["findElement"]["count"] == 5
+    with pytest.raises(ValueError):
+        tracer.get_histograms(by="duration")
+
+
+def test_chrome_trace(server, tmp_path):
+    tracer = Tracer("checkout")
+    session = traced_session(server, tracer)
+    Selector(session, "#a").get_text()
+    session.close()
+    path = str(tmp_path / "trace.json")
+    tracer.write_chrome_trace(path)
+    with open(path) as f:
+        trace = json.load(f)
+    events = trace["traceEvents"]
+    assert events[0]["ph"] == "M" and events[0]["args"]["name"] == "checkout"
+    spans = [e for e in events if e["ph"] == "X"]
+    assert len(spans) == len(tracer.get_records())
+    outer = [e for e in spans if e["name"] == "get_text #a"][0]
+    inner = [e for e in spans if e["cat"] == "command"
+             and e["args"].get("locator") == "#a"]
+    assert inner
+    for event in inner:
+        assert outer["ts"] <= event["ts"]
+        assert event["ts"] + event["dur"] <= outer["ts"] + outer["dur"]
+
+
+def test_untraced_session_does_not_wrap_driver(server):
+    session = traced_session(server, None)
+    assert "execute" not in vars(session.get_driver_env().get_driver())
+    assert Selector(session, "#a").get_text() == "one"
+    session.close()
+
+
+def test_max_records():
+    tracer = Tracer(max_records=2)
+    for i in range(3):
+        tracer.record(str(i), "command", None, None, 0.0, 0.001)
+    assert [r.name for r in tracer.get_records()] == ["1", "2"]
+    assert tracer.get_chrome_trace()["otherData"]["dropped_records"] == 1
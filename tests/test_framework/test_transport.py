@@ -0,0 +1,161 @@
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from wdframework import DriverEnvironment, Selector, Session, TransportConfig
+from wdframework.transport import PooledRemoteConnection
+from wdframework.testing import FakeWebDriverServer
+
+PAGE = '<html><body><p id="a">one</p><p class="b">two</p></body></html>'
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer({"http://app/": PAGE}) as server:
+        yield server
+
+
+def test_commands_share_one_connection(server):
+    env = DriverEnvironment("chrome", transport=TransportConfig(pool_size=2),
+                            remote_url=server.get_url())
+    env.go_to_url("http://app/")
+    driver = env.get_driver()
+    for _ in range(20):
+        assert driver.find_element_by_id("a").text == "one"
+    executor = driver.command_executor
+    assert isinstance(executor, PooledRemoteConnection)
+    # Sequential commands never need more than one connection
+    # noinspection PyProtectedMember
+    assert executor._idle.qsize() == 1
+    stats = env.get_command_stats()
+    assert stats["findElement"]["count"] == 20
+    assert stats["findElement"]["retries"] == 0
+    assert 0 < stats["findElement"]["p50"] <= stats["findElement"]["max"]
+    env.close()
+    assert server.get_session_count() == 0
+
+
+def test_session_passes_transport_through(server):
+    session = Session("chrome", "http://app/", transport=TransportConfig(),
+                      remote_url=server.get_url())
+    session.start()
+    assert Selector(session, ".b").get_text() == "two"
+    assert "findElement" in session.get_driver_env().get_command_stats()
+    session.close()
+
+
+def test_stats_while_recording(server, tmp_path):
+    env = DriverEnvironment("chrome", transport=TransportConfig(),
+                            remote_url=server.get_url(),
+                            record_to=str(tmp_path / "session.jsonl"))
+    env.go_to_url("http://app/")
+    env.get_driver().find_element_by_id("a")
+    assert env.get_command_stats()["findElement"]["count"] == 1
+    env.close()
+
+
+def test_https_endpoint(server, monkeypatch):
+    connected = []
+
+    class FakeHTTPSConnection(http.client.HTTPConnection):
+        # Plain HTTP to the fake server, standing in for TLS
+        def __init__(self, host, port, **kwargs):
+            connected.append((host, port))
+            address = server.get_url().split("//")[1]
+            super().__init__(address, **kwargs)
+    monkeypatch.setattr(http.client, "HTTPSConnection", FakeHTTPSConnection)
+
+    connection = PooledRemoteConnection("https://grid.example/wd/hub",
+                                        resolve_ip=False)
+    response = connection.execute("status", {})
+    assert response["value"]["ready"]
+    assert connected == [("grid.example", 443)]
+
+
+def test_no_stats_without_transport(server):
+    env = DriverEnvironment("chrome", remote_url=server.get_url())
+    env.go_to_url("http://app/")
+    assert env.get_command_stats() == {}
+    env.close()
+
+
+def test_command_resent_after_idle_connection_closed(server):
+    env = DriverEnvironment("chrome", transport=TransportConfig(retries=0),
+                            remote_url=server.get_url())
+    env.go_to_url("http://app/")
+    element = env.get_driver().find_element_by_id("a")
+    server.reset_commands()
+    # The server closes the idle keep-alive connection before the click
+    server.drop_connections()
+    element.click()
+    assert [path for method, path in server.get_commands()
+            if method == "POST"] == \
+        ["/session/%s/element/%s/click" % (env.get_driver().session_id,
+                                           element.id)]
+    stats = env.get_command_stats()["clickElement"]
+    assert stats["failures"] == 0 and stats["count"] == 1
+    env.close()
+
+
+def _flaky_server(responses):
+    """
+    Serve one HTTP response per connection, except that the first connection
+    is reset after its request has been read.
+    """
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(4)
+    requests = []
+
+    def serve():
+        for index in range(responses + 1):
+            conn, _ = listener.accept()
+            requests.append(conn.recv(65536))
+            if index == 0:
+                conn.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                                b"\x01\x00\x00\x00\x00\x00\x00\x00")
+            else:
+                body = json.dumps({"value": {"ELEMENT": "e1"}}).encode()
+                conn.sendall(b"HTTP/1.1 200 OK\r\nConnection: close\r\n"
+                             b"Content-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s"
+                             % (len(body), body))
+            conn.close()
+        listener.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return "http://127.0.0.1:%d" % listener.getsockname()[1], requests
+
+
+def test_idempotent_command_retried_after_reset():
+    url, requests = _flaky_server(1)
+    connection = PooledRemoteConnection(url, TransportConfig(retries=1),
+                                        resolve_ip=False)
+    response = connection.execute("findElement", {
+        "sessionId": "s", "using": "id", "value": "a"})
+    assert response["value"] == {"ELEMENT": "e1"}
+    assert len(requests) == 2
+    assert connection.get_stats().get_stats()["findElement"]["retries"] == 1
+
+
+def test_non_idempotent_command_not_retried():
+    url, requests = _flaky_server(0)
+    connection = PooledRemoteConnection(url, TransportConfig(retries=1),
+                                        resolve_ip=False)
+    with pytest.raises(ConnectionError):
+        connection.execute("clickElement", {"sessionId": "s", "id": "e1"})
+    assert len(requests) == 1
+    stats = connection.get_stats().get_stats()["clickElement"]
+    assert stats["failures"] == 1 and stats["retries"] == 0
+
+
+def test_invalid_config():
+    with pytest.raises(ValueError):
+        TransportConfig(pool_size=0)
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import wdframework
+from wdframework.exceptions import TimeoutException
+from fake_driver import fake_session
+
+
+def test_intervals_back_off_to_cap():
+    policy = wdframework.WaitPolicy(interval=0.1, backoff=2, max_interval=0.5,
+                                    jitter=0)
+    intervals = policy.intervals()
+    assert [next(intervals) for _ in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+
+def test_jitter_stays_in_bounds():
+    policy = wdframework.WaitPolicy(interval=1, backoff=1, jitter=0.2)
+    intervals = policy.intervals()
+    assert all(0.8 <= next(intervals) <= 1.2 for _ in range(100))
+
+
+def test_poll_returns_as_soon_as_condition_holds():
+    stats = wdframework.wait.WaitStats()
+    results = iter([False, False, "done"])
+    policy = wdframework.WaitPolicy(interval=0.001, jitter=0)
+    assert policy.poll(lambda: next(results), "test", stats=stats) == "done"
+    assert stats.get_stats()["polls"] == 3
+    assert stats.get_stats()["timeouts"] == 0
+
+
+def test_timeout_message_reports_duration():
+    policy = wdframework.WaitPolicy(timeout=0.01, interval=0.001)
+    with pytest.raises(TimeoutException) as e:
+        policy.poll(lambda: False, "something")
+    assert "0.01 seconds" in str(e.value)
+
+
+def test_wait_until_treats_missing_element_as_not_ready():
+    session, driver = fake_session()
+    found = []
+
+    def find_element_by_css_selector(locator):
+        found.append(locator)
+        if len(found) < 3:
+            raise NoSuchElementException("not yet")
+        return "element"
+    driver.find_element_by_css_selector = find_element_by_css_selector
+
+    selector = wdframework.Selector(session, "#q")
+    selector.wait_until(lambda e: e == "element",
+                        policy=wdframework.WaitPolicy(interval=0.001))
+    assert len(found) == 3
+    assert session.get_wait_stats().get_stats()["polls"] == 3
+
+
+def test_wait_any_polls_all_selectors_in_one_script():
+    session, driver = fake_session()
+    driver.script_results.extend([[False, False], [False, True]])
+    a = wdframework.Selector(session, "#a")
+    b = wdframework.Selector(session, "//b", "xpath")
+    policy = wdframework.WaitPolicy(interval=0.001)
+
+    assert wdframework.Selector.wait_any([a, b], "visible",
+                                         policy=policy) is b
+    scripts = [c for c in driver.commands if c[0] == "execute_script"]
+    assert len(scripts) == 2
+    assert scripts[0][2] == ([["css_selector", "#a"], ["xpath", "//b"]],
+                             "visible")
+
+
+def test_wait_all_times_out():
+    session, driver = fake_session()
+    driver.script_results.extend([[True, False]] * 100)
+    a = wdframework.Selector(session, "#a")
+    b = wdframework.Selector(session, "#b")
+    policy = wdframework.WaitPolicy(interval=0.001)
+    with pytest.raises(TimeoutException):
+        wdframework.Selector.wait_all([a, b], timeout=0.01, policy=policy)
+    assert session.get_wait_stats().get_stats()["timeouts"] == 1
@@ -0,0 +1,99 @@
+import os
+import sys
+
+import pytest
+from selenium.common.exceptions import NoSuchWindowException, \
+    WebDriverException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import wdframework
+from wdframework.exceptions import TimeoutException
+from fake_driver import fake_session
+
+
+def _commands(driver, name):
+    return [c for c in driver.commands if c[0] == name]
+
+
+def test_wait_for_is_a_single_async_call():
+    session, driver = fake_session()
+    driver.async_script_results.append({"ok": True, "elapsed": 12})
+    selector = wdframework.Selector(session, "#status")
+    assert selector.wait_for("text", "Done", timeout=3) is selector
+
+    calls = _commands(driver, "execute_async_script")
+    assert len(calls) == 1
+    assert calls[0][2] == ("css_selector", "#status", "text", "Done", None,
+                           3000)
+    assert ("set_script_timeout", 8) in driver.commands
+    assert not _commands(driver, "execute_script")
+
+
+def test_wait_for_times_out():
+    session, driver = fake_session()
+    driver.async_script_results.append({"ok": False, "elapsed": 10})
+    with pytest.raises(TimeoutException):
+        wdframework.Selector(session, "#status").wait_for(timeout=0.01)
+    assert session.get_wait_stats().get_stats()["timeouts"] == 1
+
+
+def test_wait_for_falls_back_to_polling():
+    session, driver = fake_session()
+    driver.async_supported = False
+    driver.script_results.extend([[False, "old"], [True, "new"]])
+    policy = wdframework.WaitPolicy(interval=0.001)
+    selector = wdframework.Selector(session, "#status")
+    selector.wait_for("attribute", name="class", policy=policy)
+
+    calls = _commands(driver, "execute_script")
+    assert calls[0][2][5:] == (None, False)
+    assert calls[1][2][5:] == ("old", True)
+    assert not session.get_driver_env().supports_async_js()
+
+    # Once known to be unsupported, async scripts aren't tried again
+    driver.script_results.append([True, True])
+    selector.wait_for("visible", policy=policy)
+    assert len(_commands(driver, "execute_async_script")) == 1
+
+
+@pytest.mark.parametrize("error", [
+    WebDriverException("javascript error: document unloaded while waiting "
+                       "for result"),
+    NoSuchWindowException("no such window: target window already closed"),
+])
+def test_wait_for_raises_script_errors(error):
+    session, driver = fake_session()
+    driver.async_script_results.append(error)
+    with pytest.raises(type(error)):
+        wdframework.Selector(session, "#status").wait_for(timeout=1)
+    # An error of the script doesn't mean async scripts are unsupported
+    assert session.get_driver_env().supports_async_js()
+    assert not _commands(driver, "execute_script")
+
+
+def test_wait_for_polls_for_the_time_left(monkeypatch):
+    session, driver = fake_session()
+    clock = [100.0]
+    monkeypatch.setattr(wdframework.selector.time, "monotonic",
+                        lambda: clock[0])
+
+    def unsupported(script, *args):
+        clock[0] += 2
+        raise WebDriverException("unknown command: execute/async")
+    driver.execute_async_script = unsupported
+    policy = wdframework.WaitPolicy(interval=0.001)
+    timeouts = []
+    monkeypatch.setattr(policy, "poll",
+                        lambda check, description, timeout, stats:
+                        timeouts.append(timeout))
+    wdframework.Selector(session, "#status").wait_for(timeout=5,
+                                                      policy=policy)
+    assert timeouts == [3]
+    assert not session.get_driver_env().supports_async_js()
+
+
+def test_wait_for_requires_attribute_name():
+    session, driver = fake_session()
+    with pytest.raises(ValueError):
+        wdframework.Selector(session, "#q").wait_for("attribute", "x")
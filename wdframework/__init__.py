@@ -1,7 +1,20 @@
+from .action_batch import ActionBatch
+from .artifacts import ArtifactCollector
 from .driver_env import DriverEnvironment
+from .driver_pool import DriverPool
 from .loadables.loadable import Loadable
+from .loadables.locator import Locator
 from .loadables.page import Page
+from .perf import PerformanceLog
+from .profile import BrowserProfile
+from .remote import RemoteNode, RemoteScheduler
+from .runner import ParallelRunner
 from .selector import Selector
 from .session import Session
+from .store import MemoryBackend, SQLiteBackend, Store
+from .tabs import SharedBrowser
+from .tracing import Tracer
+from .transport import TransportConfig
+from .wait import WaitPolicy
 
 __version__ = "0.1"
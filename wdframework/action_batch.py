@@ -0,0 +1,332 @@
+import json
+import threading
+import time
+from typing import Iterable, Tuple
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorCode
+
+from . import scripts
+from .tracing import COMMAND
+
+# W3C WebDriver element reference key
+_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# Commands the individual Selector methods send per action: one to locate the
+# element and one to act on it
+_COMMANDS_PER_ACTION = 2
+
+# Actions that can be sent as real input through the W3C Actions endpoint
+_INPUT_ACTIONS = ("click", "send_keys")
+
+# Errors of drivers that don't have the Actions endpoint. They are returned
+# before anything is performed; any other error may come partway through
+_UNSUPPORTED = ErrorCode.UNKNOWN_COMMAND + ErrorCode.METHOD_NOT_ALLOWED
+
+
+class ActionBatch:
+    """
+    Queues clear, send_keys, click and submit actions across many Selectors
+    and performs them together on flush(), in the order they were queued.
+
+    Performed one at a time through Selector, every action costs two WebDriver
+    commands (locate the element, then act on it), so filling in a 40-field
+    form costs 160 commands. A batch performs consecutive actions with a
+    single script instead (see scripts.BATCH_JS), which sets values and fires
+    'input' and 'change' events, clicks with element.click() and submits like
+    WebDriver's submit atom.
+
+    Where a script can't have the same effect as WebDriver (special keys such
+    as Keys.ENTER, typing into anything but a text field, clicking an element
+    that isn't rendered), that action is performed through its Selector
+    instead, and the batch carries on after it.
+
+    With 'trusted_input', clicks and typing are sent as real input events
+    through the W3C Actions endpoint instead: one command to locate the
+    elements, and one to perform every consecutive click and key press. This
+    is for pages that ignore script-generated events. Keys go to whichever
+    element has focus, so a trusted send_keys clicks the element first (in
+    its top left corner) to focus it, with whatever effects a click has on
+    the page. Drivers that don't speak W3C, or don't have the Actions
+    endpoint, fall back to the Selector methods.
+
+    Queueing methods return the batch, so they can be chained. Used as a
+    context manager, the batch is flushed on exit unless an exception was
+    raised.
+    """
+
+    def __init__(self, session, trusted_input: bool = False):
+        """
+        :param session: The Session the Selectors belong to
+        :param trusted_input: Send clicks and typing as real input events
+            through the W3C Actions endpoint
+        """
+        self._session = session
+        self._trusted_input = trusted_input
+        self._queue = []
+        self._lock = threading.Lock()
+        self._stats = {"flushes": 0, "actions": 0, "commands": 0,
+                       "fallbacks": 0, "commands_saved": 0}
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._queue = []
+
+    # Queueing #
+
+    def clear(self, selector) -> "ActionBatch":
+        """
+        Queue clearing the element located by 'selector' of its value.
+
+        :param selector: The Selector
+
+        :return: This instance
+        """
+        return self._add("clear", selector)
+
+    def send_keys(self, selector, value) -> "ActionBatch":
+        """
+        Queue typing into the element located by 'selector'. With
+        'trusted_input', the element is clicked first to focus it.
+
+        :param selector: The Selector
+        :param value: The value to type
+
+        :return: This instance
+        """
+        return self._add("send_keys", selector, str(value))
+
+    def click(self, selector) -> "ActionBatch":
+        """
+        Queue clicking the element located by 'selector'.
+
+        :param selector: The Selector
+
+        :return: This instance
+        """
+        return self._add("click", selector)
+
+    def submit(self, selector) -> "ActionBatch":
+        """
+        Queue submitting the form of the element located by 'selector'.
+        Actions queued after a submit are performed after the form was
+        submitted.
+
+        :param selector: The Selector
+
+        :return: This instance
+        """
+        return self._add("submit", selector)
+
+    def fill(self, fields: Iterable[Tuple[object, str]]) -> "ActionBatch":
+        """
+        Queue replacing the values of several fields.
+
+        :param fields: (Selector, value) pairs
+
+        :return: This instance
+        """
+        for selector, value in fields:
+            self.clear(selector)
+            self.send_keys(selector, value)
+        return self
+
+    # Performing #
+
+    def flush(self) -> dict:
+        """
+        Perform every queued action, in order, and empty the queue.
+
+        :return: A dict with the number of 'actions' performed, the number of
+            'commands' sent, how many actions were performed through their
+            Selector instead ('fallbacks'), and 'commands_saved' compared to
+            performing every action through its Selector. Fallbacks are
+            counted as the two commands a Selector sends per action
+
+        :exception NoSuchElementException: If an element could not be found.
+            Actions queued before it have been performed, the ones after it
+            have not
+        """
+        with self._lock:
+            actions, self._queue = self._queue, []
+        stats = {"actions": len(actions), "commands": 0, "fallbacks": 0}
+        try:
+            position = 0
+            while position < len(actions):
+                if self._trusted_input and \
+                        actions[position][0] in _INPUT_ACTIONS:
+                    end = position
+                    while end < len(actions) and \
+                            actions[end][0] in _INPUT_ACTIONS:
+                        end += 1
+                    self._perform_input(actions[position:end], stats)
+                else:
+                    end = position
+                    while end < len(actions) and not (
+                            self._trusted_input and
+                            actions[end][0] in _INPUT_ACTIONS):
+                        end += 1
+                    end = position + self._perform_script(
+                        actions[position:end], stats)
+                position = end
+        finally:
+            stats["commands_saved"] = \
+                len(actions) * _COMMANDS_PER_ACTION - stats["commands"]
+            with self._lock:
+                self._stats["flushes"] += 1
+                for key, value in stats.items():
+                    self._stats[key] += value
+        return stats
+
+    def get_stats(self) -> dict:
+        """
+        :return: The totals of every flush: a dict with the number of flushes,
+            actions, commands, fallbacks and commands saved
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _add(self, kind, selector, text=None):
+        if selector.get_session() is not self._session:
+            raise ValueError("The Selector belongs to a different Session")
+        # Raises for scoped Selectors that can't be located by a script
+        selector.get_query()
+        with self._lock:
+            self._queue.append((kind, selector, text))
+        return self
+
+    def _perform_script(self, actions, stats) -> int:
+        """
+        Perform actions with BATCH_JS, up to and including the first one that
+        has to fall back to its Selector.
+
+        :return: The number of actions performed
+        """
+        result = self._session.get_driver_env().execute_js(
+            False, scripts.BATCH_JS,
+            [[[kind, q.by, q.locator, text]
+              for kind, q, text in _queries(actions)]])
+        stats["commands"] += 1
+        done = result["done"]
+        if result["status"] == "missing":
+            _raise_missing(actions[done][1])
+        if result["status"] == "fallback":
+            self._fallback(actions[done], stats)
+            done += 1
+        return done
+
+    def _perform_input(self, actions, stats):
+        """
+        Perform clicks and typing as real input through the W3C Actions
+        endpoint, or through their Selectors if the driver can't.
+        """
+        driver = self._session.get_driver_env().get_driver()
+        if getattr(driver, "w3c", False):
+            elements = self._session.get_driver_env().execute_js(
+                False, scripts.FIND_EACH_JS,
+                [[[q.by, q.locator] for _, q, _ in _queries(actions)]])
+            stats["commands"] += 1
+            for (_, selector, _), element in zip(actions, elements):
+                if element is None:
+                    _raise_missing(selector)
+            # Sent without WebDriver.execute(), which would turn every error
+            # into the same WebDriverException; traced here instead
+            start = time.perf_counter()
+            response = driver.command_executor.execute(
+                Command.W3C_ACTIONS,
+                {"sessionId": driver.session_id,
+                 "actions": _input_sources(actions,
+                                           [e.id for e in elements])})
+            stats["commands"] += 1
+            tracer = self._session.get_tracer()
+            if tracer is not None:
+                span = tracer.current_span()
+                tracer.record(Command.W3C_ACTIONS, COMMAND,
+                              span.locator if span else None,
+                              span.owner if span else None, start,
+                              time.perf_counter() - start)
+            if not _unsupported(response):
+                driver.error_handler.check_response(response)
+                return
+        for action in actions:
+            self._fallback(action, stats)
+
+    @staticmethod
+    def _fallback(action, stats):
+        kind, selector, text = action
+        method = getattr(selector, kind)
+        if text is None:
+            method()
+        else:
+            method(text)
+        stats["fallbacks"] += 1
+        stats["commands"] += _COMMANDS_PER_ACTION
+
+
+def _queries(actions):
+    # Scoped Selectors are located by their locator combined with their
+    # container's
+    return [(kind, s.get_query(), text) for kind, s, text in actions]
+
+
+def _unsupported(response) -> bool:
+    """
+    Whether a raw response says the driver doesn't know the command at all.
+    """
+    status = response.get("status")
+    value = response.get("value")
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            # Not a WebDriver error; a server without the route at all
+            return status in (404, 405, 501)
+    if isinstance(value, dict):
+        if isinstance(value.get("value"), dict):
+            value = value["value"]
+        status = value.get("error", value.get("status", status))
+    return status in _UNSUPPORTED
+
+
+def _raise_missing(selector):
+    raise NoSuchElementException(
+        "Unable to locate element: {\"method\":\"%s\",\"selector\":\"%s\"}"
+        % (selector.get_by(), selector.get_locator()))
+
+
+def _input_sources(actions, element_ids) -> list:
+    """
+    Build W3C input sources for clicks and typing. Every action on one source
+    is paired with a pause on the other, so both advance tick by tick.
+    """
+    pointer = []
+    keys = []
+    pause = {"type": "pause", "duration": 0}
+    for (kind, _, text), element_id in zip(actions, element_ids):
+        # Keys go to the focused element, so it is clicked before typing
+        # into it
+        pointer.extend([
+            {"type": "pointerMove", "duration": 0, "x": 0, "y": 0,
+             "origin": {_ELEMENT_KEY: element_id}},
+            {"type": "pointerDown", "button": 0},
+            {"type": "pointerUp", "button": 0}])
+        keys.extend([pause] * 3)
+        if kind == "send_keys":
+            for char in text:
+                keys.extend([{"type": "keyDown", "value": char},
+                             {"type": "keyUp", "value": char}])
+                pointer.extend([pause] * 2)
+    return [
+        {"type": "pointer", "id": "wdf-mouse",
+         "parameters": {"pointerType": "mouse"}, "actions": pointer},
+        {"type": "key", "id": "wdf-keyboard", "actions": keys},
+    ]
@@ -0,0 +1,4 @@
+from .driver_env import AsyncDriverEnvironment
+from .http import HttpClient
+from .selector import AsyncSelector
+from .session import AsyncSession
@@ -0,0 +1,250 @@
+import asyncio
+
+from selenium.common.exceptions import InvalidSelectorException, \
+    NoSuchElementException, NoSuchWindowException, \
+    StaleElementReferenceException, TimeoutException, WebDriverException
+
+from ..exceptions import DriverEnvironmentException
+from .http import HttpClient
+
+# The W3C WebDriver element reference key
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# W3C error codes that map onto a more specific Selenium exception, so that
+# code handling errors works the same for Selector and AsyncSelector
+_ERRORS = {
+    "no such element": NoSuchElementException,
+    "stale element reference": StaleElementReferenceException,
+    "invalid selector": InvalidSelectorException,
+    "no such window": NoSuchWindowException,
+    "timeout": TimeoutException,
+    "script timeout": TimeoutException,
+}
+
+
+class AsyncDriverEnvironment:
+    """
+    Asynchronous counterpart to DriverEnvironment that speaks the W3C
+    WebDriver protocol directly to a WebDriver server (chromedriver,
+    geckodriver, a Selenium server, ...) over a non-blocking HTTP client, so
+    that a single event loop can drive many browsers at once.
+
+    Unlike DriverEnvironment, the WebDriver server must already be running;
+    this class only creates and deletes sessions on it. Element references are
+    plain W3C element ids (strings).
+    """
+
+    def __init__(self, remote_url: str, capabilities: dict = None,
+                 client: HttpClient = None):
+        """
+        :param remote_url: Base URL of the WebDriver server
+        :param capabilities: Capabilities to request for the new session
+        :param client: HttpClient to share between environments. A private one
+            is created (and closed with this environment) if not given
+        """
+        self._remote_url = remote_url.rstrip("/")
+        self._capabilities = capabilities or {}
+        self._client = client or HttpClient()
+        self._owns_client = client is None
+        self._session_id = None
+        self._start_lock = None
+        self._closed = False
+
+    async def start(self):
+        """
+        Create the WebDriver session. Called implicitly by the first command;
+        concurrent first commands share one session.
+
+        :exception WebDriverException: If the session could not be created
+        """
+        if self._session_id is not None:
+            return
+        # Created here rather than in __init__, so that it belongs to the
+        # running event loop
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._session_id is not None:
+                return
+            if self._closed:
+                raise DriverEnvironmentException(
+                    "The DriverEnvironment is closed")
+            value = await self._send("POST", "/session", {
+                "capabilities": {"alwaysMatch": self._capabilities},
+                "desiredCapabilities": self._capabilities})
+            session_id = value.get("sessionId")
+            if session_id is None:
+                raise WebDriverException("Server did not return a session id")
+            self._session_id = session_id
+
+    def get_session_id(self) -> str:
+        """
+        :return: The WebDriver session id, or 'None' if not started
+        """
+        return self._session_id
+
+    async def execute(self, method: str, command: str, payload: dict = None):
+        """
+        Send a command for this environment's WebDriver session.
+
+        :param method: HTTP method
+        :param command: Path of the command relative to the session, e.g.
+            '/url' or '/element/<id>/click'
+        :param payload: JSON body of the command
+
+        :return: The 'value' of the response
+
+        :exception WebDriverException: (or a subclass) If the command failed
+        """
+        if self._closed:
+            raise DriverEnvironmentException("The DriverEnvironment is closed")
+        await self.start()
+        if payload is None and method == "POST":
+            payload = {}
+        return await self._send(
+            method, "/session/%s%s" % (self._session_id, command), payload)
+
+    async def _send(self, method, path, payload):
+        status, body = await self._client.request(
+            method, self._remote_url + path, payload)
+        value = body.get("value") if isinstance(body, dict) else None
+        if status >= 400 or (isinstance(value, dict) and "error" in value):
+            error = value.get("error", "unknown error") \
+                if isinstance(value, dict) else "unknown error"
+            message = value.get("message", error) \
+                if isinstance(value, dict) else str(body)
+            raise _ERRORS.get(error, WebDriverException)(message)
+        return value
+
+    # Navigation #
+
+    async def go_to_url(self, url: str):
+        """
+        Navigate the browser to a supplied URL.
+
+        :param url: URL to navigate to
+
+        :exception WebDriverException: If the URL could not be navigated to
+        """
+        try:
+            await self.execute("POST", "/url", {"url": url})
+        except WebDriverException as e:
+            raise type(e)("".join([e.msg or "", "\nAttempted URL: ", url]))
+
+    async def back(self):
+        """
+        Navigate one step backward in the browser history.
+        """
+        await self.execute("POST", "/back")
+
+    async def forward(self):
+        """
+        Navigate one step forward in the browser history.
+        """
+        await self.execute("POST", "/forward")
+
+    async def refresh(self):
+        """
+        Refresh the current page.
+        """
+        await self.execute("POST", "/refresh")
+
+    async def get_title(self) -> str:
+        """
+        :return: The title of the current page
+        """
+        return await self.execute("GET", "/title")
+
+    async def get_current_url(self) -> str:
+        """
+        :return: The URL of the current page
+        """
+        return await self.execute("GET", "/url")
+
+    async def execute_js(self, asynchronous: bool, js: str, args=None):
+        """
+        Execute arbitrary JavaScript in the current window or frame. The same
+        caveats as DriverEnvironment.execute_js apply.
+
+        :param asynchronous: Whether the JS should be executed asynchronously
+        :param js: JavaScript to execute
+        :param args: List of arguments to pass into the JavaScript
+
+        :return: What the script returned, with elements as element ids
+        """
+        value = await self.execute(
+            "POST", "/execute/async" if asynchronous else "/execute/sync",
+            {"script": js, "args": list(args or [])})
+        return _unwrap(value)
+
+    # Elements #
+
+    async def find_element(self, using: str, value: str,
+                           parent: str = None) -> str:
+        """
+        Locate an element.
+
+        :param using: W3C locator strategy ('css selector', 'xpath', ...)
+        :param value: The locator
+        :param parent: Element id to search inside of, instead of the document
+
+        :return: The element id
+
+        :exception NoSuchElementException: If no element could be found
+        """
+        prefix = "/element/%s" % parent if parent else ""
+        found = await self.execute("POST", prefix + "/element",
+                                   {"using": using, "value": value})
+        return found[ELEMENT_KEY]
+
+    async def find_elements(self, using: str, value: str,
+                            parent: str = None) -> list:
+        """
+        Locate every matching element.
+
+        :param using: W3C locator strategy ('css selector', 'xpath', ...)
+        :param value: The locator
+        :param parent: Element id to search inside of, instead of the document
+
+        :return: The element ids, possibly empty
+        """
+        prefix = "/element/%s" % parent if parent else ""
+        found = await self.execute("POST", prefix + "/elements",
+                                   {"using": using, "value": value})
+        return [f[ELEMENT_KEY] for f in found]
+
+    async def element_command(self, method: str, element: str,
+                              command: str, payload: dict = None):
+        """
+        Send a command for an element, e.g. ('GET', id, '/text').
+
+        :return: The 'value' of the response
+        """
+        return await self.execute(method, "/element/%s%s" % (element,
+                                                             command), payload)
+
+    async def close(self):
+        """
+        Delete the WebDriver session (quitting the browser) and close the HTTP
+        client if this environment owns it.
+        """
+        if self._closed:
+            return
+        try:
+            if self._session_id is not None:
+                await self._send("DELETE", "/session/%s" % self._session_id,
+                                 None)
+        finally:
+            self._closed = True
+            if self._owns_client:
+                await self._client.close()
+
+
+def _unwrap(value):
+    if isinstance(value, dict):
+        if ELEMENT_KEY in value:
+            return value[ELEMENT_KEY]
+        return {k: _unwrap(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_unwrap(v) for v in value]
+    return value
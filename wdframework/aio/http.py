@@ -0,0 +1,142 @@
+import asyncio
+import json
+from collections import deque
+from urllib.parse import urlsplit
+
+
+class _Connection:
+    __slots__ = ("reader", "writer")
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class HttpClient:
+    """
+    A minimal non-blocking HTTP/1.1 client for JSON APIs, built on asyncio
+    streams. Connections are kept alive and reused, with at most 'pool_size'
+    connections open per host at a time; further requests wait for a
+    connection to be returned.
+
+    Only what the WebDriver wire protocol needs is supported: plain HTTP, JSON
+    request and response bodies, Content-Length and chunked responses.
+    """
+
+    def __init__(self, pool_size: int = 8, timeout: float = 60.0):
+        """
+        :param pool_size: Maximum number of connections per host
+        :param timeout: Seconds to wait for a response before giving up
+        """
+        self._pool_size = pool_size
+        self._timeout = timeout
+        self._idle = {}
+        self._slots = {}
+
+    async def request(self, method: str, url: str, payload=None):
+        """
+        Send a request and read the response.
+
+        :param method: HTTP method
+        :param url: Absolute 'http://' URL
+        :param payload: Object to send as the JSON body, or 'None'
+
+        :return: (status code, parsed JSON body or 'None')
+
+        :exception asyncio.TimeoutError: If no response arrived in time
+        :exception OSError: If the connection failed
+        """
+        parts = urlsplit(url)
+        key = (parts.hostname, parts.port or 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        head = ("%s %s HTTP/1.1\r\nHost: %s:%d\r\n"
+                "Accept: application/json\r\n"
+                "Content-Type: application/json;charset=UTF-8\r\n"
+                "Content-Length: %d\r\nConnection: keep-alive\r\n\r\n"
+                % (method, path, key[0], key[1], len(body))).encode("ascii")
+
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = asyncio.Semaphore(self._pool_size)
+        async with slots:
+            idle = self._idle.setdefault(key, deque())
+            reused = bool(idle)
+            connection = idle.pop() if reused else await self._connect(key)
+            try:
+                status, data, keep = await asyncio.wait_for(
+                    self._exchange(connection, head + body), self._timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection.close()
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; retry once
+                # on a fresh one
+                connection = await self._connect(key)
+                try:
+                    status, data, keep = await asyncio.wait_for(
+                        self._exchange(connection, head + body),
+                        self._timeout)
+                except BaseException:
+                    connection.close()
+                    raise
+            except BaseException:
+                connection.close()
+                raise
+            if keep:
+                idle.append(connection)
+            else:
+                connection.close()
+        return status, json.loads(data.decode("utf-8")) if data else None
+
+    async def close(self):
+        """
+        Close every idle connection.
+        """
+        for idle in self._idle.values():
+            while idle:
+                idle.pop().close()
+
+    async def _connect(self, key):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(key[0], key[1]), self._timeout)
+        return _Connection(reader, writer)
+
+    @staticmethod
+    async def _exchange(connection, request: bytes):
+        connection.writer.write(request)
+        await connection.writer.drain()
+        reader = connection.reader
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            # No framing: the body ends when the server closes the connection
+            return status, await reader.read(), False
+        keep = headers.get("connection", "").lower() != "close"
+        return status, data, keep
@@ -0,0 +1,215 @@
+from typing import List
+
+from selenium.common.exceptions import NoSuchElementException, \
+    StaleElementReferenceException
+
+from ..locator import compile_locator
+from ..wait import WaitPolicy
+from .session import AsyncSession
+
+
+def to_w3c(by: str, locator: str):
+    """
+    Translate a Selector 'by' string and locator into a W3C locator strategy
+    and value.
+
+    :return: (strategy, value)
+
+    :exception ValueError: If 'by' is not a known 'by' string
+    """
+    compiled = compile_locator(by, locator)
+    return compiled.strategy, compiled.value
+
+
+class AsyncSelector(object):
+    """
+    Asynchronous counterpart to Selector. Like Selector, the element is
+    located again on every call, and every method is a coroutine.
+    """
+
+    def __init__(self, session: AsyncSession, locator: str,
+                 by: str = "css_selector"):
+        self.__session = session
+        self.__locator = locator
+        self.__by = by.lower()
+        self.__strategy, self.__value = to_w3c(self.__by, locator)
+
+    def get_locator(self) -> str:
+        """
+        :return: Locator string
+        """
+        return self.__locator
+
+    def get_by(self) -> str:
+        """
+        :return: The 'by' type (css, xpath, etc)
+        """
+        return self.__by
+
+    def get_session(self) -> AsyncSession:
+        """
+        :return: The Session this Selector is part of
+        """
+        return self.__session
+
+    async def get(self) -> str:
+        """
+        Attempt to get an element from the page.
+
+        :return: The element id of the element found
+
+        :exception NoSuchElementException: If no element could be found
+        """
+        return await self.__session.get_driver_env().find_element(
+            self.__strategy, self.__value)
+
+    async def get_multiple(self) -> List[str]:
+        """
+        Attempt to get multiple elements from the page.
+
+        :return: The element ids of the elements found
+        """
+        return await self.__session.get_driver_env().find_elements(
+            self.__strategy, self.__value)
+
+    async def __element(self, method: str, command: str,
+                        payload: dict = None):
+        element = await self.get()
+        return await self.__session.get_driver_env().element_command(
+            method, element, command, payload)
+
+    # Web Element Information #
+
+    async def is_present(self) -> bool:
+        """
+        :return: True if the element is present, False otherwise
+        """
+        try:
+            await self.get()
+            return True
+        except NoSuchElementException:
+            return False
+
+    async def is_displayed(self) -> bool:
+        """
+        :return: True if the element is displayed, False otherwise
+        """
+        return await self.__element("GET", "/displayed")
+
+    async def is_enabled(self) -> bool:
+        """
+        :return: True if the element is enabled, False otherwise
+        """
+        return await self.__element("GET", "/enabled")
+
+    async def is_selected(self) -> bool:
+        """
+        :return: True if the element is selected, False otherwise
+        """
+        return await self.__element("GET", "/selected")
+
+    async def get_attribute(self, name: str) -> str:
+        """
+        :param name: The name of the attribute
+
+        :return: The value of the attribute
+        """
+        return await self.__element("GET", "/attribute/%s" % name)
+
+    async def get_tag_name(self) -> str:
+        """
+        :return: The tag name
+        """
+        return await self.__element("GET", "/name")
+
+    async def get_text(self) -> str:
+        """
+        Get the visible text of the element, falling back to its value the
+        same way Selector.get_text() does.
+
+        :return: The visible text
+        """
+        element = await self.get()
+        driver_env = self.__session.get_driver_env()
+        text = await driver_env.element_command("GET", element, "/text")
+        if text is None or text == "":
+            text = await driver_env.element_command("GET", element,
+                                                    "/property/value")
+        return text
+
+    async def get_rect(self) -> dict:
+        """
+        :return: The rectangle of the element
+        """
+        return await self.__element("GET", "/rect")
+
+    # Web Element Actions #
+
+    async def clear(self):
+        """
+        Clear the element of its current value.
+
+        :return: This instance
+        """
+        await self.__element("POST", "/clear")
+        return self
+
+    async def click(self):
+        """
+        Click the element.
+
+        :return: This instance
+        """
+        await self.__element("POST", "/click")
+        return self
+
+    async def send_keys(self, value: str):
+        """
+        Send keys (type into) the element.
+
+        :param value: The value to type into the element
+
+        :return: This instance
+        """
+        await self.__element("POST", "/value",
+                             {"text": value, "value": list(value)})
+        return self
+
+    # Waiting #
+
+    async def wait_until(self, condition, timeout: float = None,
+                         policy: WaitPolicy = None):
+        """
+        Wait for a condition on this Selector to hold, sleeping on the event
+        loop between checks so other Sessions keep running.
+
+        'condition' is called with this AsyncSelector and may be a plain
+        function or a coroutine function, e.g.
+        ``await selector.wait_until(AsyncSelector.is_displayed)``. While the
+        element is not present (or goes stale), the condition is treated as
+        not yet satisfied.
+
+        :param condition: Function taking this AsyncSelector
+        :param timeout: Seconds to wait, overriding the policy's timeout
+        :param policy: WaitPolicy to use instead of the Session's
+
+        :return: This instance
+
+        :raises TimeoutException: If the condition did not hold before the
+            timeout expired
+        """
+        async def check():
+            try:
+                result = condition(self)
+                if hasattr(result, "__await__"):
+                    result = await result
+                return result
+            except (NoSuchElementException, StaleElementReferenceException):
+                return False
+
+        policy = policy or self.__session.get_wait_policy()
+        await policy.poll_async(
+            check, "element matching '%s' to match the condition"
+                   % self.__locator,
+            timeout, self.__session.get_wait_stats())
+        return self
@@ -0,0 +1,98 @@
+from ..exceptions import SessionException
+from ..store import Store
+from ..wait import WaitPolicy, WaitStats
+from .driver_env import AsyncDriverEnvironment
+from .http import HttpClient
+
+
+class AsyncSession:
+    """
+    Asynchronous counterpart to Session: creates, stores, and maintains the
+    environment and data for a single test driven from an asyncio event loop.
+
+    Can be used as an async context manager, which starts the Session on entry
+    and closes it on exit.
+    """
+
+    def __init__(self, browser: str, host: str, remote_url: str,
+                 capabilities: dict = None, wait_policy: WaitPolicy = None,
+                 client: HttpClient = None):
+        """
+        :param browser: Browser name to request, e.g. 'chrome'
+        :param host: URL the Session navigates to when started
+        :param remote_url: Base URL of the WebDriver server
+        :param capabilities: Additional capabilities to request
+        :param wait_policy: Default WaitPolicy for AsyncSelector waits
+        :param client: HttpClient to share between Sessions
+        """
+        capabilities = dict(capabilities or {})
+        capabilities.setdefault("browserName", browser.lower())
+        self._store = Store()
+        self._driver_env = AsyncDriverEnvironment(remote_url, capabilities,
+                                                  client)
+        self._host = host
+        self._wait_policy = wait_policy or WaitPolicy()
+        self._wait_stats = WaitStats()
+        self.__closed = False
+
+    async def start(self):
+        """
+        Create the WebDriver session and navigate to the host.
+        """
+        await self._driver_env.go_to_url(self._host)
+
+    def get_store(self) -> Store:
+        """
+        Get the Store associated with this Session.
+
+        :return: The Store associated with this Session
+        """
+        if self.__closed:
+            raise SessionException("This Session has been closed")
+        return self._store
+
+    def get_host(self) -> str:
+        """
+        Get the host associated with this Session.
+
+        :return: The host associated with this Session.
+        """
+        if self.__closed:
+            raise SessionException("This Session has been closed")
+        return self._host
+
+    def get_driver_env(self) -> AsyncDriverEnvironment:
+        """
+        Get the AsyncDriverEnvironment associated with this Session.
+
+        :return: The AsyncDriverEnvironment associated with this Session.
+        """
+        if self.__closed:
+            raise SessionException("This Session has been closed")
+        return self._driver_env
+
+    def get_wait_policy(self) -> WaitPolicy:
+        """
+        :return: The default WaitPolicy for waits in this Session
+        """
+        return self._wait_policy
+
+    def get_wait_stats(self) -> WaitStats:
+        """
+        :return: The counters for waits performed in this Session
+        """
+        return self._wait_stats
+
+    async def close(self):
+        """
+        Close this Session. (Deletes the WebDriver session.)
+        """
+        self.__closed = True
+        await self._driver_env.close()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,288 @@
+import atexit
+import base64
+import gzip
+import json
+import os
+import re
+import struct
+import threading
+import time
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from selenium.common.exceptions import WebDriverException
+
+from .driver_env import DriverEnvironment
+from .exceptions import ArtifactException
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Collectors that still have writes to finish when the interpreter exits
+_collectors = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for collector in list(_collectors):
+        collector.close()
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._") or "artifact"
+
+
+def optimize_png(data: bytes) -> bytes:
+    """
+    Losslessly shrink a PNG by recompressing its image data at the highest
+    zlib level, as one IDAT chunk. Screenshots from browser drivers are
+    compressed for speed rather than size, so this usually saves a good part
+    of the file.
+
+    :param data: The PNG
+
+    :return: The smaller PNG, or 'data' unchanged if it isn't a PNG or can't
+        be made smaller
+    """
+    if not data.startswith(_PNG_SIGNATURE):
+        return data
+    chunks = []
+    image = []
+    offset = len(_PNG_SIGNATURE)
+    try:
+        while offset < len(data):
+            length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+            body = data[offset + 8:offset + 8 + length]
+            offset += 12 + length
+            if kind == b"IDAT":
+                if not image:
+                    chunks.append(None)
+                image.append(body)
+            else:
+                chunks.append((kind, body))
+        pixels = zlib.decompress(b"".join(image))
+    except (struct.error, zlib.error):
+        return data
+    compressed = zlib.compress(pixels, 9)
+    optimized = [_PNG_SIGNATURE]
+    for chunk in chunks:
+        kind, body = (b"IDAT", compressed) if chunk is None else chunk
+        optimized.append(struct.pack(">I", len(body)) + kind + body +
+                         struct.pack(">I", zlib.crc32(kind + body)))
+    optimized = b"".join(optimized)
+    return optimized if len(optimized) < len(data) else data
+
+
+class ArtifactCollector:
+    """
+    Captures screenshots, page source and browser logs, such as when a test
+    fails, without making the test wait for them to be written.
+
+    capture() only fetches the raw data from the browser, which has to
+    happen before the Session is closed. Compressing it (optimize_png() for
+    screenshots, gzip for page source and logs) and writing it to disk is
+    left to a pool of background threads. Captured data waiting to be written
+    is limited to 'max_pending' bytes; capture() blocks while the limit is
+    exceeded, so a burst of failures can't use up the memory.
+
+    Pending writes are finished by flush(), close(), and when the process
+    exits.
+    """
+
+    def __init__(self, directory: str, workers: int = 2,
+                 max_pending: int = 64 * 1024 * 1024,
+                 compress_level: int = 6):
+        """
+        :param directory: Directory to write artifacts to; created if it
+            doesn't exist
+        :param workers: Number of background threads compressing and writing
+        :param max_pending: Bytes of captured data allowed to wait for a
+            worker before capture() blocks
+        :param compress_level: gzip level for page source and logs
+        """
+        self._directory = directory
+        self._workers = workers
+        self._max_pending = max_pending
+        self._compress_level = compress_level
+        self._condition = threading.Condition()
+        self._pending = 0
+        self._writes = 0
+        self._names = {}
+        self._executor = None
+        self._closed = False
+        self._stats = {"captures": 0, "files": 0, "failures": 0,
+                       "bytes_captured": 0, "bytes_written": 0,
+                       "capture_time": 0.0, "write_time": 0.0}
+        os.makedirs(directory, exist_ok=True)
+
+    def get_directory(self) -> str:
+        """
+        :return: The directory artifacts are written to
+        """
+        return self._directory
+
+    def capture(self, driver_env: DriverEnvironment, name: str,
+                screenshot: bool = True, source: bool = True,
+                logs: Iterable[str] = ("browser",)) -> list:
+        """
+        Fetch artifacts from the browser and queue them to be written. Only
+        the WebDriver commands fetching the data run on the caller's thread.
+        Artifacts the driver doesn't support (such as logs on W3C drivers)
+        are skipped.
+
+        :param driver_env: The DriverEnvironment of the browser
+        :param name: Name for the artifacts' files, such as the test's name.
+            If the name was used before, a number is appended
+        :param screenshot: Capture a screenshot, written as '<name>.png'
+        :param source: Capture the page source, written as '<name>.html.gz'
+        :param logs: Types of log to capture, each written as
+            '<name>.<type>.log.json.gz'
+
+        :return: Paths of the files that will be written
+
+        :exception ArtifactException: If the collector is closed
+        """
+        start = time.perf_counter()
+        with self._condition:
+            self._check_open()
+        base = os.path.join(self._directory, self._unique(_file_name(name)))
+        driver = driver_env.get_driver()
+        artifacts = []
+        if screenshot:
+            data = self._fetch(driver.get_screenshot_as_base64)
+            if data is not None:
+                artifacts.append((base + ".png", "png",
+                                  base64.b64decode(data)))
+        if source:
+            data = self._fetch(lambda: driver.page_source)
+            if data is not None:
+                artifacts.append((base + ".html.gz", "gzip",
+                                  data.encode("utf-8")))
+        for log in logs:
+            data = self._fetch(lambda: driver.get_log(log))
+            if data is not None:
+                artifacts.append((base + ".%s.log.json.gz" % _file_name(log),
+                                  "gzip", json.dumps(data).encode("utf-8")))
+        with self._condition:
+            self._stats["captures"] += 1
+            self._stats["capture_time"] += time.perf_counter() - start
+        for path, kind, data in artifacts:
+            self._submit(path, kind, data)
+        return [path for path, _, _ in artifacts]
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait for every queued artifact to be written.
+
+        :param timeout: Seconds to wait at most; 'None' waits until done
+
+        :return: True if everything was written, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._writes == 0,
+                                            timeout)
+
+    def close(self):
+        """
+        Write every queued artifact and stop the background threads. Called
+        when the process exits. Captures still in progress raise
+        ArtifactException.
+        """
+        with self._condition:
+            self._closed = True
+            # Wake captures waiting for room; they will see it's closed
+            self._condition.notify_all()
+        self.flush()
+        with self._condition:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+        _collectors.discard(self)
+
+    def get_stats(self) -> dict:
+        """
+        :return: A dict with the number of captures, files written and failed
+            writes, the bytes captured and written, the bytes waiting to be
+            written, and the seconds spent capturing (on the callers' threads)
+            and compressing and writing (on the background threads)
+        """
+        with self._condition:
+            stats = dict(self._stats)
+            stats["pending"] = self._pending
+            return stats
+
+    @staticmethod
+    def _fetch(command):
+        try:
+            return command()
+        except WebDriverException:
+            return None
+
+    def _unique(self, name: str) -> str:
+        with self._condition:
+            count = self._names.get(name, 0) + 1
+            self._names[name] = count
+        return name if count == 1 else "%s-%d" % (name, count)
+
+    def _check_open(self):
+        # Must be called with the condition held
+        if self._closed:
+            raise ArtifactException("The ArtifactCollector is closed")
+
+    def _submit(self, path: str, kind: str, data: bytes):
+        size = len(data)
+        with self._condition:
+            # One artifact larger than the limit is still let through alone
+            self._condition.wait_for(
+                lambda: self._closed or self._pending == 0 or
+                self._pending + size <= self._max_pending)
+            # Submitted with the condition held, so close() can't shut the
+            # executor down in between
+            self._check_open()
+            self._pending += size
+            self._writes += 1
+            self._stats["bytes_captured"] += size
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self._workers, "wdframework-artifacts")
+                _collectors.add(self)
+            self._executor.submit(self._write, path, kind, data)
+
+    def _write(self, path: str, kind: str, data: bytes):
+        start = time.perf_counter()
+        size = len(data)
+        written = None
+        try:
+            if kind == "png":
+                data = optimize_png(data)
+            else:
+                data = gzip.compress(data, self._compress_level)
+            temporary = path + ".tmp"
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)
+            written = len(data)
+        except Exception:
+            # Losing an artifact mustn't take the run down with it
+            pass
+        finally:
+            with self._condition:
+                self._pending -= size
+                self._writes -= 1
+                if written is None:
+                    self._stats["failures"] += 1
+                else:
+                    self._stats["files"] += 1
+                    self._stats["bytes_written"] += written
+                self._stats["write_time"] += time.perf_counter() - start
+                self._condition.notify_all()
+
+    def __getstate__(self):
+        # Each process gets its own threads; queued writes stay behind
+        return {"directory": self._directory, "workers": self._workers,
+                "max_pending": self._max_pending,
+                "compress_level": self._compress_level}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
@@ -0,0 +1,672 @@
+# A small, dependency-free HTML DOM and CSS selector engine, used wherever the
+# framework needs to query HTML without a round trip to the browser.
+#
+# This is not a browser: there is no layout and no scripting, and only the
+# parts of CSS selector syntax commonly used to locate elements are supported:
+# type, universal, id, class and attribute selectors; descendant, child and
+# sibling combinators; selector lists; :first-child, :last-child,
+# :nth-child(<integer>) and :not(<compound selector>). XPath is limited to
+# location paths that select elements, see compile_xpath(). Anything else
+# (such as :nth-of-type, :checked or XPath axes and functions other than
+# those listed) raises ValueError rather than matching the wrong elements.
+
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import Iterator, List
+
+# Elements that never have children or an end tag
+_VOID_ELEMENTS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr"))
+
+# Elements whose text is not HTML-escaped
+_RAW_TEXT_ELEMENTS = frozenset(("script", "style"))
+
+# Elements whose end tag may be omitted when a sibling of the same kind starts
+_AUTO_CLOSE = {
+    "li": ("li",), "p": ("p",), "option": ("option",), "tr": ("tr",),
+    "td": ("td", "th"), "th": ("td", "th"), "dt": ("dt", "dd"),
+    "dd": ("dt", "dd"),
+}
+
+
+class Comment(str):
+    """
+    An HTML comment node; the string is the comment's text.
+    """
+    __slots__ = ()
+
+
+class Element(object):
+    """
+    An element node. Children are Elements, Comments, or plain strings (text).
+    """
+    __slots__ = ("tag", "attrs", "children", "parent", "__weakref__")
+
+    def __init__(self, tag: str, attrs: dict = None, parent=None):
+        self.tag = tag
+        self.attrs = attrs if attrs is not None else {}
+        self.children = []
+        self.parent = parent
+
+    def __repr__(self):
+        return "<%s%s>" % (self.tag, "".join(
+            ' %s="%s"' % item for item in self.attrs.items()))
+
+    def get_id(self) -> str:
+        """
+        :return: The element's id, or 'None'
+        """
+        return self.attrs.get("id")
+
+    def get_classes(self) -> List[str]:
+        """
+        :return: The element's CSS classes
+        """
+        return self.attrs.get("class", "").split()
+
+    def element_children(self) -> List["Element"]:
+        """
+        :return: The children of this element that are elements
+        """
+        return [c for c in self.children if isinstance(c, Element)]
+
+    def iter(self) -> Iterator["Element"]:
+        """
+        Iterate over this element's descendant elements in document order
+        (not including this element).
+        """
+        stack = list(reversed(self.element_children()))
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed(element.element_children()))
+
+    def iter_comments(self) -> Iterator[Comment]:
+        """
+        Iterate over every comment below this element in document order.
+        """
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Comment):
+                yield node
+            elif isinstance(node, Element):
+                stack.extend(reversed(node.children))
+
+    def text_content(self) -> str:
+        """
+        :return: The concatenated text of this element and its descendants
+        """
+        parts = []
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Element):
+                stack.extend(reversed(node.children))
+            elif not isinstance(node, Comment):
+                parts.append(node)
+        return "".join(parts)
+
+    def outer_html(self) -> str:
+        """
+        Serialize this element and its descendants back to HTML. For the
+        '#document' root, only its children are serialized.
+        """
+        parts = []
+        self._serialize(parts)
+        return "".join(parts)
+
+    def inner_html(self) -> str:
+        """
+        Serialize this element's descendants back to HTML.
+        """
+        parts = []
+        for child in self.children:
+            _serialize_node(child, parts)
+        return "".join(parts)
+
+    def _serialize(self, parts):
+        if self.tag == "#document":
+            for child in self.children:
+                _serialize_node(child, parts)
+            return
+        parts.append("<" + self.tag)
+        for name, value in self.attrs.items():
+            parts.append(' %s="%s"' % (name, escape(value)))
+        parts.append(">")
+        if self.tag in _VOID_ELEMENTS:
+            return
+        for child in self.children:
+            if self.tag in _RAW_TEXT_ELEMENTS and isinstance(child, str) \
+                    and not isinstance(child, Comment):
+                parts.append(child)
+            else:
+                _serialize_node(child, parts)
+        parts.append("</%s>" % self.tag)
+
+    def select(self, css: str) -> List["Element"]:
+        """
+        :param css: A CSS selector
+
+        :return: Every descendant element matching 'css', in document order
+        """
+        matcher = compile_css(css)
+        return [e for e in self.iter() if matcher(e)]
+
+    def select_one(self, css: str):
+        """
+        :param css: A CSS selector
+
+        :return: The first descendant element matching 'css', or 'None'
+        """
+        matcher = compile_css(css)
+        for element in self.iter():
+            if matcher(element):
+                return element
+        return None
+
+    def xpath(self, xpath: str) -> List["Element"]:
+        """
+        :param xpath: An XPath expression, evaluated with this element as the
+            context node
+
+        :return: The elements the expression selects, in document order
+        """
+        return compile_xpath(xpath)(self)
+
+
+def _serialize_node(node, parts):
+    if isinstance(node, Element):
+        # noinspection PyProtectedMember
+        node._serialize(parts)
+    elif isinstance(node, Comment):
+        parts.append("<!--%s-->" % node)
+    else:
+        parts.append(escape(node, quote=False))
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document")
+        self._current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        closes = _AUTO_CLOSE.get(tag)
+        if closes and self._current.tag in closes:
+            self._current = self._current.parent
+        element = Element(tag, {k: v if v is not None else ""
+                                for k, v in attrs}, self._current)
+        self._current.children.append(element)
+        if tag not in _VOID_ELEMENTS:
+            self._current = element
+
+    def handle_startendtag(self, tag, attrs):
+        self._current.children.append(Element(
+            tag, {k: v if v is not None else "" for k, v in attrs},
+            self._current))
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open element, ignoring stray end tags
+        node = self._current
+        while node is not None and node.tag != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self._current = node.parent
+
+    def handle_data(self, data):
+        self._current.children.append(data)
+
+    def handle_comment(self, data):
+        self._current.children.append(Comment(data))
+
+
+def parse_html(html: str) -> Element:
+    """
+    Parse an HTML document or fragment.
+
+    :param html: The HTML to parse
+
+    :return: The root node, an Element with the tag '#document'
+    """
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+# CSS selectors #
+
+_TOKEN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comb>[>+~])
+  | (?P<comma>,)
+  | (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w:-]+)\s*
+        (?:(?P<op>[~^$*|]?=)\s*
+           (?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]
+  | :(?P<pseudo>[\w-]+)(?:\((?P<parg>[^)]*)\))?
+""", re.VERBOSE)
+
+_compiled = {}
+
+
+def _attr_test(name, op, expected):
+    if op is None:
+        return lambda e: name in e.attrs
+    if op == "=":
+        return lambda e: e.attrs.get(name) == expected
+    if op == "~=":
+        return lambda e: expected in e.attrs.get(name, "").split()
+    if op == "^=":
+        return lambda e: bool(expected) and \
+            e.attrs.get(name, "").startswith(expected)
+    if op == "$=":
+        return lambda e: bool(expected) and \
+            e.attrs.get(name, "").endswith(expected)
+    if op == "*=":
+        return lambda e: bool(expected) and expected in e.attrs.get(name, "")
+    if op == "|=":
+        return lambda e: e.attrs.get(name) == expected or \
+            e.attrs.get(name, "").startswith(expected + "-")
+    raise ValueError("Unsupported attribute operator '%s'" % op)
+
+
+def _siblings(element):
+    return element.parent.element_children() if element.parent else [element]
+
+
+def _pseudo_test(name, arg):
+    if name == "first-child":
+        return lambda e: _siblings(e)[0] is e
+    if name == "last-child":
+        return lambda e: _siblings(e)[-1] is e
+    if name == "nth-child":
+        try:
+            index = int(arg) - 1
+        except (TypeError, ValueError):
+            raise ValueError("Only :nth-child(<integer>) is supported")
+        return lambda e: 0 <= index < len(_siblings(e)) and \
+            _siblings(e)[index] is e
+    if name == "not":
+        inner = compile_css(arg)
+        return lambda e: not inner(e)
+    raise ValueError("Unsupported pseudo-class ':%s'" % name)
+
+
+def _parse(css):
+    """
+    Parse a selector list into [[(combinator, [tests]), ...], ...], where each
+    complex selector is a list of compound selectors from left to right and
+    the combinator joins a compound to the one before it.
+    """
+    selectors = []
+    compounds = []
+    tests = []
+    combinator = None
+    pending = None  # Combinator seen since the last compound
+    pos = 0
+    css = css.strip()
+    while pos < len(css):
+        match = _TOKEN.match(css, pos)
+        if match is None:
+            raise ValueError("Unsupported CSS selector '%s' at '%s'"
+                             % (css, css[pos:]))
+        pos = match.end()
+        kind = match.lastgroup
+        if kind in ("ws", "comb", "comma"):
+            if tests:
+                compounds.append((combinator, tests))
+                tests = []
+                combinator = None
+            if kind == "comb":
+                pending = match.group("comb")
+            elif kind == "ws" and pending is None:
+                pending = " "
+            elif kind == "comma":
+                if not compounds:
+                    raise ValueError("Empty selector in '%s'" % css)
+                selectors.append(compounds)
+                compounds = []
+                pending = None
+            continue
+        if not tests and compounds:
+            combinator = pending
+        pending = None
+        if kind == "tag":
+            tag = match.group("tag").lower()
+            if tag == "*":
+                # Still a test, so that '*' makes a compound of its own
+                tests.append(lambda e: True)
+            else:
+                tests.append(lambda e, t=tag: e.tag == t)
+        elif kind == "id":
+            tests.append(lambda e, i=match.group("id"): e.attrs.get("id") == i)
+        elif kind == "cls":
+            tests.append(lambda e, c=match.group("cls"):
+                         c in e.attrs.get("class", "").split())
+        elif match.group("attr") is not None:
+            value = match.group("dq")
+            if value is None:
+                value = match.group("sq")
+            if value is None:
+                value = match.group("bare")
+            tests.append(_attr_test(match.group("attr"), match.group("op"),
+                                    value))
+        else:
+            tests.append(_pseudo_test(match.group("pseudo"),
+                                      match.group("parg")))
+    if tests:
+        compounds.append((combinator, tests))
+    if not compounds or pending not in (None, " "):
+        raise ValueError("Incomplete CSS selector '%s'" % css)
+    selectors.append(compounds)
+    return selectors
+
+
+def _matches(element, compounds, index):
+    combinator, tests = compounds[index]
+    if not all(test(element) for test in tests):
+        return False
+    if index == 0:
+        return True
+    if combinator == ">":
+        parent = element.parent
+        return parent is not None and parent.tag != "#document" and \
+            _matches(parent, compounds, index - 1)
+    if combinator in ("+", "~"):
+        siblings = _siblings(element)
+        position = next(i for i, s in enumerate(siblings) if s is element)
+        candidates = siblings[:position]
+        if combinator == "+":
+            candidates = candidates[-1:]
+        return any(_matches(s, compounds, index - 1) for s in candidates)
+    # Descendant
+    ancestor = element.parent
+    while ancestor is not None and ancestor.tag != "#document":
+        if _matches(ancestor, compounds, index - 1):
+            return True
+        ancestor = ancestor.parent
+    return False
+
+
+def compile_css(css: str):
+    """
+    Compile a CSS selector into a function that tells whether an Element
+    matches it. Compiled selectors are cached.
+
+    :param css: A CSS selector (or selector list)
+
+    :return: A function taking an Element and returning a bool
+
+    :exception ValueError: If the selector uses unsupported syntax
+    """
+    matcher = _compiled.get(css)
+    if matcher is None:
+        selectors = _parse(css)
+        matcher = _compiled[css] = lambda e: any(
+            _matches(e, compounds, len(compounds) - 1)
+            for compounds in selectors)
+    return matcher
+
+
+# XPath #
+
+_XPATH_TOKEN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<dslash>//)
+  | (?P<slash>/)
+  | (?P<dotdot>\.\.)
+  | (?P<dot>\.)
+  | (?P<punct>[\[\](),@*])
+  | (?P<op>!=|=)
+  | (?P<str>"[^"]*"|'[^']*')
+  | (?P<num>\d+)
+  | (?P<name>[a-zA-Z_][\w.-]*)
+""", re.VERBOSE)
+
+_compiled_xpath = {}
+
+
+class _XPathParser(object):
+    """
+    Recursive descent parser for the XPath subset supported by
+    compile_xpath(). Each parse_* method returns a closure.
+    """
+
+    def __init__(self, xpath):
+        self.xpath = xpath
+        self.tokens = []
+        pos = 0
+        while pos < len(xpath):
+            match = _XPATH_TOKEN.match(xpath, pos)
+            if match is None:
+                self.fail("at '%s'" % xpath[pos:])
+            pos = match.end()
+            if match.lastgroup != "ws":
+                self.tokens.append(match.group())
+        self.index = 0
+
+    def fail(self, detail):
+        raise ValueError("Unsupported XPath '%s' %s" % (self.xpath, detail))
+
+    def peek(self, offset=0):
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            self.fail("(expected '%s', found '%s')" % (expected, token))
+        self.index += 1
+        return token
+
+    def parse(self):
+        steps = []
+        absolute = self.peek() in ("/", "//")
+        separator = self.take() if absolute else "/"
+        while True:
+            steps.append((separator, self.parse_step()))
+            if self.peek() not in ("/", "//"):
+                break
+            separator = self.take()
+        if self.peek() is not None:
+            self.fail("at '%s'" % self.peek())
+        return absolute, steps
+
+    def parse_step(self):
+        token = self.take()
+        if token == ".":
+            return "self", None, []
+        if token == "..":
+            return "parent", None, []
+        if token != "*" and not re.match(r"[a-zA-Z_]", token):
+            self.fail("at '%s'" % token)
+        if self.peek() == "(":
+            self.fail("(only element steps are supported, not '%s()')"
+                      % token)
+        predicates = []
+        while self.peek() == "[":
+            self.take("[")
+            predicates.append(self.parse_or())
+            self.take("]")
+        return "child", None if token == "*" else token.lower(), predicates
+
+    def parse_or(self):
+        left = self.parse_and()
+        while self.peek() == "or":
+            self.take()
+            right = self.parse_and()
+            left = (lambda a, b: lambda e, p, s: a(e, p, s) or b(e, p, s))(
+                left, right)
+        return left
+
+    def parse_and(self):
+        left = self.parse_comparison()
+        while self.peek() == "and":
+            self.take()
+            right = self.parse_comparison()
+            left = (lambda a, b: lambda e, p, s: a(e, p, s) and b(e, p, s))(
+                left, right)
+        return left
+
+    def parse_comparison(self):
+        token = self.peek()
+        if token is not None and token.isdigit():
+            self.take()
+            position = int(token)
+            return lambda e, p, s: p == position
+        if token == "last" and self.peek(1) == "(":
+            self.take()
+            self.take("(")
+            self.take(")")
+            return lambda e, p, s: p == s
+        if token == "(":
+            self.take()
+            inner = self.parse_or()
+            self.take(")")
+            return inner
+        if token in ("not", "contains", "starts-with") and \
+                self.peek(1) == "(":
+            self.take()
+            self.take("(")
+            if token == "not":
+                inner = self.parse_or()
+                self.take(")")
+                return lambda e, p, s: not inner(e, p, s)
+            haystack = self.parse_value()
+            self.take(",")
+            needle = self.parse_value()
+            self.take(")")
+            if token == "contains":
+                return lambda e, p, s: _xpath_contains(haystack(e),
+                                                       needle(e))
+            return lambda e, p, s: _xpath_starts_with(haystack(e), needle(e))
+        attribute = token == "@"
+        value = self.parse_value()
+        if self.peek() in ("=", "!="):
+            negate = self.take() == "!="
+            other = self.parse_value()
+            return lambda e, p, s: _xpath_equals(value(e), other(e)) != negate
+        if attribute:
+            # An attribute is true if it exists, even when empty
+            return lambda e, p, s: value(e) is not None
+        return lambda e, p, s: bool(value(e))
+
+    def parse_value(self):
+        token = self.take()
+        if token == "@":
+            name = self.take()
+            return lambda e: e.attrs.get(name)
+        if token[0] in "\"'":
+            literal = token[1:-1]
+            return lambda e: literal
+        if token.isdigit():
+            return lambda e, n=token: n
+        if token == ".":
+            return lambda e: e.text_content()
+        if token in ("text", "normalize-space") and self.peek() == "(":
+            self.take("(")
+            if token == "text":
+                self.take(")")
+                return _own_text
+            inner = (lambda e: e.text_content()) if self.peek() == ")" \
+                else self.parse_value()
+            self.take(")")
+            return lambda e: " ".join((inner(e) or "").split())
+        self.fail("at '%s'" % token)
+
+
+def _own_text(element):
+    # The text directly inside an element, not inside its descendants
+    return "".join(c for c in element.children
+                   if isinstance(c, str) and not isinstance(c, Comment))
+
+
+def _xpath_equals(a, b):
+    return a is not None and b is not None and a == b
+
+
+def _xpath_contains(haystack, needle):
+    return haystack is not None and needle is not None and needle in haystack
+
+
+def _xpath_starts_with(haystack, needle):
+    return haystack is not None and needle is not None and \
+        haystack.startswith(needle)
+
+
+def _document_root(element):
+    while element.parent is not None:
+        element = element.parent
+    return element
+
+
+def _in_document_order(root, elements):
+    if len(elements) < 2:
+        return elements
+    wanted = set(id(e) for e in elements)
+    ordered = [e for e in [root] + list(root.iter()) if id(e) in wanted]
+    return ordered
+
+
+def compile_xpath(xpath: str):
+    """
+    Compile an XPath expression into a function that evaluates it. Compiled
+    expressions are cached.
+
+    Only location paths that select elements are supported: '/' and '//'
+    separated steps of element names, '*', '.' and '..', with predicates made
+    of positions ('[2]', '[last()]'), '@attr', 'text()', '.',
+    'normalize-space()', string literals, '=' and '!=', 'contains()',
+    'starts-with()', 'not()', 'and' and 'or'.
+
+    :param xpath: The XPath expression
+
+    :return: A function taking a context Element and returning the selected
+        Elements in document order
+
+    :exception ValueError: If the expression uses unsupported syntax
+    """
+    evaluate = _compiled_xpath.get(xpath)
+    if evaluate is not None:
+        return evaluate
+    absolute, steps = _XPathParser(xpath).parse()
+
+    def evaluate(context):
+        root = _document_root(context)
+        nodes = [root if absolute else context]
+        for separator, (axis, name, predicates) in steps:
+            if separator == "//":
+                expanded = []
+                for node in nodes:
+                    expanded.append(node)
+                    expanded.extend(node.iter())
+                nodes = expanded
+            selected = []
+            seen = set()
+            for node in nodes:
+                if axis == "self":
+                    candidates = [node]
+                elif axis == "parent":
+                    candidates = [node.parent] if node.parent else []
+                else:
+                    candidates = [c for c in node.element_children()
+                                  if name is None or c.tag == name]
+                for predicate in predicates:
+                    size = len(candidates)
+                    candidates = [c for i, c in enumerate(candidates)
+                                  if predicate(c, i + 1, size)]
+                for candidate in candidates:
+                    if id(candidate) not in seen:
+                        seen.add(id(candidate))
+                        selected.append(candidate)
+            nodes = _in_document_order(root, selected)
+        return nodes
+
+    _compiled_xpath[xpath] = evaluate
+    return evaluate
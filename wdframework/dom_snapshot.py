@@ -0,0 +1,303 @@
+import re
+from typing import List
+
+from selenium.common.exceptions import InvalidSelectorException, \
+    NoSuchElementException
+
+from .dom import Element, compile_css, parse_html
+
+# CSS selectors that the indexes answer directly
+_ID_CSS = re.compile(r"^#([\w-]+)$")
+_CLASS_CSS = re.compile(r"^\.([\w-]+)$")
+_TAG_CSS = re.compile(r"^([a-zA-Z][\w-]*)$")
+# The last compound of a selector, when it names an id or class the indexes
+# can narrow the candidates down to
+_LAST_COMPOUND = re.compile(r"(?:^|[\s>+~])([^\s>+~]+)$")
+_COMPOUND_ID = re.compile(r"#([\w-]+)")
+_COMPOUND_CLASS = re.compile(r"\.([\w-]+)")
+
+
+def is_displayed(element: Element) -> bool:
+    """
+    Whether an element would be displayed, judged from the markup alone: it
+    isn't displayed if it or an ancestor has the 'hidden' attribute, an inline
+    'display: none' or 'visibility: hidden' style, or is never rendered (such
+    as 'head' or 'script'). Stylesheets aren't taken into account.
+
+    :param element: The element
+
+    :return: True if the element is displayed, False otherwise
+    """
+    node = element
+    while node is not None and node.tag != "#document":
+        style = node.attrs.get("style", "").replace(" ", "").lower()
+        if "hidden" in node.attrs or "display:none" in style or \
+                "visibility:hidden" in style or \
+                node.tag in ("head", "script", "style", "template"):
+            return False
+        node = node.parent
+    return True
+
+
+def visible_text(element: Element) -> str:
+    """
+    Approximate the text WebDriver reports for an element: its text with
+    whitespace collapsed, or nothing if it isn't displayed.
+
+    :param element: The element
+
+    :return: The text
+    """
+    if not is_displayed(element):
+        return ""
+    return " ".join(element.text_content().split())
+
+
+class DomSnapshot:
+    """
+    A parsed, read-only copy of a page (or part of one) taken at one point in
+    time, which locators can be evaluated against without talking to the
+    browser. Taking the snapshot is a single round trip; every query after
+    that runs in-process.
+
+    Elements are indexed by id, class and tag name, so locating by those (and
+    by CSS selectors whose last part names an id or class) doesn't scan the
+    whole document.
+
+    The snapshot does not change when the page does. Anything that depends on
+    layout or stylesheets is approximated (see is_displayed()).
+    """
+
+    def __init__(self, html: str):
+        """
+        :param html: The HTML of the page or fragment
+        """
+        self._root = parse_html(html)
+        self._by_id = {}
+        self._by_class = {}
+        self._by_tag = {}
+        for element in self._root.iter():
+            element_id = element.attrs.get("id")
+            if element_id is not None:
+                self._by_id.setdefault(element_id, []).append(element)
+            for css_class in element.get_classes():
+                self._by_class.setdefault(css_class, []).append(element)
+            self._by_tag.setdefault(element.tag, []).append(element)
+
+    def get_root(self) -> Element:
+        """
+        :return: The root node of the snapshot, an Element with the tag
+            '#document'
+        """
+        return self._root
+
+    def find(self, by: str, locator: str) -> List[Element]:
+        """
+        Locate elements the way WebDriver's 'find_elements_by_*' methods do.
+
+        :param by: A Selector 'by' string ('css_selector', 'xpath', 'id',
+            'name', 'class_name', 'tag_name', 'link_text' or
+            'partial_link_text')
+        :param locator: The locator
+
+        :return: The matching elements, in document order
+
+        :exception InvalidSelectorException: If the locator or 'by' is not
+            supported
+        """
+        by = by.lower()
+        if by == "id":
+            return list(self._by_id.get(locator, ()))
+        if by == "class_name":
+            return list(self._by_class.get(locator, ()))
+        if by == "tag_name":
+            return list(self._by_tag.get(locator.lower(), ()))
+        if by == "name":
+            return [e for e in self._root.iter()
+                    if e.attrs.get("name") == locator]
+        if by in ("link_text", "partial_link_text"):
+            return [a for a in self._by_tag.get("a", ()) if (
+                visible_text(a) == locator.strip() if by == "link_text"
+                else locator in visible_text(a))]
+        try:
+            if by == "xpath":
+                return self._root.xpath(locator)
+            if by == "css_selector":
+                return self._select(locator)
+        except ValueError as e:
+            raise InvalidSelectorException(str(e))
+        raise InvalidSelectorException("Unsupported locator strategy '%s'"
+                                       % by)
+
+    def query(self, selector) -> "SnapshotSelector":
+        """
+        Evaluate a Selector against this snapshot instead of the browser.
+        CSS selectors and XPath are limited to the subset the dom module
+        supports; a locator outside of it raises InvalidSelectorException
+        when the view is used, rather than giving a different answer than
+        the browser would.
+
+        :param selector: The Selector
+
+        :return: A read-only view of the Selector against this snapshot
+        """
+        query = selector.get_query()
+        return SnapshotSelector(self, query.locator, query.by)
+
+    def _select(self, css):
+        css = css.strip()
+        match = _ID_CSS.match(css)
+        if match:
+            return list(self._by_id.get(match.group(1), ()))
+        match = _CLASS_CSS.match(css)
+        if match:
+            return list(self._by_class.get(match.group(1), ()))
+        match = _TAG_CSS.match(css)
+        if match:
+            return list(self._by_tag.get(match.group(1).lower(), ()))
+        matcher = compile_css(css)
+        candidates = self._candidates(css)
+        if candidates is None:
+            candidates = self._root.iter()
+        return [e for e in candidates if matcher(e)]
+
+    def _candidates(self, css):
+        # Only elements that have the id or class named in the last compound
+        # of the selector can match it
+        if "," in css or "(" in css or "[" in css:
+            return None
+        match = _LAST_COMPOUND.search(css)
+        if match is None:
+            return None
+        compound = match.group(1)
+        match = _COMPOUND_ID.search(compound)
+        if match:
+            return self._by_id.get(match.group(1), ())
+        match = _COMPOUND_CLASS.search(compound)
+        if match:
+            return self._by_class.get(match.group(1), ())
+        return None
+
+
+class SnapshotSelector:
+    """
+    The read-only part of the Selector API, evaluated against a DomSnapshot.
+    Create one with DomSnapshot.query().
+    """
+
+    def __init__(self, snapshot: DomSnapshot, locator: str,
+                 by: str = "css_selector"):
+        self.__snapshot = snapshot
+        self.__locator = locator
+        self.__by = by.lower()
+
+    def get_locator(self):
+        """
+        Get the locator for this Selector
+
+        :return: Locator string
+        """
+        return self.__locator
+
+    def get_by(self):
+        """
+        Get the method by which elements will be located using this Selector
+
+        :return: The 'by' type (css, xpath, etc)
+        """
+        return self.__by
+
+    def get(self) -> Element:
+        """
+        Get the first matching element from the snapshot.
+
+        :return: The element
+
+        :exception NoSuchElementException: If no element matches
+        """
+        elements = self.get_multiple()
+        if not elements:
+            raise NoSuchElementException(
+                "Unable to locate element in snapshot: {\"method\":\"%s\","
+                "\"selector\":\"%s\"}" % (self.__by, self.__locator))
+        return elements[0]
+
+    def get_multiple(self) -> List[Element]:
+        """
+        Get every matching element from the snapshot.
+
+        :return: The elements, in document order
+        """
+        return self.__snapshot.find(self.__by, self.__locator)
+
+    def is_present(self) -> bool:
+        """
+        Whether an element matching this Selector is in the snapshot.
+
+        :return: True if the element is present, False otherwise
+        """
+        return bool(self.get_multiple())
+
+    def is_displayed(self) -> bool:
+        """
+        Whether the element looks displayed; see is_displayed().
+
+        :return: True if the element is displayed, False otherwise
+        """
+        return is_displayed(self.get())
+
+    def is_enabled(self) -> bool:
+        """
+        Whether the element is enabled.
+
+        :return: True if the element is enabled, False otherwise
+        """
+        return "disabled" not in self.get().attrs
+
+    def is_selected(self) -> bool:
+        """
+        Whether the element is selected (or checked).
+
+        :return: True if the element is selected, False otherwise
+        """
+        attrs = self.get().attrs
+        return "selected" in attrs or "checked" in attrs
+
+    def get_attribute(self, name: str) -> str:
+        """
+        Get an attribute of the element as it was in the markup.
+
+        :param name: The name of the attribute
+
+        :return: The value of the attribute, or 'None'
+        """
+        return self.get().attrs.get(name)
+
+    def get_css_classes(self) -> List[str]:
+        """
+        Get the CSS classes of the element.
+
+        :return: A list of CSS classes present on the element
+        """
+        return self.get().get_classes()
+
+    def get_tag_name(self) -> str:
+        """
+        Get the name of the tag of the element.
+
+        :return: The tag name
+        """
+        return self.get().tag
+
+    def get_text(self) -> str:
+        """
+        Get the visible text of the element (see visible_text()), or its
+        'value' attribute if it has no text.
+
+        :return: The visible text
+        """
+        element = self.get()
+        text = visible_text(element)
+        if text == "":
+            text = element.attrs.get("value")
+        return text
@@ -1,8 +1,115 @@
+import threading
+import time
+from typing import TYPE_CHECKING
+
 from selenium import webdriver
 from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import \
+    TimeoutException as WebDriverTimeoutException
+from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.remote.webdriver import WebDriver  # For type hinting
 
+from . import scripts
 from .exceptions import DriverEnvironmentException
+from .perf import PerformanceLog, parse_timing
+from .profile import BrowserProfile, resolve_browser
+from .remote import RemoteScheduler
+from .replay import RecordingConnection, ReplayConnection
+from .tracing import Tracer
+from .transport import PooledRemoteConnection, TransportConfig, install
+
+if TYPE_CHECKING:
+    from .driver_pool import DriverPool
+
+
+# Phrases in the messages of drivers that don't know the asynchronous script
+# command at all: the W3C 'unknown command' and 'unsupported operation' errors,
+# and geckodriver's wording of the first. Selenium keeps only the message of
+# an error it has no exception class for, not its code
+_UNSUPPORTED_MESSAGES = ("unknown command", "unsupported operation",
+                         "did not match a known command")
+
+
+def _unsupported(e: WebDriverException) -> bool:
+    # Errors with a class of their own (no such window, stale element...)
+    # come from a driver that ran the command
+    if type(e) is not WebDriverException:
+        return False
+    message = (e.msg or "").lower()
+    return any(phrase in message for phrase in _UNSUPPORTED_MESSAGES)
+
+
+def _arguments(**arguments) -> dict:
+    # Leave out unset arguments, so the drivers' own defaults apply
+    return {k: v for k, v in arguments.items() if v is not None}
+
+
+class LaunchStats:
+    """
+    Timing of a DriverEnvironment's browser launch. For a launch started in
+    the background, 'overlap' is how much of it ran while the test was doing
+    something else, and 'waited' how long get_driver() then blocked for the
+    rest of it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._background = False
+        self._started = None
+        self._finished = None
+        self._joined = None
+        self._waited = 0.0
+
+    def record_start(self, background: bool):
+        """
+        Record that the launch started.
+
+        :param background: Whether it runs on a background thread
+        """
+        with self._lock:
+            self._background = background
+            self._started = time.perf_counter()
+
+    def record_finish(self):
+        """
+        Record that the launch finished (or failed).
+        """
+        with self._lock:
+            self._finished = time.perf_counter()
+
+    def record_join(self, joined: float, waited: float):
+        """
+        Record that the driver was first needed.
+
+        :param joined: time.perf_counter() when it was needed
+        :param waited: Seconds spent waiting for the launch to finish
+        """
+        with self._lock:
+            if self._joined is None:
+                self._joined = joined
+                self._waited = waited
+
+    def get_stats(self) -> dict:
+        """
+        :return: A dict with whether the launch ran in the background, whether
+            it has finished, and in seconds: how long it took, how much of it
+            overlapped with the test, and how long the test waited for it
+        """
+        with self._lock:
+            launch_time = overlap = 0.0
+            if self._started is not None and self._finished is not None:
+                launch_time = self._finished - self._started
+            if self._background and self._started is not None:
+                end = [t for t in (self._finished, self._joined)
+                       if t is not None]
+                overlap = min(end) - self._started if end else 0.0
+            return {
+                "background": self._background,
+                "launched": self._finished is not None,
+                "launch_time": launch_time,
+                "overlap": overlap,
+                "waited": self._waited,
+            }
 
 
 class DriverEnvironment:
@@ -16,130 +123,226 @@ class DriverEnvironment:
         Get a new instance of a specific driver. (ChromeDriver, FirefoxDriver,
         etc).
         """
-        def string_to_browser(self, browser_string):
+        def string_to_browser(self, browser_string, capabilities: dict = None,
+                              driver_path: str = None):
             """
             Find the matching driver to create a new instance of based on a
             supplied string.
 
             :param browser_string: The string matching the name of the browser
+                (aliases such as 'ff', 'ie' and 'phantom' are accepted)
+            :param capabilities: Optional capabilities to start the driver
+                with, such as from BrowserProfile.to_capabilities()
+            :param driver_path: Optional path of the driver binary
             :return: The result of the method that returns a new instance of a
             driver
+
+            :exception DriverEnvironmentException: If the browser isn't known
             """
-            method = getattr(self, browser_string.lower(), lambda: "invalid")
-            return method()
+            method = getattr(self, resolve_browser(browser_string))
+            return method(capabilities, driver_path)
 
-        # TODO: Support preferences, capabilities, and driver path when creating
-        #  a new driver. This will likely deserve its own class at that point
+        # TODO: BlackBerry (and only BB) needs a device password. BB support
+        #  will be added at a later date
 
         @staticmethod
-        def android():
+        def android(capabilities=None, driver_path=None):
             """
-            Get the Android WebDriver.
+            Get the Android WebDriver. There is no driver binary; 'driver_path'
+            is ignored.
 
             :return: A new instance of the Android WebDriver
             """
-            return webdriver.Android()
-
-        # TODO: BlackBerry (and only BB) needs a device password. BB support
-        #  will be added at a later date
+            return webdriver.Android(
+                **_arguments(desired_capabilities=capabilities))
 
         @staticmethod
-        def chrome():
+        def chrome(capabilities=None, driver_path=None):
             """
             Get the Google Chrome WebDriver.
 
             :return: A new instance of the Chrome WebDriver
             """
-            return webdriver.Chrome()
+            return webdriver.Chrome(**_arguments(
+                executable_path=driver_path,
+                desired_capabilities=capabilities))
 
         @staticmethod
-        def edge():
+        def edge(capabilities=None, driver_path=None):
             """
             Get the Microsoft Edge WebDriver.
 
             :return: A new instance of the Edge WebDriver
             """
-            return webdriver.Edge()
+            return webdriver.Edge(**_arguments(
+                executable_path=driver_path, capabilities=capabilities))
 
         @staticmethod
-        def ff():
+        def ff(capabilities=None, driver_path=None):
             """
             Get the Firefox WebDriver. Passes to the next method.
             """
-            pass
+            return DriverEnvironment._BrowserSwitch.firefox(capabilities,
+                                                            driver_path)
 
         @staticmethod
-        def firefox():
+        def firefox(capabilities=None, driver_path=None):
             """
             Get the Firefox WebDriver.
 
             :return: A new instance of the Firefox WebDriver
             """
-            return webdriver.Firefox()
+            # Local Firefox replaces 'moz:firefoxOptions' in the capabilities
+            # with its Options, so they have to be passed as Options
+            options = None
+            if capabilities and Options.KEY in capabilities:
+                capabilities = dict(capabilities)
+                moz = capabilities.pop(Options.KEY)
+                options = Options()
+                for argument in moz.get("args", ()):
+                    options.add_argument(argument)
+                for name, value in moz.get("prefs", {}).items():
+                    options.set_preference(name, value)
+            return webdriver.Firefox(**_arguments(
+                executable_path=driver_path, capabilities=capabilities,
+                firefox_options=options))
 
         @staticmethod
-        def ie():
+        def ie(capabilities=None, driver_path=None):
             """
             Get the Internet Explorer WebDriver. Passes to the next method.
             """
-            pass
+            return DriverEnvironment._BrowserSwitch.internetexplorer(
+                capabilities, driver_path)
 
         @staticmethod
-        def internet_explorer():
+        def internet_explorer(capabilities=None, driver_path=None):
             """
             Get the Internet Explorer WebDriver. Passes to the next method.
-            :return:
             """
-            pass
+            return DriverEnvironment._BrowserSwitch.internetexplorer(
+                capabilities, driver_path)
 
         @staticmethod
-        def internetexplorer():
+        def internetexplorer(capabilities=None, driver_path=None):
             """
             Get the Internet Explorer WebDriver.
 
             :return: A new instance of the Internet Explorer WebDriver.
             """
-            return webdriver.Ie()
+            return webdriver.Ie(**_arguments(
+                executable_path=driver_path, capabilities=capabilities))
 
         @staticmethod
-        def opera():
+        def opera(capabilities=None, driver_path=None):
             """
             Get the Opera WebDriver.
 
             :return: A new instance of the Opera WebDriver
             """
-            return webdriver.Opera()
+            return webdriver.Opera(**_arguments(
+                executable_path=driver_path,
+                desired_capabilities=capabilities))
 
         @staticmethod
-        def phantom():
+        def phantom(capabilities=None, driver_path=None):
             """
             Get the PhantomJS WebDriver. Passes to the next method.
             """
-            pass
+            return DriverEnvironment._BrowserSwitch.phantomjs(capabilities,
+                                                              driver_path)
 
         @staticmethod
-        def phantomjs():
+        def phantomjs(capabilities=None, driver_path=None):
             """
             Get the PhantomJS WebDriver.
 
             :return: A new instance of the PhantomJS WebDriver
             """
-            return webdriver.PhantomJS()
+            return webdriver.PhantomJS(**_arguments(
+                executable_path=driver_path,
+                desired_capabilities=capabilities))
 
         @staticmethod
-        def safari():
+        def safari(capabilities=None, driver_path=None):
             """
             Get the Safari WebDriver.
 
             :return: A new instance of the Safari WebDriver
             """
-            return webdriver.Safari()
-
-    def __init__(self, browser_string: str):
+            return webdriver.Safari(**_arguments(
+                executable_path=driver_path,
+                desired_capabilities=capabilities))
+
+    def __init__(self, browser_string: str, pool: "DriverPool" = None,
+                 transport: TransportConfig = None, remote_url: str = None,
+                 tracer: Tracer = None, record_to: str = None,
+                 replay_from: str = None, profile: BrowserProfile = None,
+                 eager: bool = False, scheduler: RemoteScheduler = None,
+                 perf_log: PerformanceLog = None):
+        """
+        :param browser_string: The string matching the name of the browser
+        :param pool: Optional DriverPool to acquire an already-started driver
+            from instead of launching a new one. The driver is released back
+            into the pool when this environment is closed
+        :param transport: Optional TransportConfig. When given, commands are
+            sent over a pool of keep-alive connections (see
+            PooledRemoteConnection) and their latency is recorded
+        :param remote_url: Optional URL of a remote WebDriver server (such as
+            a Selenium Grid hub) to start the browser on instead of a local
+            driver. Ignored when 'pool' is given
+        :param tracer: Optional Tracer to record every WebDriver command in
+        :param record_to: Optional path to record every WebDriver command and
+            its response to, for replay_from
+        :param replay_from: Optional path of a recording made with 'record_to'.
+            Commands are answered from the recording instead of by a browser,
+            and must be the same as the recorded ones (see ReplayConnection).
+            'pool', 'transport' and 'remote_url' are ignored
+        :param profile: Optional BrowserProfile to launch the browser with
+            (also when it is launched by a pool or a remote server), such as
+            BrowserProfile.fast()
+        :param eager: Start launching the browser on a background thread right
+            away (see launch_in_background()) instead of on the first
+            get_driver() call
+        :param scheduler: Optional RemoteScheduler to start the browser on
+            one of a fleet of remote WebDriver servers. Its slot is released
+            when this environment is closed. Ignored when 'pool' is given;
+            'remote_url' is ignored when this is given
+        :param perf_log: Optional PerformanceLog to record the timing of
+            every navigation in (see get_navigation_timing()). A navigation's
+            timing is recorded when the browser navigates again or this
+            environment is closed, so that it includes the whole page load
+        """
+        if record_to is not None and replay_from is not None:
+            raise DriverEnvironmentException(
+                "Can't record and replay at the same time")
         self._browser_string = browser_string
+        self._pool = pool
+        self._transport = transport
+        self._remote_url = remote_url
+        self._tracer = tracer
+        self._record_to = record_to
+        self._replay_from = replay_from
+        self._profile = profile
+        self._scheduler = scheduler
+        self._perf_log = perf_log
+        # (navigation epoch, timing) last taken by get_navigation_timing()
+        self._timing = None
+        # Navigation epoch whose timing hasn't been recorded yet
+        self._timing_pending = None
+        self._recorder = None
         self._driver = None
         self._started = False
         self._closed = False
+        self._script_timeout = None
+        self._async_js_supported = True
+        self._navigation_epoch = 0
+        self._launch_lock = threading.Lock()
+        self._launch_thread = None
+        self._launch_error = None
+        self._launch_stats = LaunchStats()
+        if eager:
+            self.launch_in_background()
 
     def get_driver(self) -> WebDriver:
         """
@@ -154,6 +357,7 @@ class DriverEnvironment:
         """
         if self._closed:
             raise DriverEnvironmentException("The DriverEnvironment is closed")
+        self._join_launch()
         if self._started and self._driver is None:
             raise DriverEnvironmentException(
                 "There is no driver for this session. Either the driver was "
@@ -164,23 +368,78 @@ class DriverEnvironment:
                 "set a valid browser string when constructing this class.")
         return self._get_driver()
 
+    def launch_in_background(self):
+        """
+        Start launching the browser on a background thread, so that whatever
+        the test does before it first needs the browser (seeding a Store,
+        calling APIs) overlaps with the browser starting up. get_driver()
+        waits for the launch to finish, and raises its exception if it
+        failed. Does nothing if the browser is already launched or launching.
+        """
+        with self._launch_lock:
+            if self._started or self._closed or \
+                    self._browser_string is None:
+                return
+            self._started = True
+            self._launch_stats.record_start(True)
+            self._launch_thread = threading.Thread(
+                target=self._launch_background, daemon=True,
+                name="wdframework-launch-%s" % self._browser_string)
+            self._launch_thread.start()
+
+    def _launch_background(self):
+        try:
+            self._launch()
+        except BaseException as e:
+            self._launch_error = e
+
+    def _join_launch(self):
+        thread = self._launch_thread
+        if thread is None:
+            return
+        joined = time.perf_counter()
+        thread.join()
+        self._launch_stats.record_join(joined, time.perf_counter() - joined)
+        with self._launch_lock:
+            self._launch_thread = None
+            error, self._launch_error = self._launch_error, None
+        if error is not None:
+            raise error
+
+    def get_launch_stats(self) -> LaunchStats:
+        """
+        Get the timing of the browser launch.
+
+        :return: The LaunchStats of this environment
+        """
+        return self._launch_stats
+
     def refresh(self):
         """
         Refresh the current page.
         """
+        self._record_timing()
+        self._navigation_epoch += 1
         self.get_driver().refresh()
+        self._after_navigation()
 
     def back(self):
         """
         Navigate one setup backward in the browser history.
         """
+        self._record_timing()
+        self._navigation_epoch += 1
         self.get_driver().back()
+        self._after_navigation()
 
     def forward(self):
         """
         Navigate one step forward in the browser history.
         """
+        self._record_timing()
+        self._navigation_epoch += 1
         self.get_driver().forward()
+        self._after_navigation()
 
     def go_to_url(self, url: str):
         """
@@ -191,11 +450,81 @@ class DriverEnvironment:
         :param url: URL to navigate to
         :exception WebDriverException: If the URL could not be navigated to
         """
+        self._record_timing()
+        self._navigation_epoch += 1
         try:
             self.get_driver().get(url)
         except WebDriverException as e:
             message = [e.msg, "\nAttempted URL: ", url]
             raise WebDriverException("".join(message), e.screen, e.stacktrace)
+        self._after_navigation()
+
+    def get_profile(self):
+        """
+        :return: The BrowserProfile the browser is launched with, or 'None'
+        """
+        return self._profile
+
+    def _after_navigation(self):
+        if self._profile is not None and self._profile.disables_animations():
+            self.get_driver().execute_script(scripts.NO_ANIMATIONS_JS)
+        if self._perf_log is not None:
+            self._timing_pending = self._navigation_epoch
+
+    def get_perf_log(self):
+        """
+        :return: The PerformanceLog navigation timings are recorded in, or
+            'None'
+        """
+        return self._perf_log
+
+    def get_navigation_timing(self, max_resources: int = 20) -> dict:
+        """
+        Read the Navigation Timing, Paint Timing and Resource Timing entries
+        of the current page (see scripts.NAVIGATION_TIMING_JS). With a
+        PerformanceLog, the last timing read for a navigation is the one
+        recorded for it, so reading it again once the page has finished
+        loading records the complete timing.
+
+        :param max_resources: Number of the slowest resources to include
+
+        :return: The timing record (see perf.parse_timing()), or 'None' if
+            the browser has no performance API
+        """
+        raw = self.execute_js(False, scripts.NAVIGATION_TIMING_JS,
+                              [max_resources])
+        if raw is None:
+            return None
+        timing = parse_timing(raw, self._navigation_epoch)
+        self._timing = (self._navigation_epoch, timing)
+        return timing
+
+    def _record_timing(self):
+        """
+        Record the timing of the last navigation, if it hasn't been.
+        """
+        epoch, self._timing_pending = self._timing_pending, None
+        if epoch is None or epoch != self._navigation_epoch:
+            return
+        if self._timing is None or self._timing[0] != epoch:
+            try:
+                self.get_navigation_timing()
+            except WebDriverException:
+                # The page is gone; there is nothing to record
+                return
+        if self._timing is not None and self._timing[0] == epoch:
+            self._perf_log.record(self._timing[1])
+
+    def get_navigation_epoch(self) -> int:
+        """
+        Get a counter that increases every time the browser is navigated
+        through this environment (go_to_url, back, forward, refresh). Anything
+        obtained from the page before the counter last changed, such as a
+        WebElement, should be considered to belong to an old document.
+
+        :return: The current navigation epoch
+        """
+        return self._navigation_epoch
 
     # Note that 'async' is a reserved word in Python 3.7+
     def execute_js(self, asynchronous: bool, js: str, args=None):
@@ -210,13 +539,116 @@ class DriverEnvironment:
 
         :param asynchronous: Whether the JS should be executed asynchronously
         :param js: JavaScript to execute
-        :param args: Arguments to pass into the JavaScript
+        :param args: List of arguments to pass into the JavaScript, available
+            to it as 'arguments[0]', 'arguments[1]', etc
 
         :return: What the script executed returned; equivalent to what the
         script would return if it were run on a page under normal conditions
         """
+        args = args or []
         return self.get_driver().execute_async_script(js, *args) \
-            if asynchronous else self.get_driver().execute_script(js, args)
+            if asynchronous else self.get_driver().execute_script(js, *args)
+
+    def set_script_timeout(self, seconds: float):
+        """
+        Set how long WebDriver lets an asynchronous script run before it
+        errors. The command is only sent when the timeout actually changes.
+
+        :param seconds: The timeout, in seconds
+        """
+        if seconds != self._script_timeout:
+            self.get_driver().set_script_timeout(seconds)
+            self._script_timeout = seconds
+
+    def supports_async_js(self) -> bool:
+        """
+        Whether the driver is believed to support asynchronous scripts. This is
+        assumed until mark_async_js_unsupported() is called.
+
+        :return: False if asynchronous scripts are known not to work
+        """
+        return self._async_js_supported
+
+    def mark_async_js_unsupported(self):
+        """
+        Record that the driver can't run asynchronous scripts, so callers can
+        fall back to polling without trying again.
+        """
+        self._async_js_supported = False
+
+    def execute_async_wait(self, js: str, args: list, timeout: float,
+                           timed_out=None):
+        """
+        Run an asynchronous script that waits in the browser, passing it the
+        timeout in milliseconds as its last argument. If the driver turns out
+        not to know asynchronous scripts, mark_async_js_unsupported() is
+        called; any other failure of the script is raised.
+
+        :param js: JavaScript to execute
+        :param args: Arguments of the script, before the timeout
+        :param timeout: Seconds the script may wait
+        :param timed_out: Returned if WebDriver's script timeout expired first
+
+        :return: What the script returned, 'timed_out', or None if the driver
+            doesn't support asynchronous scripts (the caller should poll
+            instead, for the time left)
+        """
+        if not self._async_js_supported:
+            return None
+        try:
+            # Leave WebDriver some slack so that the script's own timeout, not
+            # WebDriver's, ends the wait
+            self.set_script_timeout(timeout + 5)
+            return self.execute_js(True, js,
+                                   list(args) + [int(timeout * 1000)])
+        except WebDriverTimeoutException:
+            return timed_out
+        except WebDriverException as e:
+            if not _unsupported(e):
+                raise
+            self.mark_async_js_unsupported()
+            return None
+
+    def get_command_stats(self) -> dict:
+        """
+        Get latency statistics for every WebDriver command sent so far. Only
+        available when this environment was given a TransportConfig.
+
+        :return: A dict of command name -> dict with the count, number of
+            retries and transport failures, and the mean, p50, p99 and max
+            latency in seconds. Empty if no TransportConfig was given or the
+            driver hasn't been started
+        """
+        executor = getattr(self._driver, "command_executor", None)
+        if isinstance(executor, RecordingConnection):
+            executor = executor.get_executor()
+        if not isinstance(executor, PooledRemoteConnection):
+            return {}
+        return executor.get_stats().get_stats()
+
+    def _launch_remote(self, executor):
+        """
+        Start a browser through a remote command executor.
+
+        :param executor: URL of a WebDriver server, or a command executor
+        """
+        if self._profile is not None:
+            capabilities = self._profile.to_capabilities(self._browser_string)
+        else:
+            capabilities = getattr(webdriver.DesiredCapabilities,
+                                   self._browser_string.upper(), None)
+            capabilities = dict(capabilities) if capabilities else \
+                {"browserName": self._browser_string.lower()}
+        driver = webdriver.Remote(command_executor=executor,
+                                  desired_capabilities=capabilities)
+        if self._profile is not None:
+            self._profile.size_window(driver, self._browser_string)
+        return driver
+
+    def _launch_remote_url(self, url: str):
+        return self._launch_remote(
+            url if self._transport is None else
+            PooledRemoteConnection(url, self._transport))
 
     def _get_driver(self):
         """
@@ -232,10 +664,92 @@ class DriverEnvironment:
             if self._driver is not None and not self._closed:
                 self._driver.quit()
             self._started = True
-            self._driver = self._BrowserSwitch()\
-                .string_to_browser(self._browser_string)
+            self._launch_stats.record_start(False)
+            start = time.perf_counter()
+            self._launch()
+            self._launch_stats.record_join(start, time.perf_counter() - start)
         return self._driver
 
+    def _launch(self):
+        """
+        Launch (or acquire) the driver and set it up.
+        """
+        try:
+            if self._replay_from is not None:
+                self._driver = self._launch_remote(
+                    ReplayConnection(self._replay_from))
+            elif self._pool is not None:
+                if self._profile is None:
+                    self._driver = self._pool.acquire(self._browser_string)
+                else:
+                    self._driver = self._pool.acquire(
+                        self._browser_string,
+                        self._profile.to_capabilities(self._browser_string),
+                        self._profile.launch)
+            elif self._scheduler is not None:
+                self._driver = self._scheduler.launch(self._launch_remote_url)
+            elif self._remote_url is not None:
+                self._driver = self._launch_remote_url(self._remote_url)
+            elif self._profile is not None:
+                self._driver = self._profile.launch(self._browser_string)
+            else:
+                self._driver = self._BrowserSwitch()\
+                    .string_to_browser(self._browser_string)
+            if self._transport is not None and self._driver is not None \
+                    and self._replay_from is None:
+                install(self._driver, self._transport)
+            if self._record_to is not None and self._driver is not None:
+                self._recorder = RecordingConnection(
+                    self._driver.command_executor, self._record_to)
+                self._recorder.record_session(self._driver)
+                self._driver.command_executor = self._recorder
+            if self._tracer is not None and self._driver is not None:
+                self._tracer.attach(self._driver)
+        finally:
+            self._launch_stats.record_finish()
+
     def close(self):
+        """
+        Close this environment. If the driver came from a DriverPool it is
+        released back into the pool, otherwise WebDriver is quit.
+
+        When replaying, the recorded session is only quit if quitting was
+        recorded (recordings made with a DriverPool end without it), so a
+        replayed run that sent fewer commands than were recorded raises
+        ReplayDivergenceException here.
+        """
+        if not self._closed:
+            self._record_timing()
         self._closed = True
-        self._driver.quit()
+        try:
+            self._join_launch()
+        except Exception:
+            # The launch failed; there is nothing to close
+            pass
+        if self._driver is None:
+            return
+        if self._tracer is not None:
+            self._tracer.detach(self._driver)
+        executor = getattr(self._driver, "command_executor", None)
+        if isinstance(executor, ReplayConnection):
+            if executor.get_remaining():
+                self._driver.quit()
+            return
+        if self._recorder is not None and self._pool is not None:
+            # Resetting the driver for its next user isn't part of this run
+            self._driver.command_executor = self._recorder.get_executor()
+            self._recorder.close()
+        if self._pool is not None:
+            self._pool.release(self._driver)
+            return
+        try:
+            self._driver.quit()
+        finally:
+            if self._recorder is not None:
+                executor = self._recorder.get_executor()
+                self._driver.command_executor = executor
+                self._recorder.close()
+            if isinstance(executor, PooledRemoteConnection):
+                executor.close()
+            if self._scheduler is not None:
+                self._scheduler.release(self._driver)
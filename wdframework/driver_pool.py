@@ -0,0 +1,299 @@
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver  # For type hinting
+
+from .driver_env import DriverEnvironment
+from .exceptions import DriverPoolException
+
+
+class _PooledDriver:
+    """
+    Book-keeping for a single driver owned by a DriverPool.
+    """
+    __slots__ = ("driver", "key", "uses", "startup_time")
+
+    def __init__(self, driver: WebDriver, key: tuple, startup_time: float):
+        self.driver = driver
+        self.key = key
+        self.uses = 0
+        self.startup_time = startup_time
+
+
+class DriverPool:
+    """
+    Keeps a pool of already-started WebDrivers so that a new DriverEnvironment
+    does not have to pay for a browser startup every time it is created.
+
+    Drivers are keyed by their browser string and capabilities, so a driver
+    launched for "chrome" is never handed out for "firefox". When a driver is
+    released back into the pool it is reset (cookies and web storage cleared,
+    extra windows closed, navigated to about:blank) so that no state carries
+    over from one Session to the next. Drivers that fail a health check, or
+    that have been used 'max_uses' times, are quit instead of being reused.
+
+    A DriverPool is safe to share between threads.
+    """
+
+    # Clears web storage for the current origin. Wrapped in try/catch because
+    # storage access throws on about:blank and data: URLs.
+    _RESET_STORAGE_JS = ("try{window.localStorage.clear();}catch(e){}"
+                         "try{window.sessionStorage.clear();}catch(e){}")
+
+    def __init__(self, max_uses: int = 50, max_idle: int = 4, launcher=None):
+        """
+        :param max_uses: How many times a driver may be handed out before it
+            is retired (quit and replaced). 'None' means never retire
+        :param max_idle: Maximum number of idle drivers kept per key; drivers
+            released beyond this are quit
+        :param launcher: Callable taking (browser_string, capabilities) and
+            returning a new WebDriver. Defaults to the launcher given to
+            acquire() (such as a BrowserProfile's launch()), or else the
+            DriverEnvironment browser switch
+        """
+        self._max_uses = max_uses
+        self._max_idle = max_idle
+        self._launcher = launcher
+        self._idle = {}
+        self._in_use = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._hits = 0
+        self._misses = 0
+        self._retired = 0
+        self._unhealthy = 0
+        self._startup_times = []
+
+    @staticmethod
+    def _default_launcher(browser_string: str, capabilities: dict):
+        # noinspection PyProtectedMember
+        return DriverEnvironment._BrowserSwitch()\
+            .string_to_browser(browser_string, capabilities)
+
+    @staticmethod
+    def make_key(browser_string: str, capabilities: dict = None) -> tuple:
+        """
+        Build the key a driver is pooled under.
+
+        :param browser_string: The string matching the name of the browser
+        :param capabilities: Capabilities the driver was launched with
+
+        :return: A hashable key for the browser string and capabilities
+        """
+        if not capabilities:
+            return browser_string.lower(), ()
+        return browser_string.lower(), tuple(
+            sorted((k, repr(v)) for k, v in capabilities.items()))
+
+    def prelaunch(self, browser_string: str, count: int = 1,
+                  capabilities: dict = None, launcher=None):
+        """
+        Start drivers ahead of time so that the next 'count' acquisitions for
+        this browser string, capabilities and launcher are hits.
+
+        :param browser_string: The string matching the name of the browser
+        :param count: How many drivers to start
+        :param capabilities: Capabilities to launch the drivers with
+        :param launcher: See acquire()
+        """
+        key, launcher = self._key(browser_string, capabilities, launcher)
+        for _ in range(count):
+            entry = self._launch(key, launcher, browser_string, capabilities)
+            with self._lock:
+                self._idle.setdefault(key, []).append(entry)
+
+    def acquire(self, browser_string: str, capabilities: dict = None,
+                launcher=None) -> WebDriver:
+        """
+        Get a driver from the pool, starting a new one if no healthy idle
+        driver is available.
+
+        :param browser_string: The string matching the name of the browser
+        :param capabilities: Capabilities the driver must be launched with
+        :param launcher: Callable to start the driver with, such as a
+            BrowserProfile's launch(), unless this pool was given a launcher
+            of its own. Drivers are only handed out to callers passing an
+            equal launcher
+
+        :return: A WebDriver that is exclusively owned by the caller until it
+            is released
+
+        :exception DriverPoolException: If this pool is closed
+        """
+        key, launcher = self._key(browser_string, capabilities, launcher)
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise DriverPoolException("The DriverPool is closed")
+                idle = self._idle.get(key)
+                entry = idle.pop() if idle else None
+            if entry is None:
+                break
+            if self._is_healthy(entry.driver):
+                with self._lock:
+                    self._hits += 1
+                return self._check_out(entry)
+            with self._lock:
+                self._unhealthy += 1
+            self._quit(entry.driver)
+
+        with self._lock:
+            self._misses += 1
+        return self._check_out(
+            self._launch(key, launcher, browser_string, capabilities))
+
+    def release(self, driver: WebDriver):
+        """
+        Return a driver to the pool. The driver is reset before it is made
+        available again. If it can't be reset, has reached its maximum number
+        of uses, or the pool is full or closed, it is quit instead.
+
+        :param driver: A driver previously returned by acquire()
+
+        :exception DriverPoolException: If the driver was not acquired from
+            this pool
+        """
+        with self._lock:
+            entry = self._in_use.pop(id(driver), None)
+        if entry is None:
+            raise DriverPoolException(
+                "Driver was not acquired from this DriverPool")
+
+        if self._max_uses is not None and entry.uses >= self._max_uses:
+            with self._lock:
+                self._retired += 1
+            self._quit(driver)
+            return
+
+        if not self._reset(driver):
+            with self._lock:
+                self._unhealthy += 1
+            self._quit(driver)
+            return
+
+        with self._lock:
+            idle = self._idle.setdefault(entry.key, [])
+            if not self._closed and len(idle) < self._max_idle:
+                idle.append(entry)
+                return
+        self._quit(driver)
+
+    def discard(self, driver: WebDriver):
+        """
+        Quit a driver acquired from this pool without returning it. Use this
+        when the driver is known to be broken (crashed browser, lost session).
+
+        :param driver: A driver previously returned by acquire()
+        """
+        with self._lock:
+            entry = self._in_use.pop(id(driver), None)
+            if entry is not None:
+                self._unhealthy += 1
+        self._quit(driver)
+
+    def get_stats(self) -> dict:
+        """
+        Get usage statistics for this pool.
+
+        :return: A dict with the number of hits, misses, retired and unhealthy
+            drivers, how many drivers are idle and in use, and the total and
+            mean browser startup time in seconds
+        """
+        with self._lock:
+            launches = len(self._startup_times)
+            total = sum(self._startup_times)
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "launches": launches,
+                "retired": self._retired,
+                "unhealthy": self._unhealthy,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "in_use": len(self._in_use),
+                "startup_time_total": total,
+                "startup_time_mean": total / launches if launches else 0.0,
+            }
+
+    def close(self):
+        """
+        Close this pool and quit every idle driver. Drivers that are still in
+        use are quit when they are released.
+        """
+        with self._lock:
+            self._closed = True
+            entries = [e for idle in self._idle.values() for e in idle]
+            self._idle.clear()
+        for entry in entries:
+            self._quit(entry.driver)
+
+    def _key(self, browser_string: str, capabilities: dict, launcher):
+        """
+        :return: The key to pool a driver under, and the launcher to start it
+            with
+        """
+        key = self.make_key(browser_string, capabilities)
+        if self._launcher is not None:
+            return key, self._launcher
+        if launcher is None:
+            return key, self._default_launcher
+        return key + (launcher,), launcher
+
+    def _launch(self, key: tuple, launcher, browser_string: str,
+                capabilities: dict) -> _PooledDriver:
+        start = time.perf_counter()
+        driver = launcher(browser_string, capabilities)
+        elapsed = time.perf_counter() - start
+        if driver is None:
+            raise DriverPoolException(
+                "Could not launch a driver for browser string '%s'"
+                % browser_string)
+        with self._lock:
+            self._startup_times.append(elapsed)
+        return _PooledDriver(driver, key, elapsed)
+
+    def _check_out(self, entry: _PooledDriver) -> WebDriver:
+        entry.uses += 1
+        with self._lock:
+            self._in_use[id(entry.driver)] = entry
+        return entry.driver
+
+    @staticmethod
+    def _is_healthy(driver: WebDriver) -> bool:
+        """
+        Cheap liveness check; any WebDriver command that needs a live session
+        will do.
+        """
+        try:
+            driver.current_window_handle
+            return True
+        except (WebDriverException, OSError):
+            return False
+
+    def _reset(self, driver: WebDriver) -> bool:
+        """
+        Put a driver back into a clean state: one window, no cookies, no web
+        storage, on about:blank.
+
+        :return: True if the driver was reset, False if it should be discarded
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.delete_all_cookies()
+            driver.execute_script(self._RESET_STORAGE_JS)
+            driver.get("about:blank")
+            return True
+        except (WebDriverException, OSError):
+            return False
+
+    @staticmethod
+    def _quit(driver: WebDriver):
+        try:
+            driver.quit()
+        except (WebDriverException, OSError):
+            # OSError: the driver service went away entirely
+            pass
@@ -0,0 +1,37 @@
+import threading
+
+
+class ElementCacheStats:
+    """
+    Counts how effective WebElement caching was for the caching Selectors of a
+    Session.
+
+    hits: a cached WebElement was reused, saving a find command
+    misses: the WebElement had to be located (first use, or after the cached
+        one was dropped)
+    stale: a cached WebElement turned out to be stale when used and had to be
+        located again
+    invalidated: a cached WebElement was dropped because the browser navigated
+        since it was located
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "stale": 0, "invalidated": 0}
+
+    def record(self, event: str):
+        """
+        Count an event.
+
+        :param event: One of 'hits', 'misses', 'stale' or 'invalidated'
+        """
+        with self._lock:
+            self._counts[event] += 1
+
+    def get_stats(self) -> dict:
+        """
+        :return: A dict with the number of hits, misses, stale and invalidated
+            WebElements
+        """
+        with self._lock:
+            return dict(self._counts)
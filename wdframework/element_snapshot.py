@@ -0,0 +1,92 @@
+from types import MappingProxyType
+from typing import Dict, List
+
+
+class ElementSnapshot(object):
+    """
+    An immutable, point-in-time copy of the state of a web element, read in a
+    single round trip by Selector.snapshot().
+
+    Only the fields that were requested when the snapshot was taken are
+    populated; every other field is 'None'. Because a snapshot is a copy, it
+    never goes stale, but it also never reflects changes made to the page after
+    it was taken.
+    """
+
+    FIELDS = ("text", "value", "tag_name", "attributes", "classes", "rect",
+              "displayed", "enabled", "selected")
+
+    __slots__ = FIELDS + ("fields",)
+
+    def __init__(self, fields, values: dict):
+        """
+        :param fields: The fields that were read from the element
+        :param values: The values read, keyed by field name
+        """
+        object.__setattr__(self, "fields", tuple(fields))
+        for field in self.FIELDS:
+            value = values.get(field)
+            # Freeze containers so the snapshot is immutable all the way down
+            if isinstance(value, dict):
+                value = MappingProxyType(dict(value))
+            elif isinstance(value, list):
+                value = tuple(value)
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ElementSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ElementSnapshot is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, ElementSnapshot):
+            return NotImplemented
+        return all(getattr(self, s) == getattr(other, s)
+                   for s in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(repr(getattr(self, s)) for s in self.__slots__))
+
+    def __repr__(self):
+        values = ", ".join("%s=%r" % (f, getattr(self, f))
+                           for f in self.fields)
+        return "ElementSnapshot(%s)" % values
+
+    def get_text(self) -> str:
+        """
+        Get the visible text of the element, falling back to its value the same
+        way Selector.get_text() does. Requires the 'text' field, and the
+        'value' field for the fallback.
+
+        :return: The visible text, or the value if there is no visible text
+        """
+        if self.text is None or self.text == "":
+            return self.value
+        return self.text
+
+    def get_attribute(self, name: str) -> str:
+        """
+        Get an attribute of the element. Requires the 'attributes' field.
+
+        :param name: The name of the attribute
+
+        :return: The value of the attribute, or 'None' if it isn't set
+        """
+        return (self.attributes or {}).get(name)
+
+    def get_css_classes(self) -> List[str]:
+        """
+        Get the CSS classes of the element. Requires the 'classes' field.
+
+        :return: A list of CSS classes present on the element
+        """
+        return list(self.classes or [])
+
+    def get_rect(self) -> Dict[str, float]:
+        """
+        Get the rectangle of the element. Requires the 'rect' field.
+
+        :return: The rectangle as a dict with 'x', 'y', 'width' and 'height'
+        """
+        return dict(self.rect) if self.rect is not None else None
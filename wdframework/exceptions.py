@@ -1,3 +1,20 @@
+class ArtifactException(Exception):
+    """
+    Raised when the ArtifactCollector encounters an issue.
+    """
+    pass
+
+
+class BudgetExceededException(Exception):
+    """
+    Raised when a Page exceeded one of its performance budgets.
+    """
+    def __init__(self, message, exceeded: dict):
+        super().__init__(message)
+        # Metric -> (measured value, limit)
+        self.exceeded = exceeded
+
+
 class ComponentException(Exception):
     """
     Raised when there is a general issue with a Component.
@@ -12,6 +29,28 @@ class DriverEnvironmentException(Exception):
     pass
 
 
+class DriverPoolException(Exception):
+    """
+    Raised when the DriverPool encounters an issue.
+    """
+    pass
+
+
+class RemoteSchedulerException(Exception):
+    """
+    Raised when a RemoteScheduler can't place a session on any of its nodes.
+    """
+    pass
+
+
+class ReplayDivergenceException(Exception):
+    """
+    Raised when a replayed Session sends a different command than the one
+    that was recorded at the same point.
+    """
+    pass
+
+
 class SessionException(Exception):
     """
     Raised when the Session encounters an issue.
@@ -1,4 +1,5 @@
 from .loadable import Loadable
+from .locator import Locator
 from ..exceptions import ComponentException
 from ..selector import Selector
 
@@ -6,7 +7,15 @@ from ..selector import Selector
 class Component(Loadable):
     """
     Base component object class that all component objects should extend.
+
+    Selectors created with find() are scoped to the Component's container:
+    the container is located once per render (until the browser navigates,
+    or the container turns out to be stale) and every child is found
+    relative to it, so repeated components such as list rows don't scan the
+    whole document for every child. Locators declared on a Component are
+    scoped the same way.
     """
+    __slots__ = ("_owner", "_container", "__scope")
 
     def __init__(self, owner: Loadable, container: Selector):
         super().__init__(owner.get_session())
@@ -20,3 +29,42 @@ class Component(Loadable):
 
         self._owner = owner
         self._container = container
+        # Caching copy of the container, shared by every child Selector
+        self.__scope = Selector(container.get_session(),
+                                container.get_locator(), container.get_by(),
+                                cache=True, owner=self,
+                                container=container.get_container())
+
+    def get_owner(self) -> Loadable:
+        """
+        Get the Page or Component this Component is part of.
+
+        :return: The owner
+        """
+        return self._owner
+
+    def get_container(self) -> Selector:
+        """
+        Get the Selector of the element this Component is rendered in.
+
+        :return: The container Selector
+        """
+        return self._container
+
+    def find(self, locator: str, by: str = "css_selector",
+             cache: bool = False) -> Selector:
+        """
+        Create a Selector scoped to this Component's container.
+
+        :param locator: The locator, relative to the container. XPath
+            locators should start with './/'
+        :param by: How to locate elements with 'locator'
+        :param cache: Whether the Selector caches its WebElement
+
+        :return: The scoped Selector
+        """
+        return Selector(self._session, locator, by, cache, owner=self,
+                        container=self.__scope)
+
+    def _create_selector(self, locator: Locator) -> Selector:
+        return self.find(locator.locator, locator.by, locator.cache)
@@ -1,5 +1,11 @@
+from typing import Dict, Iterable
+
+from .locator import Locator
+from .. import scripts
+from ..selector import Selector
 from ..session import Session
 
+
 class Loadable(object):
     """
     Base class that all loadable objects (pages, components, etc) should extend.
@@ -10,9 +16,32 @@ class Loadable(object):
     defined throughout a website or a web application (such as page-level -- not
     browser -- overlays or containers that encapsulate the same fields used in
     multiple places).
+
+    Elements can be declared on the class with Locator attributes. Their
+    Selectors are created on first access and kept per instance, and the
+    class keeps a registry of every declared Locator, so that the state of
+    all of them can be checked with a single script (see check_states()).
     """
+    __slots__ = ("_session", "_selectors")
+
+    # Name -> Locator of every Locator declared on the class or inherited
+    _declared_locators = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        declared = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, Locator):
+                    declared[name] = value
+                elif name in declared:
+                    # Overridden by something that isn't a Locator
+                    del declared[name]
+        cls._declared_locators = declared
+
     def __init__(self, session: Session):
         self._session = session
+        self._selectors = {}
 
     def get_session(self):
         """
@@ -20,3 +49,58 @@ class Loadable(object):
         :return:
         """
         return self._session
+
+    @classmethod
+    def get_declared_locators(cls) -> Dict[str, Locator]:
+        """
+        Get every Locator declared on this class, including inherited ones.
+
+        :return: Dict of attribute name -> Locator, in declaration order
+        """
+        return dict(cls._declared_locators)
+
+    def get_selector(self, name: str) -> Selector:
+        """
+        Get the Selector of a declared Locator, creating it on first use.
+
+        :param name: The attribute name of the Locator
+
+        :return: The Selector
+
+        :exception KeyError: If no Locator is declared with that name
+        """
+        selector = self._selectors.get(name)
+        if selector is None:
+            locator = self._declared_locators[name]
+            selector = self._selectors[name] = self._create_selector(locator)
+        return selector
+
+    def _create_selector(self, locator: Locator) -> Selector:
+        return Selector(self._session, locator.locator, locator.by,
+                        locator.cache, owner=self)
+
+    def check_states(self, state: str = "present",
+                     names: Iterable[str] = None) -> Dict[str, bool]:
+        """
+        Check whether declared elements are in a given state, all with a
+        single script.
+
+        :param state: One of 'present', 'absent', 'visible' or 'hidden'
+        :param names: Attribute names of the Locators to check. Defaults to
+            every declared Locator
+
+        :return: Dict of attribute name -> whether the element is in the state
+
+        :exception ValueError: If the state is unknown
+        """
+        if state not in scripts.STATES:
+            raise ValueError("Unknown state '%s', expected one of: %s"
+                             % (state, ", ".join(scripts.STATES)))
+        names = list(self._declared_locators if names is None else names)
+        if not names:
+            return {}
+        queries = [self.get_selector(name).get_query() for name in names]
+        results = self._session.get_driver_env().execute_js(
+            False, scripts.STATES_JS,
+            [[[q.by, q.locator] for q in queries], state])
+        return dict(zip(names, results))
@@ -0,0 +1,54 @@
+from ..locator import compile_locator
+
+
+class Locator:
+    """
+    Declares an element of a Page or Component as a class attribute:
+
+        class SearchPage(Page):
+            search = Locator("input[name=q]")
+            results = Locator("//div[@id='results']", by="xpath")
+
+    The Selector is created the first time the attribute is read on an
+    instance, and the same Selector is returned afterwards, so elements a
+    test never touches cost nothing. On a Component, the Selector is scoped to
+    the Component's container (see Component.find()); otherwise its owner is
+    the Page.
+
+    Every Locator declared on a class (or inherited) is listed in the class's
+    registry, see Loadable.get_declared_locators().
+    """
+    __slots__ = ("locator", "by", "cache", "ready", "name")
+
+    def __init__(self, locator: str, by: str = "css_selector",
+                 cache: bool = False, ready: bool = False):
+        """
+        :param locator: The locator
+        :param by: How to locate elements with 'locator'
+        :param cache: Whether the Selector caches its WebElement
+        :param ready: Whether the page isn't loaded until this element is, see
+            Page.wait_until_loaded()
+
+        :exception ValueError: If 'by' is unknown or the locator is empty
+        """
+        compile_locator(by, locator)
+        self.locator = locator
+        self.by = by
+        self.cache = cache
+        self.ready = ready
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.get_selector(self.name)
+
+    def __set__(self, instance, value):
+        raise AttributeError("'%s' is a declared Locator and can't be "
+                             "assigned" % self.name)
+
+    def __repr__(self):
+        return "Locator(%r, by=%r)" % (self.locator, self.by)
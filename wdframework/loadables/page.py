@@ -1,42 +1,270 @@
+import time
+from typing import Iterable
+
+from selenium.common.exceptions import NoSuchElementException
+
 from .loadable import Loadable
+from .. import scripts
+from ..dom_snapshot import DomSnapshot
+from ..exceptions import BudgetExceededException, TimeoutException
+from ..perf import TIME_METRICS, check_budgets, exceeded_budgets
+from ..selector import Selector
 from ..session import Session
+from ..wait import WaitPolicy
+
+# The conditions wait_until_loaded() waits on
+_LOAD_CONDITIONS = ("ready_state", "selectors", "network_idle")
 
 
 class Page(Loadable):
     """
     Base page object class that all page objects should extend.
+
+    Performance budgets can be declared on a page class as a dict of metric
+    -> limit, such as budgets = {"ttfb": 0.2, "dom_content_loaded": 1.5}.
+    Times are in seconds, sizes in bytes (see perf.METRICS), and a subclass's
+    budgets are merged over those of its base classes. They are checked by
+    check_budgets(), and by wait_until_loaded() once the page is loaded.
     """
+    __slots__ = ()
+
+    budgets = {}
+    # Budgets of the class merged with those of its base classes
+    _budgets = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        merged = {}
+        for klass in reversed(cls.__mro__):
+            merged.update(vars(klass).get("budgets") or {})
+        check_budgets(merged)
+        cls._budgets = merged
+
     def __init__(self, session: Session):
         super().__init__(session)
 
-    def get_comments(self):
-        """
-        Get all HTML comments on the current page. This is outside of the normal
-        flow of Selector because there is no selector for comments.
-
-        The JavaScript in this method is equivalent to:
-
-        var getComments = function(element) {
-          var comments = [];
-          var nodes = element.childNodes;
-          for (var i = 0; i < nodes.length; i++) {
-            var node = nodes[i];
-            if (node.nodeType === 8) {
-              comments.push(node);
-            } else {
-              comments.push.apply(comments, getComments(node));
-            }
-          }
-          return comments;
-        };
-
-        var comments = getComments(document);
-
-        :return: The HTML comments on the current page as a JS object
-        """
-        return self._session.get_driver_env()\
-            .execute_js(False, "let g=function(e){let c=[];let s=e.childNodes;"
-                               "for(let i=0;i<s.length;i++){let n=s[i];"
-                               "if(n.nodeType===8){c.push(n);}"
-                               "else{c.push.apply(c,g(n));}}return c;};"
-                               "let c=g(document);")
+    @classmethod
+    def get_budgets(cls) -> dict:
+        """
+        Get the performance budgets of this class, including inherited ones.
+
+        :return: Dict of metric -> limit
+        """
+        return dict(cls._budgets)
+
+    def check_budgets(self, timing: dict = None) -> dict:
+        """
+        Check the timing of the current page against this page's budgets. The
+        timing is read from the browser (see
+        DriverEnvironment.get_navigation_timing()), and is the one recorded
+        in the Session's PerformanceLog for this navigation, tagged with this
+        page's class name.
+
+        :param timing: A timing record to check instead of reading it
+
+        :return: The timing record, or 'None' if the browser has no
+            performance API
+
+        :exception BudgetExceededException: If a budget was exceeded
+        """
+        if timing is None:
+            timing = self._session.get_driver_env().get_navigation_timing()
+            if timing is None:
+                return None
+        timing["page"] = type(self).__name__
+        exceeded = exceeded_budgets(self._budgets, timing)
+        if exceeded:
+            raise BudgetExceededException(
+                "%s exceeded its performance budget at %s: %s"
+                % (type(self).__name__, timing["url"], ", ".join(
+                    "%s %s > %s" % (metric, _format(metric, value),
+                                    _format(metric, limit))
+                    for metric, (value, limit) in sorted(exceeded.items()))),
+                exceeded)
+        return timing
+
+    def wait_until_loaded(self, ready: Iterable[str] = None,
+                          state: str = "visible", idle: float = 0.5,
+                          timeout: float = None,
+                          policy: WaitPolicy = None) -> dict:
+        """
+        Wait until the current page is loaded, with a single asynchronous
+        script (see scripts.LOADED_JS): document.readyState must be
+        'complete', every readiness element must be in 'state', and no
+        fetch() or XMLHttpRequest may have been in flight for 'idle'
+        seconds. Requests are counted by instrumenting the page the first
+        time this is called on it; requests still in flight at that moment
+        aren't seen.
+
+        Drivers that can't run asynchronous scripts are polled instead,
+        following the policy.
+
+        :param ready: Attribute names of the declared Locators that must be
+            in 'state'. Defaults to the Locators declared with 'ready=True'
+        :param state: One of 'present', 'absent', 'visible' or 'hidden'
+        :param idle: Seconds without network activity the page needs; 'None'
+            to ignore the network
+        :param timeout: Seconds to wait, overriding the policy's timeout
+        :param policy: WaitPolicy to use instead of the Session's
+
+        :return: A dict of timings in seconds: how long the whole wait took
+            ('elapsed'), how long into the wait each condition was first met
+            ('ready_state', 'selectors' and 'network_idle'), and the time
+            since the page started navigating ('since_navigation')
+
+        :raises TimeoutException: If the page wasn't loaded before the
+            timeout expired
+        :raises BudgetExceededException: If the page has budgets, and the
+            loaded page exceeded one (see check_budgets())
+        """
+        if state not in scripts.STATES:
+            raise ValueError("Unknown state '%s', expected one of: %s"
+                             % (state, ", ".join(scripts.STATES)))
+        if ready is None:
+            ready = [name for name, locator
+                     in self.get_declared_locators().items() if locator.ready]
+        queries = [self.get_selector(name).get_query() for name in ready]
+        args = [[[q.by, q.locator] for q in queries], state,
+                -1 if idle is None else int(idle * 1000)]
+        policy = policy or self._session.get_wait_policy()
+        timeout = policy.get_timeout() if timeout is None else timeout
+        stats = self._session.get_wait_stats()
+
+        driver_env = self._session.get_driver_env()
+        start = time.monotonic()
+        status = driver_env.execute_async_wait(
+            scripts.LOADED_JS, args, timeout,
+            timed_out={"ok": False, "loaded": False})
+        if status is not None:
+            stats.record(1, time.monotonic() - start, not status["ok"])
+            if not status["ok"]:
+                raise TimeoutException(
+                    "Timed out after %.2f seconds waiting for the page to be "
+                    "loaded%s" % (timeout, _unmet(status)))
+            return self._loaded(_timings(
+                status["elapsed"], status["first"], status["now"]))
+
+        # Only poll for what is left of the timeout
+        timeout = max(0.0, timeout - (time.monotonic() - start))
+        start = time.monotonic()
+        first = {}
+
+        def check():
+            status = driver_env.execute_js(False, scripts.LOADED_CHECK_JS,
+                                           args)
+            for condition in _LOAD_CONDITIONS:
+                if status[condition] and condition not in first:
+                    first[condition] = (time.monotonic() - start) * 1000
+            return status if status["loaded"] else None
+
+        status = policy.poll(check, "the page to be loaded", timeout, stats)
+        return self._loaded(_timings((time.monotonic() - start) * 1000, first,
+                                     status["now"]))
+
+    def _loaded(self, timings: dict) -> dict:
+        if self._budgets:
+            self.check_budgets()
+        return timings
+
+    def iter_comments(self, offset: int = 0, limit: int = None,
+                      with_paths: bool = False, chunk_size: int = 500):
+        """
+        Iterate over the HTML comments on the current page, in document order.
+        This is outside of the normal flow of Selector because there is no
+        selector for comments.
+
+        Comments are read by a TreeWalker in the browser, 'chunk_size' at a
+        time, so that huge pages can be scanned incrementally: only the text
+        of each comment crosses the wire, a chunk at a time, and stopping the
+        iteration early skips the rest of the page. See scripts.COMMENTS_JS.
+
+        :param offset: Number of comments to skip
+        :param limit: Maximum number of comments to produce; 'None' for all
+        :param with_paths: Produce (text, XPath) tuples instead of just the
+            text, such as ('x', '/html[1]/body[1]/div[2]/comment()[1]')
+        :param chunk_size: Comments read per round trip
+
+        :return: A generator of comment texts (or (text, path) tuples)
+        """
+        if offset < 0 or chunk_size < 1 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must be >= 0 and chunk_size "
+                             "must be >= 1")
+        driver_env = self._session.get_driver_env()
+        remaining = limit
+        while remaining is None or remaining > 0:
+            count = chunk_size if remaining is None \
+                else min(chunk_size, remaining)
+            chunk = driver_env.execute_js(
+                False, scripts.COMMENTS_JS, [offset, count, with_paths])
+            for comment in chunk["comments"]:
+                yield tuple(comment) if with_paths else comment
+            offset += len(chunk["comments"])
+            if remaining is not None:
+                remaining -= len(chunk["comments"])
+            if chunk["done"]:
+                return
+
+    def get_comments(self, offset: int = 0, limit: int = None,
+                     with_paths: bool = False) -> list:
+        """
+        Get the HTML comments on the current page, in document order. See
+        iter_comments().
+
+        :param offset: Number of comments to skip
+        :param limit: Maximum number of comments to get; 'None' for all
+        :param with_paths: Get (text, XPath) tuples instead of just the text
+
+        :return: The comment texts (or (text, path) tuples)
+        """
+        return list(self.iter_comments(offset, limit, with_paths))
+
+    def snapshot(self, container: Selector = None) -> DomSnapshot:
+        """
+        Take a read-only snapshot of the current page, or of the part of it
+        inside 'container', in a single round trip. Selectors can then be
+        evaluated against the snapshot in-process with DomSnapshot.query(),
+        which makes many assertions on a page that isn't changing much
+        cheaper than asking the browser for each value.
+
+        :param container: Optional Selector of the element to snapshot,
+            instead of the whole page
+
+        :return: The snapshot
+
+        :exception NoSuchElementException: If the container could not be found
+        """
+        driver_env = self._session.get_driver_env()
+        if container is None:
+            return DomSnapshot(driver_env.get_driver().page_source)
+        query = container.get_query()
+        html = driver_env.execute_js(
+            False, scripts.OUTER_HTML_JS, [query.by, query.locator])
+        if html is None:
+            raise NoSuchElementException(
+                "Unable to locate element: {\"method\":\"%s\",\"selector\":"
+                "\"%s\"}" % (query.by, query.locator))
+        return DomSnapshot(html)
+
+
+def _format(metric: str, value) -> str:
+    if metric in TIME_METRICS:
+        return "%.3fs" % value
+    return "%d" % value
+
+
+def _unmet(status: dict) -> str:
+    unmet = [c for c in _LOAD_CONDITIONS if c in status and not status[c]]
+    if not unmet:
+        return ""
+    if "network_idle" in unmet:
+        unmet[unmet.index("network_idle")] = "network_idle (%d requests in " \
+            "flight)" % status.get("pending", 0)
+    return "; not met: " + ", ".join(unmet)
+
+
+def _timings(elapsed: float, first: dict, since_navigation: float) -> dict:
+    # Milliseconds from the browser to seconds
+    timings = {c: first.get(c, 0) / 1000.0 for c in _LOAD_CONDITIONS}
+    timings["elapsed"] = elapsed / 1000.0
+    timings["since_navigation"] = since_navigation / 1000.0
+    return timings
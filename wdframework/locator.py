@@ -0,0 +1,201 @@
+import threading
+from collections import OrderedDict
+
+# Selector 'by' strings -> (W3C locator strategy, function translating the
+# locator into a value for that strategy). W3C drivers only support five
+# strategies; id, name and class name are expressed as CSS.
+_STRATEGIES = {
+    "css_selector": ("css selector", lambda v: v),
+    "xpath": ("xpath", lambda v: v),
+    "link_text": ("link text", lambda v: v),
+    "partial_link_text": ("partial link text", lambda v: v),
+    "tag_name": ("tag name", lambda v: v),
+    "id": ("css selector", lambda v: "[id=%s]" % _quote(v)),
+    "name": ("css selector", lambda v: "[name=%s]" % _quote(v)),
+    "class_name": ("css selector", lambda v: "[class~=%s]" % _quote(v)),
+}
+
+# 'by' strings whose locators can be written as a CSS selector
+_CSS = ("css_selector", "tag_name", "id", "name", "class_name")
+
+# Compiled locators shared by every Selector, keyed by ('by', locator). The
+# least recently used are dropped beyond _MAX_INTERNED, so that locators
+# built on the fly (such as from test data) don't pile up
+_MAX_INTERNED = 1024
+_interned = OrderedDict()
+_interned_lock = threading.Lock()
+
+
+def _quote(value: str) -> str:
+    return '"%s"' % value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+class CompiledLocator:
+    """
+    A validated locator: the 'by' string it was given as, the locator, and
+    the W3C strategy and value WebDriver is asked to find it with. Compiled
+    locators are immutable and interned, so Selectors with the same locator
+    share one instance; create them with compile_locator().
+    """
+    __slots__ = ("by", "locator", "strategy", "value")
+
+    def __init__(self, by: str, locator: str, strategy: str, value: str):
+        self.by = by
+        self.locator = locator
+        self.strategy = strategy
+        self.value = value
+
+    def as_css(self):
+        """
+        :return: This locator as a CSS selector, or 'None' if it can't be
+            written as one
+        """
+        return self.value if self.by in _CSS else None
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError("CompiledLocator is immutable")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return "CompiledLocator(%s=%r)" % (self.by, self.locator)
+
+
+def compile_locator(by: str, locator: str) -> CompiledLocator:
+    """
+    Validate and normalize a locator. The result is interned: compiling the
+    same locator again returns the same instance, unless it was one of the
+    least recently used when more than _MAX_INTERNED locators were compiled.
+
+    :param by: A Selector 'by' string ('css_selector', 'xpath', 'id', 'name',
+        'class_name', 'tag_name', 'link_text' or 'partial_link_text'), in any
+        case
+    :param locator: The locator
+
+    :return: The CompiledLocator
+
+    :exception ValueError: If 'by' is not a known 'by' string, or the locator
+        is not a non-empty string
+    """
+    key = (by, locator)
+    with _interned_lock:
+        compiled = _interned.get(key)
+        if compiled is not None:
+            _interned.move_to_end(key)
+            return compiled
+    if not isinstance(by, str) or by.lower() not in _STRATEGIES:
+        raise ValueError("Unknown 'by' for a Selector: '%s', expected one of: "
+                         "%s" % (by, ", ".join(sorted(_STRATEGIES))))
+    if not isinstance(locator, str) or not locator.strip():
+        raise ValueError("Locator must be a non-empty string, got %r"
+                         % (locator,))
+    by = by.lower()
+    strategy, translate = _STRATEGIES[by]
+    compiled = CompiledLocator(by, locator, strategy, translate(locator))
+    with _interned_lock:
+        compiled = _interned.setdefault(key, compiled)
+        while len(_interned) > _MAX_INTERNED:
+            _interned.popitem(last=False)
+        return compiled
+
+
+def relative_to_container(child: CompiledLocator) -> CompiledLocator:
+    """
+    Get the locator to find a child with from its container element. XPath
+    paths starting with '//' are made relative ('.//'), so that they find
+    descendants of the container, as they do once combined with the
+    container's locator (see combine()).
+
+    :param child: The child's locator, relative to the container
+
+    :return: The locator to find the child with
+    """
+    if child.by != "xpath":
+        return child
+    paths = [path.strip() for path in _split(child.locator, "|", False)]
+    if not any(path.startswith("//") for path in paths):
+        return child
+    return compile_locator("xpath", " | ".join(
+        "." + path if path.startswith("//") else path for path in paths))
+
+
+def combine(container: CompiledLocator,
+            child: CompiledLocator) -> CompiledLocator:
+    """
+    Flatten a container and a locator relative to it into a single query,
+    so that the child is found with one WebDriver command: CSS locators (and
+    ids, names, class names and tag names) are joined with a descendant
+    combinator, XPath locators by appending the child's path to the
+    container's. Selector lists ('a, b') and unions ('a | b') are expanded
+    into every combination.
+
+    :param container: The container's locator
+    :param child: The child's locator, relative to the container
+
+    :return: The combined locator, or 'None' if the two can't be written as
+        one query (such as a CSS container with an XPath or link text child)
+    """
+    container_css = container.as_css()
+    child_css = child.as_css()
+    if container_css is not None and child_css is not None:
+        return compile_locator("css_selector", ", ".join(
+            "%s %s" % (outer.strip(), inner.strip())
+            for outer in _split(container_css, ",", True)
+            for inner in _split(child_css, ",", True)))
+    if container.by == "xpath" and child.by == "xpath":
+        paths = []
+        for outer in _split(container.locator, "|", False):
+            for inner in _split(child.locator, "|", False):
+                path = _join_xpath(outer.strip(), inner.strip())
+                if path is None:
+                    return None
+                paths.append(path)
+        return compile_locator("xpath", " | ".join(paths))
+    return None
+
+
+def _join_xpath(container: str, child: str):
+    if child == ".":
+        return container
+    if child.startswith(".//") or child.startswith("./"):
+        return container + child[1:]
+    if child.startswith("//"):
+        # Descendants of the container, like './/'; see
+        # relative_to_container()
+        return container + child
+    if child.startswith("/") or child.startswith("("):
+        # Absolute paths and expressions can't be made relative
+        return None
+    return container + "/" + child
+
+
+def _split(text: str, separator: str, escapes: bool):
+    """
+    Split 'text' on 'separator' where it isn't nested inside brackets,
+    parentheses or quotes. With 'escapes', a backslash escapes the next
+    character (as in CSS).
+    """
+    parts = []
+    depth = 0
+    quote = None
+    escaped = False
+    start = 0
+    for i, char in enumerate(text):
+        if escaped:
+            escaped = False
+        elif char == "\\" and escapes:
+            escaped = True
+        elif quote is not None:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+
+from .stats import percentile
+
+# Metrics measured in seconds since the navigation started
+TIME_METRICS = ("ttfb", "dom_interactive", "dom_content_loaded", "load",
+                "first_paint", "first_contentful_paint")
+# Metrics measured in bytes, or counted
+SIZE_METRICS = ("transfer_size", "resource_count", "resource_transfer_size")
+METRICS = TIME_METRICS + SIZE_METRICS
+
+
+def parse_timing(raw: dict, navigation_epoch: int = None) -> dict:
+    """
+    Turn the result of scripts.NAVIGATION_TIMING_JS into a timing record.
+
+    :param raw: The script's result
+    :param navigation_epoch: The DriverEnvironment's navigation epoch the
+        timing belongs to
+
+    :return: A dict with the 'url', the 'page' (the name of the Page class
+        that checked its budgets against the timing, or 'None'), the
+        'navigation_epoch', the wall clock 'time' it was taken at, the
+        'metrics' (times in seconds; 'None' for what hasn't happened yet) and
+        the slowest 'resources' (times in seconds)
+    """
+    metrics = dict(raw.get("metrics") or {})
+    for name in TIME_METRICS:
+        if metrics.get(name) is not None:
+            metrics[name] = metrics[name] / 1000.0
+    resources = []
+    for resource in raw.get("resources") or ():
+        resource = dict(resource)
+        resource["start"] = resource["start"] / 1000.0
+        resource["duration"] = resource["duration"] / 1000.0
+        resources.append(resource)
+    return {
+        "url": raw.get("url"),
+        "page": None,
+        "navigation_epoch": navigation_epoch,
+        "time": time.time(),
+        "metrics": {name: metrics.get(name) for name in METRICS},
+        "resources": resources,
+    }
+
+
+def check_budgets(budgets: dict):
+    """
+    Validate a dict of metric -> limit.
+
+    :exception ValueError: If a metric is unknown or a limit isn't a
+        non-negative number
+    """
+    for metric, limit in budgets.items():
+        if metric not in METRICS:
+            raise ValueError("Unknown performance metric '%s', expected one "
+                             "of: %s" % (metric, ", ".join(METRICS)))
+        if not isinstance(limit, (int, float)) or limit < 0:
+            raise ValueError("Budget for '%s' must be a number >= 0, got %r"
+                             % (metric, limit))
+
+
+def exceeded_budgets(budgets: dict, timing: dict) -> dict:
+    """
+    :param budgets: Dict of metric -> limit
+    :param timing: A timing record, see parse_timing()
+
+    :return: Dict of metric -> (measured value, limit) for every budget the
+        timing exceeds. Metrics that weren't measured don't exceed anything
+    """
+    exceeded = {}
+    for metric, limit in budgets.items():
+        value = timing["metrics"].get(metric)
+        if value is not None and value > limit:
+            exceeded[metric] = (value, limit)
+    return exceeded
+
+
+class PerformanceLog:
+    """
+    Keeps the timing of every navigation made by the Sessions (or
+    DriverEnvironments) it is given to, and aggregates them. A log can be
+    shared by Sessions on several threads.
+
+    With a path, every timing is also appended to that file as a line of
+    JSON, and the timings already in the file are loaded, so that runs (and
+    the worker processes of a ParallelRunner) using the same file are
+    aggregated together.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        :param path: Optional file to append timings to, and load earlier
+            timings from
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        self._timings = []
+        if path is not None:
+            self.reload()
+
+    def get_path(self):
+        """
+        :return: The file timings are appended to, or 'None'
+        """
+        return self._path
+
+    def reload(self):
+        """
+        Load the timings in the file again, including those appended by
+        other processes since this log was created.
+        """
+        timings = []
+        if os.path.exists(self._path):
+            with open(self._path, encoding="utf-8") as f:
+                for line in f:
+                    # A line still being written by another process is skipped
+                    try:
+                        timings.append(json.loads(line))
+                    except ValueError:
+                        pass
+        with self._lock:
+            self._timings = timings
+
+    def record(self, timing: dict):
+        """
+        Add the timing of a navigation.
+
+        :param timing: The timing record, see parse_timing()
+        """
+        with self._lock:
+            self._timings.append(timing)
+            if self._path is not None:
+                # One write per line, so that appends from several processes
+                # don't interleave
+                line = (json.dumps(timing) + "\n").encode("utf-8")
+                fd = os.open(self._path,
+                             os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+
+    def get_timings(self, url: str = None, page: str = None) -> list:
+        """
+        :param url: Only timings of this URL
+        :param page: Only timings checked by the Page class of this name
+
+        :return: The timing records, oldest first
+        """
+        with self._lock:
+            return [t for t in self._timings
+                    if (url is None or t["url"] == url) and
+                    (page is None or t["page"] == page)]
+
+    def get_stats(self, url: str = None, page: str = None) -> dict:
+        """
+        :param url: Only aggregate timings of this URL
+        :param page: Only aggregate timings checked by the Page class of this
+            name
+
+        :return: A dict of metric -> dict with the number of measurements,
+            and the mean, p50, p95 and max. Times are in seconds
+        """
+        stats = {}
+        timings = self.get_timings(url, page)
+        for metric in METRICS:
+            values = sorted(t["metrics"][metric] for t in timings
+                            if t["metrics"].get(metric) is not None)
+            if values:
+                stats[metric] = {
+                    "count": len(values),
+                    "mean": sum(values) / len(values),
+                    "p50": percentile(values, 0.50),
+                    "p95": percentile(values, 0.95),
+                    "max": values[-1],
+                }
+        return stats
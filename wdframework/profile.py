@@ -0,0 +1,291 @@
+from typing import Tuple
+
+from selenium import webdriver
+
+from .exceptions import DriverEnvironmentException
+
+# Browser names DriverEnvironment accepts -> the canonical name
+_ALIASES = {
+    "android": "android",
+    "chrome": "chrome",
+    "edge": "edge",
+    "ff": "firefox",
+    "firefox": "firefox",
+    "ie": "internetexplorer",
+    "internet_explorer": "internetexplorer",
+    "internetexplorer": "internetexplorer",
+    "opera": "opera",
+    "phantom": "phantomjs",
+    "phantomjs": "phantomjs",
+    "safari": "safari",
+}
+
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+
+# Chrome preferences: 2 blocks the content setting
+_CHROME_BLOCK_IMAGES = {"profile.managed_default_content_settings.images": 2}
+
+# Firefox preferences
+_FIREFOX_BLOCK_IMAGES = {"permissions.default.image": 2}
+_FIREFOX_BLOCK_FONTS = {"browser.display.use_document_fonts": 0,
+                        "gfx.downloadable_fonts.enabled": False}
+_FIREFOX_BLOCK_MEDIA = {"media.autoplay.default": 5,
+                        "media.preload.default": 0}
+_FIREFOX_NO_ANIMATIONS = {"ui.prefersReducedMotion": 1,
+                          "toolkit.cosmeticAnimations.enabled": False}
+
+
+def resolve_browser(browser_string: str) -> str:
+    """
+    Resolve a browser string, including aliases such as 'ff', 'ie' and
+    'phantom', to its canonical name.
+
+    :param browser_string: The string matching the name of the browser
+
+    :return: The canonical name, such as 'firefox' or 'internetexplorer'
+
+    :exception DriverEnvironmentException: If the browser isn't known
+    """
+    browser = _ALIASES.get((browser_string or "").lower())
+    if browser is None:
+        raise DriverEnvironmentException(
+            "Unknown browser '%s', expected one of: %s"
+            % (browser_string, ", ".join(sorted(_ALIASES))))
+    return browser
+
+
+class BrowserProfile:
+    """
+    Describes how to launch a browser: the capabilities, command line
+    arguments and preferences to start it with, and where its driver binary
+    is. fast() returns a profile tuned for test throughput: headless, without
+    images, web fonts, media or animations, and with the 'eager' page load
+    strategy, so that navigation returns once the DOM is ready instead of
+    after every subresource has loaded.
+
+    Arguments and preferences are only understood by Chrome and Firefox
+    (PhantomJS can skip images); other browsers get the page load strategy
+    and any extra capabilities, and are resized after launch.
+
+    Profiles are immutable; use with_options() to derive a different one.
+    """
+
+    def __init__(self, headless: bool = False, block_images: bool = False,
+                 block_fonts: bool = False, block_media: bool = False,
+                 disable_animations: bool = False,
+                 page_load_strategy: str = None,
+                 window_size: Tuple[int, int] = None, driver_path: str = None,
+                 arguments: Tuple[str, ...] = (), preferences: dict = None,
+                 capabilities: dict = None):
+        """
+        :param headless: Run the browser without a window
+        :param block_images: Don't load images
+        :param block_fonts: Don't download web fonts
+        :param block_media: Don't autoplay or preload audio and video
+        :param disable_animations: Turn CSS animations and transitions off,
+            by asking for reduced motion and by adding a stylesheet to every
+            page the DriverEnvironment navigates to
+        :param page_load_strategy: 'normal', 'eager' or 'none'; 'None' leaves
+            the driver's default ('normal')
+        :param window_size: (width, height) of the browser window
+        :param driver_path: Path of the driver binary (chromedriver,
+            geckodriver, ...) for local browsers
+        :param arguments: Extra command line arguments (Chrome and Firefox)
+        :param preferences: Extra browser preferences (Chrome and Firefox)
+        :param capabilities: Extra capabilities, applied last
+        """
+        if page_load_strategy is not None and \
+                page_load_strategy not in PAGE_LOAD_STRATEGIES:
+            raise ValueError("Unknown page load strategy '%s', expected one "
+                             "of: %s" % (page_load_strategy,
+                                         ", ".join(PAGE_LOAD_STRATEGIES)))
+        if window_size is not None and (len(window_size) != 2 or
+                                        min(window_size) <= 0):
+            raise ValueError("window_size must be (width, height)")
+        self._options = {
+            "headless": headless,
+            "block_images": block_images,
+            "block_fonts": block_fonts,
+            "block_media": block_media,
+            "disable_animations": disable_animations,
+            "page_load_strategy": page_load_strategy,
+            "window_size": tuple(window_size) if window_size else None,
+            "driver_path": driver_path,
+            "arguments": tuple(arguments),
+            "preferences": dict(preferences or {}),
+            "capabilities": dict(capabilities or {}),
+        }
+
+    @staticmethod
+    def fast(**options) -> "BrowserProfile":
+        """
+        :param options: Options to override, see __init__()
+
+        :return: A profile for fast, headless test runs
+        """
+        fast = {"headless": True, "block_images": True, "block_fonts": True,
+                "block_media": True, "disable_animations": True,
+                "page_load_strategy": "eager", "window_size": (1366, 768)}
+        fast.update(options)
+        return BrowserProfile(**fast)
+
+    def with_options(self, **options) -> "BrowserProfile":
+        """
+        :param options: Options to change, see __init__()
+
+        :return: A copy of this profile with some options changed
+        """
+        changed = dict(self._options)
+        changed.update(options)
+        return BrowserProfile(**changed)
+
+    def get_options(self) -> dict:
+        """
+        :return: The options of this profile, see __init__()
+        """
+        return dict(self._options)
+
+    def get_driver_path(self):
+        """
+        :return: Path of the driver binary, or 'None' for the default
+        """
+        return self._options["driver_path"]
+
+    def get_window_size(self):
+        """
+        :return: (width, height) of the browser window, or 'None'
+        """
+        return self._options["window_size"]
+
+    def disables_animations(self) -> bool:
+        """
+        :return: Whether pages should get the no-animations stylesheet
+        """
+        return self._options["disable_animations"]
+
+    def sizes_window_on_launch(self, browser_string: str) -> bool:
+        """
+        :return: Whether the window size is part of the browser's arguments;
+            otherwise the window has to be resized after launch
+        """
+        return resolve_browser(browser_string) in ("chrome", "firefox")
+
+    def to_capabilities(self, browser_string: str) -> dict:
+        """
+        Build the capabilities to start a browser with.
+
+        :param browser_string: The string matching the name of the browser
+
+        :return: The capabilities
+
+        :exception DriverEnvironmentException: If the browser isn't known
+        """
+        browser = resolve_browser(browser_string)
+        o = self._options
+        capabilities = dict(getattr(webdriver.DesiredCapabilities,
+                                    browser.upper()))
+        if o["page_load_strategy"] is not None:
+            capabilities["pageLoadStrategy"] = o["page_load_strategy"]
+        if browser == "chrome":
+            capabilities["chromeOptions"] = self._chrome_options()
+        elif browser == "firefox":
+            capabilities["moz:firefoxOptions"] = self._firefox_options()
+        elif browser == "phantomjs" and o["block_images"]:
+            capabilities["phantomjs.page.settings.loadImages"] = False
+        capabilities.update(o["capabilities"])
+        return capabilities
+
+    def launch(self, browser_string: str, capabilities: dict = None):
+        """
+        Launch a local browser with this profile. Can be given to a
+        DriverPool or ParallelRunner as its launcher.
+
+        :param browser_string: The string matching the name of the browser
+        :param capabilities: Capabilities to launch with instead of this
+            profile's
+
+        :return: A new WebDriver
+        """
+        # Imported here; driver_env imports this module
+        from .driver_env import DriverEnvironment
+        if capabilities is None:
+            capabilities = self.to_capabilities(browser_string)
+        # noinspection PyProtectedMember
+        driver = DriverEnvironment._BrowserSwitch().string_to_browser(
+            browser_string, capabilities, self.get_driver_path())
+        self.size_window(driver, browser_string)
+        return driver
+
+    def size_window(self, driver, browser_string: str):
+        """
+        Resize the window of a browser that couldn't be started at the
+        profile's window size.
+
+        :param driver: The WebDriver
+        :param browser_string: The string matching the name of the browser
+        """
+        size = self.get_window_size()
+        if size is not None and not self.sizes_window_on_launch(
+                browser_string):
+            driver.set_window_size(*size)
+
+    def _chrome_options(self) -> dict:
+        o = self._options
+        arguments = []
+        preferences = {}
+        if o["headless"]:
+            arguments += ["--headless", "--disable-gpu"]
+        if o["window_size"]:
+            arguments.append("--window-size=%d,%d" % o["window_size"])
+        if o["block_images"]:
+            arguments.append("--blink-settings=imagesEnabled=false")
+            preferences.update(_CHROME_BLOCK_IMAGES)
+        if o["block_fonts"]:
+            arguments.append("--disable-remote-fonts")
+        if o["block_media"]:
+            arguments += ["--autoplay-policy=user-gesture-required",
+                          "--mute-audio"]
+        if o["disable_animations"]:
+            arguments.append("--force-prefers-reduced-motion")
+        arguments += o["arguments"]
+        preferences.update(o["preferences"])
+        options = {"args": arguments, "extensions": []}
+        if preferences:
+            options["prefs"] = preferences
+        return options
+
+    def _firefox_options(self) -> dict:
+        o = self._options
+        arguments = []
+        preferences = {}
+        if o["headless"]:
+            arguments.append("-headless")
+        if o["window_size"]:
+            arguments += ["-width=%d" % o["window_size"][0],
+                          "-height=%d" % o["window_size"][1]]
+        if o["block_images"]:
+            preferences.update(_FIREFOX_BLOCK_IMAGES)
+        if o["block_fonts"]:
+            preferences.update(_FIREFOX_BLOCK_FONTS)
+        if o["block_media"]:
+            preferences.update(_FIREFOX_BLOCK_MEDIA)
+        if o["disable_animations"]:
+            preferences.update(_FIREFOX_NO_ANIMATIONS)
+        arguments += o["arguments"]
+        preferences.update(o["preferences"])
+        return {"args": arguments, "prefs": preferences}
+
+    def __eq__(self, other):
+        return isinstance(other, BrowserProfile) and \
+            self._options == other._options
+
+    def __hash__(self):
+        # Dicts are hashed by their keys only, which equal profiles share
+        return hash(tuple(
+            (name, frozenset(value) if isinstance(value, dict) else value)
+            for name, value in sorted(self._options.items())))
+
+    def __repr__(self):
+        return "BrowserProfile(%s)" % ", ".join(
+            "%s=%r" % item for item in sorted(self._options.items())
+            if item[1])
@@ -0,0 +1,241 @@
+import threading
+import time
+from typing import Callable, Iterable
+
+from .exceptions import RemoteSchedulerException, TimeoutException
+from .wait import WaitPolicy
+
+
+class RemoteNode:
+    """
+    A remote WebDriver server (a Selenium node, or a grid hub) that a
+    RemoteScheduler places sessions on, and its live slot accounting.
+    """
+
+    def __init__(self, url: str, capacity: int = 1):
+        """
+        :param url: URL of the WebDriver server
+        :param capacity: How many sessions the node can run at once
+        """
+        if capacity < 1:
+            raise ValueError("Capacity of a RemoteNode must be at least 1")
+        self.url = url
+        self.capacity = capacity
+        self.in_use = 0
+        self.launches = 0
+        self.failures = 0
+        self.slow_launches = 0
+        self.blacklisted_until = 0.0
+
+    def is_available(self, now: float) -> bool:
+        """
+        :param now: time.monotonic()
+
+        :return: Whether a new session can be placed on this node: it has a
+            free slot and isn't blacklisted
+        """
+        return self.in_use < self.capacity and now >= self.blacklisted_until
+
+    def get_load(self) -> float:
+        """
+        :return: The fraction of this node's slots that are in use
+        """
+        return self.in_use / self.capacity
+
+    def get_stats(self, now: float) -> dict:
+        """
+        :param now: time.monotonic()
+
+        :return: A dict with the node's capacity, slots in use, number of
+            launches, failed and slow launches, and the seconds left on its
+            blacklisting (0 if it isn't blacklisted)
+        """
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "launches": self.launches,
+            "failures": self.failures,
+            "slow_launches": self.slow_launches,
+            "blacklisted_for": max(0.0, self.blacklisted_until - now),
+        }
+
+
+class RemoteScheduler:
+    """
+    Places browser sessions on a fleet of remote WebDriver servers. Each new
+    session goes to the least-loaded node (sessions in use relative to its
+    capacity) that is healthy and has a free slot; the slot is held until
+    the session's DriverEnvironment is closed. When every node is full,
+    launches wait for a slot to be released.
+
+    A node whose launch fails is blacklisted for 'cooldown' seconds and the
+    session is retried on another node. A launch that succeeds but takes
+    longer than 'slow_launch' seconds keeps its session, but blacklists the
+    node the same way. Blacklisted nodes rejoin once their cooldown is over.
+
+    Pass a RemoteScheduler to a Session or DriverEnvironment instead of a
+    remote_url. One scheduler can be shared by Sessions on several threads.
+    """
+
+    def __init__(self, nodes: Iterable, cooldown: float = 30.0,
+                 slow_launch: float = None, max_attempts: int = None,
+                 queue_timeout: float = 60.0, policy: WaitPolicy = None):
+        """
+        :param nodes: RemoteNodes, (url, capacity) tuples, or URLs (with a
+            capacity of 1)
+        :param cooldown: Seconds a failing or slow node is blacklisted for
+        :param slow_launch: Seconds after which a launch counts as slow; 'None'
+            never counts a launch as slow
+        :param max_attempts: Nodes to try for one session before giving up;
+            'None' tries every node once
+        :param queue_timeout: Seconds to wait for a free slot when every node
+            is full or blacklisted
+        :param policy: WaitPolicy for polling for a free slot
+        """
+        self._nodes = []
+        for node in nodes:
+            if isinstance(node, str):
+                node = RemoteNode(node)
+            elif not isinstance(node, RemoteNode):
+                node = RemoteNode(*node)
+            self._nodes.append(node)
+        if not self._nodes:
+            raise RemoteSchedulerException(
+                "A RemoteScheduler needs at least one node")
+        self._cooldown = cooldown
+        self._slow_launch = slow_launch
+        self._max_attempts = max_attempts or len(self._nodes)
+        self._queue_timeout = queue_timeout
+        self._policy = policy or WaitPolicy()
+        self._lock = threading.Lock()
+        self._placed = {}
+        self._retries = 0
+
+    def get_nodes(self) -> list:
+        """
+        :return: The RemoteNodes of this scheduler
+        """
+        return list(self._nodes)
+
+    def launch(self, start: Callable):
+        """
+        Start a session on the least-loaded available node, retrying on other
+        nodes if it fails.
+
+        :param start: Function taking a node URL and returning a new WebDriver
+            on that node
+
+        :return: The new WebDriver. Release its slot with release() once it
+            is quit
+
+        :exception RemoteSchedulerException: If the session couldn't be
+            started on any of 'max_attempts' nodes, or no slot became free
+            within the queue timeout
+        """
+        tried = []
+        errors = []
+        while len(tried) < self._max_attempts:
+            node = self._reserve(tried)
+            if node is None:
+                break
+            tried.append(node)
+            if len(tried) > 1:
+                with self._lock:
+                    self._retries += 1
+            start_time = time.monotonic()
+            try:
+                driver = start(node.url)
+            except Exception as e:
+                errors.append("%s: %s" % (node.url, e))
+                self._failed(node)
+                continue
+            self._launched(node, driver, time.monotonic() - start_time)
+            return driver
+        raise RemoteSchedulerException(
+            "Couldn't start a session on any node"
+            + ("".join("\n  " + error for error in errors) if errors else
+               ": no node was available"))
+
+    def release(self, driver):
+        """
+        Free the slot held by a driver started with launch().
+
+        :param driver: The WebDriver, after it was quit
+        """
+        with self._lock:
+            node = self._placed.pop(id(driver), None)
+            if node is not None:
+                node.in_use -= 1
+
+    def blacklist(self, url: str, cooldown: float = None):
+        """
+        Stop placing sessions on a node for a while, such as after a session
+        on it started failing.
+
+        :param url: URL of the node
+        :param cooldown: Seconds to blacklist it for; the scheduler's cooldown
+            by default
+        """
+        cooldown = self._cooldown if cooldown is None else cooldown
+        with self._lock:
+            for node in self._nodes:
+                if node.url == url:
+                    node.blacklisted_until = time.monotonic() + cooldown
+
+    def get_stats(self) -> dict:
+        """
+        :return: A dict with the number of sessions in use, the number of
+            launches retried on another node, and a dict of node URL -> the
+            node's stats (see RemoteNode.get_stats())
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "in_use": len(self._placed),
+                "retries": self._retries,
+                "nodes": {node.url: node.get_stats(now)
+                          for node in self._nodes},
+            }
+
+    def _reserve(self, tried: list):
+        """
+        Take a slot on the least-loaded available node that hasn't been
+        tried yet, waiting for one to become free.
+
+        :return: The node, or 'None' if every node has been tried, or none
+            became available before the queue timeout
+        """
+        def check():
+            now = time.monotonic()
+            with self._lock:
+                untried = [n for n in self._nodes if n not in tried]
+                if not untried:
+                    return [None]
+                candidates = [n for n in untried if n.is_available(now)]
+                if not candidates:
+                    return None
+                # Least loaded first; ties go to the node with more room
+                node = min(candidates,
+                           key=lambda n: (n.get_load(), -n.capacity))
+                node.in_use += 1
+                return [node]
+
+        try:
+            return self._policy.poll(check, "a free WebDriver node",
+                                     self._queue_timeout)[0]
+        except TimeoutException:
+            return None
+
+    def _launched(self, node: RemoteNode, driver, elapsed: float):
+        with self._lock:
+            node.launches += 1
+            self._placed[id(driver)] = node
+            if self._slow_launch is not None and elapsed > self._slow_launch:
+                node.slow_launches += 1
+                node.blacklisted_until = time.monotonic() + self._cooldown
+
+    def _failed(self, node: RemoteNode):
+        with self._lock:
+            node.in_use -= 1
+            node.failures += 1
+            node.blacklisted_until = time.monotonic() + self._cooldown
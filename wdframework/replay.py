@@ -0,0 +1,163 @@
+import json
+import threading
+
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver  # For type hinting
+
+from .exceptions import ReplayDivergenceException
+
+# First line of every recording
+FORMAT = "wdframework-replay"
+VERSION = 1
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+
+def _normalize(params):
+    # Compare parameters the way they went over the wire
+    return json.loads(_dumps(params))
+
+
+class RecordingConnection:
+    """
+    A command executor that passes every command on to the driver's real
+    command executor and appends the command, its parameters and the response
+    to a recording, one JSON object per line. Lines are flushed as they are
+    written, so a recording of a run that crashed is still usable up to the
+    crash.
+    """
+
+    def __init__(self, executor, path: str):
+        """
+        :param executor: The command executor to pass commands on to
+        :param path: Path of the recording to write
+        """
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._file = open(path, "w")
+        self._write({"format": FORMAT, "version": VERSION})
+
+    def execute(self, command, params):
+        """
+        Send a command and record it.
+        """
+        try:
+            response = self._executor.execute(command, params)
+        except Exception as e:
+            self._write({"c": command, "p": params,
+                         "e": "%s: %s" % (type(e).__name__, e)})
+            raise
+        self._write({"c": command, "p": params, "r": response})
+        return response
+
+    def record_session(self, driver: WebDriver):
+        """
+        Record the new session command of an already-started driver, so that
+        replay can start a session too. Its parameters aren't recorded, which
+        means any capabilities can be asked for on replay.
+
+        :param driver: The driver
+        """
+        if driver.w3c:
+            response = {"value": {"sessionId": driver.session_id,
+                                  "capabilities": driver.capabilities}}
+        else:
+            response = {"status": 0, "sessionId": driver.session_id,
+                        "value": driver.capabilities}
+        self._write({"c": Command.NEW_SESSION, "p": None, "r": response})
+
+    def get_executor(self):
+        """
+        :return: The command executor commands are passed on to
+        """
+        return self._executor
+
+    def close(self):
+        """
+        Close the recording. Commands sent afterwards are no longer recorded.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _write(self, entry):
+        line = _dumps(entry) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+                self._file.flush()
+
+
+class ReplayConnection:
+    """
+    A command executor that answers commands from a recording made by a
+    RecordingConnection, without a browser. Each command must match the next
+    recorded one (same command and parameters); the first one that doesn't
+    raises ReplayDivergenceException.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the recording to replay
+
+        :exception ReplayDivergenceException: If the file isn't a recording
+        """
+        with open(path) as f:
+            lines = f.read().splitlines()
+        header = json.loads(lines[0]) if lines else {}
+        if header.get("format") != FORMAT:
+            raise ReplayDivergenceException(
+                "%s is not a WebDriver recording" % path)
+        if header.get("version") != VERSION:
+            raise ReplayDivergenceException(
+                "Unsupported recording version %s" % header.get("version"))
+        self._path = path
+        self._entries = [json.loads(line) for line in lines[1:] if line]
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def execute(self, command, params):
+        """
+        Answer a command with the recorded response.
+
+        :exception ReplayDivergenceException: If the command or its parameters
+            differ from what was recorded, or the recording has ended
+        """
+        with self._lock:
+            index = self._position
+            if index >= len(self._entries):
+                raise ReplayDivergenceException(
+                    "Command %d (%s) was sent after the end of the recording "
+                    "%s" % (index, command, self._path))
+            entry = self._entries[index]
+            if entry["c"] != command:
+                raise ReplayDivergenceException(
+                    "Command %d diverged from the recording %s: expected %s, "
+                    "got %s" % (index, self._path, entry["c"], command))
+            if entry["p"] is not None and entry["p"] != _normalize(params):
+                raise ReplayDivergenceException(
+                    "Command %d (%s) diverged from the recording %s: expected "
+                    "parameters %s, got %s" % (index, command, self._path,
+                                               _dumps(entry["p"]),
+                                               _dumps(params)))
+            self._position += 1
+        if "e" in entry:
+            raise ConnectionError("Recorded failure: %s" % entry["e"])
+        return entry["r"]
+
+    def get_position(self) -> int:
+        """
+        :return: The number of recorded commands replayed so far
+        """
+        return self._position
+
+    def get_remaining(self) -> int:
+        """
+        :return: The number of recorded commands not replayed yet
+        """
+        return len(self._entries) - self._position
+
+    def close(self):
+        pass
@@ -0,0 +1,290 @@
+import multiprocessing
+import multiprocessing.util
+import os
+import time
+import traceback
+from typing import Callable, Iterable, List
+
+from .artifacts import ArtifactCollector
+from .driver_pool import DriverPool
+from .profile import BrowserProfile
+from .session import Session
+from .store import Store
+from .wait import WaitPolicy
+
+
+class TestResult:
+    """
+    The outcome of a single test run by a ParallelRunner.
+    """
+    __slots__ = ("name", "passed", "error", "traceback", "duration", "worker")
+
+    # Not a test class, despite the name
+    __test__ = False
+
+    def __init__(self, name: str, passed: bool, error: str, tb: str,
+                 duration: float, worker: int):
+        self.name = name
+        self.passed = passed
+        self.error = error
+        self.traceback = tb
+        self.duration = duration
+        self.worker = worker
+
+    def __repr__(self):
+        return "TestResult(%s, %s)" % (
+            self.name, "passed" if self.passed else "failed: " + self.error)
+
+
+class RunReport:
+    """
+    Aggregated results of a ParallelRunner run.
+    """
+
+    def __init__(self, results: List[TestResult], duration: float,
+                 workers: int):
+        self._results = results
+        self._duration = duration
+        self._workers = workers
+
+    def get_results(self) -> List[TestResult]:
+        """
+        :return: Every TestResult, in the order the tests were given
+        """
+        return list(self._results)
+
+    def get_passed(self) -> List[TestResult]:
+        """
+        :return: The TestResults of the tests that passed
+        """
+        return [r for r in self._results if r.passed]
+
+    def get_failed(self) -> List[TestResult]:
+        """
+        :return: The TestResults of the tests that failed
+        """
+        return [r for r in self._results if not r.passed]
+
+    def get_summary(self) -> dict:
+        """
+        :return: A dict with the number of tests, passes and failures, the
+            number of workers, the wall-clock duration of the run, the summed
+            duration of every test, and the throughput in tests per second
+        """
+        tests = len(self._results)
+        test_time = sum(r.duration for r in self._results)
+        return {
+            "tests": tests,
+            "passed": len(self.get_passed()),
+            "failed": len(self.get_failed()),
+            "workers": self._workers,
+            "worker_pids": len(set(r.worker for r in self._results)),
+            "duration": self._duration,
+            "test_time": test_time,
+            "tests_per_second":
+                tests / self._duration if self._duration else 0.0,
+        }
+
+
+# Per-worker state, set up by _init_worker in each worker process
+_worker_pool = None
+_worker_config = None
+
+
+def _init_worker(config: dict):
+    global _worker_pool, _worker_config
+    _worker_config = config
+    # One browser per worker; it is reset between tests and replaced if it
+    # crashes or reaches max_uses
+    _worker_pool = DriverPool(max_uses=config["driver_max_uses"], max_idle=1,
+                              launcher=config["launcher"])
+    # Workers leave through os._exit, which skips atexit; multiprocessing's own
+    # finalizers do run
+    multiprocessing.util.Finalize(None, _worker_pool.close, exitpriority=10)
+    if config["artifacts"] is not None:
+        # Each worker has its own copy, and writes it out before leaving
+        multiprocessing.util.Finalize(None, config["artifacts"].close,
+                                      exitpriority=20)
+
+
+def _run_test(test: Callable) -> TestResult:
+    name = "%s.%s" % (getattr(test, "__module__", "?"),
+                      getattr(test, "__qualname__", repr(test)))
+    start = time.perf_counter()
+    session = Session(_worker_config["browser"], _worker_config["host"],
+                      _worker_pool, _worker_config["wait_policy"],
+                      store=_worker_config["store"],
+                      profile=_worker_config["profile"],
+                      artifacts=_worker_config["artifacts"])
+    error = tb = None
+    try:
+        if _worker_config["start_session"]:
+            session.start()
+        test(session)
+    except Exception as e:
+        error = "%s: %s" % (type(e).__name__, e)
+        tb = traceback.format_exc()
+        if _worker_config["artifacts"] is not None:
+            try:
+                session.capture_artifacts(name)
+            except Exception:
+                # The browser may be what failed
+                pass
+    finally:
+        try:
+            session.close()
+        except Exception:
+            # The browser is already gone; the pool replaces it
+            pass
+    return TestResult(name, error is None, error, tb,
+                      time.perf_counter() - start, os.getpid())
+
+
+class ParallelRunner:
+    """
+    Runs tests in parallel over a pool of worker processes.
+
+    A test is any picklable callable (usually a module-level function) that
+    takes a Session. Each worker process owns its own browser, which it reuses
+    across the tests it runs (reset between tests, see DriverPool), and every
+    test gets its own fresh Session. Workers are replaced after running
+    'tests_per_worker' tests, to bound the effect of leaks in long runs. A
+    browser that crashes is replaced by the worker's DriverPool before the
+    next test.
+
+    The number of workers defaults to what both the available CPUs and the
+    available memory allow, see default_worker_count().
+    """
+
+    def __init__(self, browser: str, host: str, workers: int = None,
+                 tests_per_worker: int = 50, driver_max_uses: int = None,
+                 memory_per_worker: int = 512 * 1024 * 1024,
+                 wait_policy: WaitPolicy = None, start_session: bool = True,
+                 launcher: Callable = None, store: Store = None,
+                 profile: BrowserProfile = None,
+                 artifacts: ArtifactCollector = None):
+        """
+        :param browser: The string matching the name of the browser
+        :param host: URL each Session navigates to when started
+        :param workers: Number of worker processes. Defaults to
+            default_worker_count(memory_per_worker)
+        :param tests_per_worker: Tests a worker runs before it is replaced.
+            'None' means workers are never replaced
+        :param driver_max_uses: Tests a browser is used for before it is
+            replaced. 'None' means for the life of the worker
+        :param memory_per_worker: Bytes of memory to budget per worker (worker
+            process plus browser) when choosing the number of workers
+        :param wait_policy: Default WaitPolicy for every Session
+        :param start_session: Whether Sessions are started (navigated to
+            'host') before being handed to the test
+        :param launcher: Picklable callable to launch browsers with, see
+            DriverPool
+        :param store: Store every Session uses instead of a new, empty one.
+            Give it an SQLiteBackend to share data between the workers
+        :param profile: BrowserProfile to launch every browser with. Unless a
+            launcher is given, browsers are launched with profile.launch
+        :param artifacts: ArtifactCollector to capture a screenshot, the page
+            source and the browser log of every failed test with, named after
+            the test
+        """
+        self._workers = workers or self.default_worker_count(
+            memory_per_worker)
+        self._tests_per_worker = tests_per_worker
+        self._config = {
+            "browser": browser,
+            "host": host,
+            "driver_max_uses": driver_max_uses,
+            "wait_policy": wait_policy,
+            "start_session": start_session,
+            "launcher": launcher if launcher is not None or profile is None
+            else profile.launch,
+            "store": store,
+            "profile": profile,
+            "artifacts": artifacts,
+        }
+
+    def get_workers(self) -> int:
+        """
+        :return: The number of worker processes this runner uses
+        """
+        return self._workers
+
+    def run(self, tests: Iterable[Callable]) -> RunReport:
+        """
+        Run tests and wait for all of them to finish.
+
+        :param tests: Callables taking a Session
+
+        :return: The aggregated results
+        """
+        tests = list(tests)
+        start = time.perf_counter()
+        with multiprocessing.Pool(self._workers, _init_worker,
+                                  (self._config,),
+                                  self._tests_per_worker) as pool:
+            results = pool.map(_run_test, tests, chunksize=1)
+            # Let the workers exit on their own, so their finalizers (closing
+            # browsers, writing artifacts) run instead of being terminated
+            pool.close()
+            pool.join()
+        return RunReport(results, time.perf_counter() - start, self._workers)
+
+    @staticmethod
+    def default_worker_count(memory_per_worker: int) -> int:
+        """
+        Work out how many workers this machine (or container) can run: one per
+        usable CPU, limited by how many times 'memory_per_worker' fits into the
+        available memory. CPU affinity and cgroup CPU and memory limits are
+        taken into account where the platform exposes them.
+
+        :param memory_per_worker: Bytes of memory to budget per worker
+
+        :return: The number of workers, at least 1
+        """
+        cpus = _available_cpus()
+        memory = _available_memory()
+        if memory is not None and memory_per_worker:
+            cpus = min(cpus, memory // memory_per_worker)
+        return max(1, int(cpus))
+
+
+def _read_first_line(path: str):
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    # cgroup v2 quota, e.g. "200000 100000" for two CPUs, or "max 100000"
+    quota = _read_first_line("/sys/fs/cgroup/cpu.max")
+    if quota:
+        limit, period = quota.split()[:2]
+        if limit != "max":
+            cpus = min(cpus, max(1, int(limit) // int(period)))
+    return cpus
+
+
+def _available_memory():
+    available = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    # cgroup v2 memory limit
+    limit = _read_first_line("/sys/fs/cgroup/memory.max")
+    if limit and limit != "max":
+        usage = _read_first_line("/sys/fs/cgroup/memory.current") or 0
+        remaining = int(limit) - int(usage)
+        available = remaining if available is None \
+            else min(available, remaining)
+    return available
@@ -0,0 +1,484 @@
+# JavaScript shared by the parts of the framework that talk to the browser in
+# a single round trip instead of through individual WebDriver commands. Scripts
+# are kept minified; the readable equivalent is documented above each one.
+
+# Defines __wdfFind(by, value, all), which locates elements the same way the
+# WebDriver 'find_element(s)_by_*' methods do for the 'by' strings Selector
+# accepts. Returns a single element (or null), or an array when 'all' is true.
+#
+# var __wdfFind = function(by, value, all) {
+#   var query = function(css) {
+#     return all ? toArray(document.querySelectorAll(css))
+#                : document.querySelector(css);
+#   };
+#   var quote = function(s) { return '"' + escapeQuotesAndSlashes(s) + '"'; };
+#   switch (by) {
+#     case 'css_selector': return query(value);
+#     case 'id':           return query('[id=' + quote(value) + ']');
+#     case 'name':         return query('[name=' + quote(value) + ']');
+#     case 'class_name':   return query('[class~=' + quote(value) + ']');
+#     case 'tag_name':     return query(value);
+#     case 'xpath':        // snapshot (all) or first ordered node
+#       ...
+#     case 'link_text':
+#     case 'partial_link_text':
+#       // Anchors whose trimmed visible text equals (or contains) 'value'
+#       ...
+#   }
+#   return all ? [] : null;
+# };
+FIND_JS = (
+    "var __wdfFind=function(b,v,a){"
+    "var d=document,t=function(l){return Array.prototype.slice.call(l);},"
+    "q=function(s){return a?t(d.querySelectorAll(s)):d.querySelector(s);},"
+    "k=function(s){return '\"'+s.replace(/([\"\\\\])/g,'\\\\$1')+'\"';};"
+    "switch(b){"
+    "case'css_selector':case'tag_name':return q(v);"
+    "case'id':return q('[id='+k(v)+']');"
+    "case'name':return q('[name='+k(v)+']');"
+    "case'class_name':return q('[class~='+k(v)+']');"
+    "case'xpath':var r=d.evaluate(v,d,null,a?7:9,null);"
+    "if(!a){return r.singleNodeValue;}"
+    "var n=[];for(var i=0;i<r.snapshotLength;i++){n.push(r.snapshotItem(i));}"
+    "return n;"
+    "case'link_text':case'partial_link_text':"
+    "var m=t(d.getElementsByTagName('a')).filter(function(e){"
+    "var x=(e.innerText||e.textContent||'').trim();"
+    "return b==='link_text'?x===v:x.indexOf(v)!==-1;});"
+    "return a?m:(m[0]||null);}"
+    "return a?[]:null;};")
+
+# Defines __wdfRead(element, fields), which reads the requested fields of an
+# element into a plain object. 'displayed' is an approximation of WebDriver's
+# visibility check: the element must have a layout box and must not be hidden
+# through 'visibility' or 'display'.
+#
+# var __wdfRead = function(e, fields) {
+#   var out = {};
+#   fields.forEach(function(f) {
+#     switch (f) {
+#       case 'text':       out.text = e.innerText; break;
+#       case 'value':      out.value = e.value; break;
+#       case 'tag_name':   out.tag_name = e.tagName.toLowerCase(); break;
+#       case 'attributes': out.attributes = {name: value, ...}; break;
+#       case 'classes':    out.classes = toArray(e.classList); break;
+#       case 'rect':       out.rect = {x, y, width, height}; break;
+#       case 'displayed':  out.displayed = hasLayoutBox && visible; break;
+#       case 'enabled':    out.enabled = !e.disabled; break;
+#       case 'selected':   out.selected = !!(e.selected || e.checked); break;
+#     }
+#   });
+#   return out;
+# };
+READ_JS = (
+    "var __wdfRead=function(e,f){var o={};f.forEach(function(n){switch(n){"
+    "case'text':o.text=e.innerText===undefined?e.textContent:e.innerText;"
+    "break;"
+    "case'value':o.value=e.value===undefined?null:e.value;break;"
+    "case'tag_name':o.tag_name=e.tagName.toLowerCase();break;"
+    "case'attributes':var a={};for(var i=0;i<e.attributes.length;i++){"
+    "a[e.attributes[i].name]=e.attributes[i].value;}o.attributes=a;break;"
+    "case'classes':o.classes=Array.prototype.slice.call(e.classList);break;"
+    "case'rect':var r=e.getBoundingClientRect();o.rect={"
+    "x:r.left+window.pageXOffset,y:r.top+window.pageYOffset,"
+    "width:r.width,height:r.height};break;"
+    "case'displayed':var s=window.getComputedStyle(e);"
+    "o.displayed=!!(e.offsetWidth||e.offsetHeight||"
+    "e.getClientRects().length)&&s.visibility!=='hidden'&&"
+    "s.display!=='none';break;"
+    "case'enabled':o.enabled=!e.disabled;break;"
+    "case'selected':o.selected=!!(e.selected||e.checked);break;}});"
+    "return o;};")
+
+# Snapshot a single element in one round trip.
+# arguments: [by, value, fields]. Returns null if no element was found.
+SNAPSHOT_JS = (FIND_JS + READ_JS +
+               "var e=__wdfFind(arguments[0],arguments[1],false);"
+               "return e?__wdfRead(e,arguments[2]):null;")
+
+# Check the state of many locators in one round trip.
+# arguments: [[[by, value], ...], state] where state is one of 'present',
+# 'absent', 'visible' or 'hidden'. Returns an array of booleans, one per
+# locator, in the same order.
+STATES_JS = (FIND_JS + READ_JS +
+             "var s=arguments[1];return arguments[0].map(function(l){"
+             "var e=__wdfFind(l[0],l[1],false);"
+             "var v=!!e&&__wdfRead(e,['displayed']).displayed;"
+             "switch(s){case'present':return !!e;case'absent':return !e;"
+             "case'visible':return v;case'hidden':return !v;}"
+             "return false;});")
+
+# The states STATES_JS understands
+STATES = ("present", "absent", "visible", "hidden")
+
+# Defines the conditions Selector.wait_for() can wait on:
+#
+# __wdfObserve(by, value, state, name) reads the part of the page the state
+# depends on: presence or visibility (a boolean), the element's text, or the
+# value of its attribute 'name' (null when the element is missing).
+#
+# __wdfMatch(state, current, expected, initial) decides whether the state has
+# been reached. For 'text' and 'attribute', when 'expected' is null the state
+# is reached once the observed value differs from 'initial'; otherwise text
+# must contain 'expected' and the attribute must equal it.
+WAIT_CONDITION_JS = (
+    FIND_JS + READ_JS +
+    "var __wdfObserve=function(b,v,s,n){var e=__wdfFind(b,v,false);"
+    "if(s==='text'){return e?(__wdfRead(e,['text']).text||''):null;}"
+    "if(s==='attribute'){return e?e.getAttribute(n):null;}"
+    "if(s==='visible'||s==='hidden'){"
+    "return !!e&&__wdfRead(e,['displayed']).displayed;}"
+    "return !!e;};"
+    "var __wdfMatch=function(s,c,x,i){switch(s){"
+    "case'present':case'visible':return c;"
+    "case'absent':case'hidden':return !c;"
+    "case'text':return c!==null&&(x===null?c!==i:c.indexOf(x)!==-1);"
+    "case'attribute':return x===null?c!==i:c===x;}return false;};")
+
+# The states WAIT_CONDITION_JS understands
+WAIT_STATES = STATES + ("text", "attribute")
+
+# Wait for a condition inside the browser, without polling from Python.
+# Must be run with execute_async_script.
+# arguments: [by, value, state, expected, name, timeout_ms, callback]
+# Calls back with {ok: bool, elapsed: ms}. The condition is checked
+# immediately, then on every DOM mutation. Changes that cause no mutation
+# (stylesheet or layout driven visibility) are caught by a 100 ms in-browser
+# re-check.
+#
+# var done = false, initial = __wdfObserve(...), start = Date.now();
+# var check = function() {
+#   if (__wdfMatch(state, __wdfObserve(...), expected, initial)) finish(true);
+# };
+# var finish = function(ok) {
+#   // once only: disconnect observer, clear timers
+#   callback({ok: ok, elapsed: Date.now() - start});
+# };
+# check();
+# if (!done) {
+#   new MutationObserver(check).observe(document.documentElement,
+#     {childList: true, subtree: true, attributes: true, characterData: true});
+#   setInterval(check, 100);
+#   setTimeout(function() { finish(false); }, timeout_ms);
+# }
+WAIT_FOR_JS = (
+    WAIT_CONDITION_JS +
+    "var a=arguments,b=a[0],v=a[1],s=a[2],x=a[3],n=a[4],t=a[5],"
+    "cb=a[a.length-1],d=false,o=null,iv=null,to=null,st=Date.now(),"
+    "i=__wdfObserve(b,v,s,n);"
+    "var f=function(r){if(d){return;}d=true;if(o){o.disconnect();}"
+    "clearInterval(iv);clearTimeout(to);cb({ok:r,elapsed:Date.now()-st});};"
+    "var c=function(){if(__wdfMatch(s,__wdfObserve(b,v,s,n),x,i)){f(true);}};"
+    "c();if(!d){o=new MutationObserver(c);"
+    "o.observe(document.documentElement||document,{childList:true,"
+    "subtree:true,attributes:true,characterData:true});"
+    "iv=setInterval(c,100);to=setTimeout(function(){f(false);},t);}")
+
+# Synchronous, single check of a WAIT_CONDITION_JS condition, used when the
+# driver can't run asynchronous scripts.
+# arguments: [by, value, state, expected, name, initial, has_initial]
+# Returns [matched, current]; 'current' should be passed back as 'initial'
+# on subsequent checks.
+WAIT_CHECK_JS = (
+    WAIT_CONDITION_JS +
+    "var a=arguments,c=__wdfObserve(a[0],a[1],a[2],a[4]);"
+    "var i=a[6]?a[5]:c;return [__wdfMatch(a[2],c,a[3],i),c];")
+
+# Performs queued Selector actions (see ActionBatch) in order, in a single
+# round trip. Stops early at an element that can't be found ('missing') or
+# at an action the script can't perform with the same effect as WebDriver
+# ('fallback'), which the caller then performs itself.
+# arguments: [[[kind, by, value, text], ...]]
+# Returns {done: number of actions performed, status: 'ok', 'missing' or
+# 'fallback'}
+#
+# var editable = function(e) {
+#   return (e is a textarea or an input of type text, search, email, url,
+#           tel, password or number) && !e.disabled && !e.readOnly;
+# };
+# var fire = function(e, type) {
+#   e.dispatchEvent(new Event(type, {bubbles: true}));
+# };
+# for (var i = 0; i < actions.length; i++) {
+#   var kind = actions[i][0], text = actions[i][3];
+#   var e = __wdfFind(actions[i][1], actions[i][2], false);
+#   if (!e) return {done: i, status: 'missing'};
+#   if (kind === 'clear' || kind === 'send_keys') {
+#     // Special keys (WebDriver's private use characters) need real events
+#     if (!editable(e) ||
+#         (kind === 'send_keys' && /[\ue000-\uf8ff]/.test(text)))
+#       return {done: i, status: 'fallback'};
+#     e.focus();
+#     e.value = kind === 'clear' ? '' : e.value + text;
+#     fire(e, 'input');
+#     fire(e, 'change');
+#   } else if (kind === 'click') {
+#     if (!e.getClientRects().length) return {done: i, status: 'fallback'};
+#     e.click();
+#   } else if (kind === 'submit') {
+#     var form = e.form || (e.tagName === 'FORM' ? e : null);
+#     if (!form) return {done: i, status: 'fallback'};
+#     // Like WebDriver's submit atom: the submit event, then submit()
+#     if (form.dispatchEvent(new Event('submit', {bubbles: true,
+#                                                 cancelable: true})))
+#       form.submit();
+#     // The page is about to change; leave the rest to another call
+#     return {done: i + 1, status: 'ok'};
+#   }
+# }
+# return {done: actions.length, status: 'ok'};
+BATCH_JS = (
+    FIND_JS +
+    "var q=arguments[0],r=function(d,s){return {done:d,status:s};};"
+    "var ed=function(e){var t=(e.getAttribute('type')||'').toLowerCase();"
+    "return (e.tagName==='TEXTAREA'||(e.tagName==='INPUT'&&"
+    "/^(text|search|email|url|tel|password|number|)$/.test(t)))&&"
+    "!e.disabled&&!e.readOnly;};"
+    "var fi=function(e,t){e.dispatchEvent(new Event(t,{bubbles:true}));};"
+    "for(var i=0;i<q.length;i++){var k=q[i][0],x=q[i][3],"
+    "e=__wdfFind(q[i][1],q[i][2],false);if(!e){return r(i,'missing');}"
+    "if(k==='clear'||k==='send_keys'){"
+    "if(!ed(e)||(k==='send_keys'&&/[\\ue000-\\uf8ff]/.test(x))){"
+    "return r(i,'fallback');}"
+    "e.focus();e.value=k==='clear'?'':e.value+x;fi(e,'input');fi(e,'change');"
+    "}else if(k==='click'){if(!e.getClientRects().length){"
+    "return r(i,'fallback');}e.click();"
+    "}else if(k==='submit'){var f=e.form||(e.tagName==='FORM'?e:null);"
+    "if(!f){return r(i,'fallback');}"
+    "if(f.dispatchEvent(new Event('submit',{bubbles:true,cancelable:true})))"
+    "{f.submit();}return r(i+1,'ok');}}"
+    "return r(q.length,'ok');")
+
+# Locates several elements at once.
+# arguments: [[[by, value], ...]]
+# Returns an array with the first element matching each locator, or null
+FIND_EACH_JS = (
+    FIND_JS +
+    "return arguments[0].map(function(l){return __wdfFind(l[0],l[1],false);"
+    "});")
+
+# Returns the outer HTML of the first element matching a locator, or null.
+# arguments: [by, value]
+OUTER_HTML_JS = (
+    FIND_JS +
+    "var e=__wdfFind(arguments[0],arguments[1],false);"
+    "return e?e.outerHTML:null;")
+
+# Reads a chunk of the document's comments, in document order, with a
+# TreeWalker. The walker is kept on the document between calls, so reading
+# the next chunk resumes where the previous one stopped instead of walking
+# the document from the start again; it starts over when an earlier offset
+# is asked for, and is dropped with the document on navigation.
+# arguments: [offset, count, with_paths]
+# Returns {comments: [text, ...] or [[text, xpath], ...], done: bool}
+#
+# var path = function(node) {
+#   // XPath of the node, such as '/html[1]/body[1]/comment()[2]'
+#   var steps = [];
+#   for (; node && node.nodeType !== Node.DOCUMENT_NODE;
+#        node = node.parentNode) {
+#     var index = 1;
+#     var step = node.nodeType === Node.COMMENT_NODE ? 'comment()'
+#                                                    : lowercase tag name;
+#     for each preceding sibling of the same kind (comment, or element with
+#         the same tag name): index++;
+#     steps.unshift(step + '[' + index + ']');
+#   }
+#   return '/' + steps.join('/');
+# };
+# var state = document.__wdfComments;
+# if (!state || state.index > offset) {
+#   state = document.__wdfComments = {
+#     walker: document.createTreeWalker(document, NodeFilter.SHOW_COMMENT),
+#     index: 0};
+# }
+# while (state.index < offset && state.walker.nextNode()) state.index++;
+# var comments = [];
+# while (comments.length < count) {
+#   var node = state.walker.nextNode();
+#   if (!node) break;
+#   state.index++;
+#   comments.push(withPaths ? [node.data, path(node)] : node.data);
+# }
+# return {comments: comments, done: comments.length < count};
+COMMENTS_JS = (
+    "var a=arguments,o=a[0],n=a[1],p=a[2],d=document,s=d.__wdfComments;"
+    "var x=function(e){var q=[];for(;e&&e.nodeType!==9;e=e.parentNode){"
+    "var k=1,c=e.nodeType===8,t=c?'comment()':e.nodeName.toLowerCase();"
+    "for(var b=e.previousSibling;b;b=b.previousSibling){"
+    "if(b.nodeType===e.nodeType&&(c||b.nodeName===e.nodeName)){k++;}}"
+    "q.unshift(t+'['+k+']');}return '/'+q.join('/');};"
+    "if(!s||s.i>o){s=d.__wdfComments={w:d.createTreeWalker(d,128),i:0};}"
+    "while(s.i<o&&s.w.nextNode()){s.i++;}"
+    "var r=[];while(r.length<n){var c=s.w.nextNode();if(!c){break;}s.i++;"
+    "r.push(p?[c.data,x(c)]:c.data);}"
+    "return {comments:r,done:r.length<n};")
+
+# Defines __wdfLoaded(locators, state, idle_ms), which reports whether the
+# page is loaded: document.readyState is 'complete', every [by, value]
+# locator is in 'state' (see STATES_JS), and no fetch() or XMLHttpRequest has
+# been in flight for 'idle_ms' (a negative 'idle_ms' skips the network).
+# The first call instruments fetch() and XMLHttpRequest to count requests in
+# flight; network activity before that is taken from the resource timing
+# entries, which only list finished requests.
+#
+# var __wdfLoaded = function(locators, state, idleMs) {
+#   var net = window.__wdfNet;
+#   if (!net && idleMs >= 0) {
+#     net = window.__wdfNet = {pending: 0, quiet: <latest responseEnd of the
+#                              performance 'resource' entries, or 0>};
+#     var tracker = function() {   // one per request, counts down once
+#       return function() { net.pending--; net.quiet = performance.now(); };
+#     };
+#     wrap XMLHttpRequest.prototype.send: pending++, count down on 'loadend'
+#       (or if send throws);
+#     wrap window.fetch: pending++, count down when the promise settles (or
+#       if fetch throws);
+#   }
+#   var status = {
+#     ready_state: document.readyState === 'complete',
+#     selectors: locators.every(<element in state>),
+#     pending: net ? net.pending : 0,
+#     now: performance.now()};
+#   status.network_idle = idleMs < 0 ||
+#       (status.pending === 0 && status.now - net.quiet >= idleMs);
+#   status.loaded = ready_state && selectors && network_idle;
+#   return status;
+# };
+LOADED_CONDITION_JS = (
+    FIND_JS + READ_JS +
+    "var __wdfLoaded=function(l,s,q){var w=window,n=w.__wdfNet,"
+    "p=w.performance;"
+    "if(!n&&q>=0){n=w.__wdfNet={pending:0,quiet:0};"
+    "p.getEntriesByType('resource').forEach(function(r){"
+    "n.quiet=Math.max(n.quiet,r.responseEnd);});"
+    "var k=function(){var c=false;return function(){if(!c){c=true;"
+    "n.pending--;n.quiet=p.now();}};};"
+    "var X=w.XMLHttpRequest;if(X){var xs=X.prototype.send;"
+    "X.prototype.send=function(){var f=k();n.pending++;"
+    "this.addEventListener('loadend',f);"
+    "try{return xs.apply(this,arguments);}catch(x){f();throw x;}};}"
+    "if(w.fetch){var wf=w.fetch;w.fetch=function(){var f=k(),r;n.pending++;"
+    "try{r=wf.apply(this,arguments);}catch(x){f();throw x;}"
+    "r.then(f,f);return r;};}}"
+    "var o={ready_state:document.readyState==='complete',"
+    "selectors:l.every(function(x){var e=__wdfFind(x[0],x[1],false);"
+    "var v=!!e&&__wdfRead(e,['displayed']).displayed;"
+    "switch(s){case'present':return !!e;case'absent':return !e;"
+    "case'visible':return v;case'hidden':return !v;}return false;}),"
+    "pending:n?n.pending:0,now:p.now()};"
+    "o.network_idle=q<0||(o.pending===0&&o.now-n.quiet>=q);"
+    "o.loaded=o.ready_state&&o.selectors&&o.network_idle;return o;};")
+
+# Wait for the page to be loaded (see LOADED_CONDITION_JS) inside the
+# browser. Must be run with execute_async_script.
+# arguments: [locators, state, idle_ms, timeout_ms, callback]
+# Calls back with the final status of __wdfLoaded plus {ok: bool,
+# elapsed: ms, first: {condition: ms after the start it was first met}}.
+# The conditions are checked immediately, then every 50 ms.
+#
+# var start = Date.now(), first = {};
+# var check = function() {
+#   var status = __wdfLoaded(...);
+#   record in 'first' when each of ready_state, selectors and network_idle
+#   is met for the first time;
+#   if (status.loaded) finish(status);
+# };
+# var finish = function(status) {
+#   // once only: clear timers
+#   status.ok = status.loaded; status.elapsed = Date.now() - start;
+#   status.first = first; callback(status);
+# };
+# check();
+# if (!done) {
+#   setInterval(check, 50);
+#   setTimeout(function() { finish(__wdfLoaded(...)); }, timeout_ms);
+# }
+LOADED_JS = (
+    LOADED_CONDITION_JS +
+    "var a=arguments,l=a[0],s=a[1],q=a[2],t=a[3],cb=a[a.length-1],"
+    "st=Date.now(),d=false,iv=null,to=null,m={};"
+    "var f=function(r){if(d){return;}d=true;clearInterval(iv);"
+    "clearTimeout(to);r.ok=r.loaded;r.elapsed=Date.now()-st;r.first=m;"
+    "cb(r);};"
+    "var c=function(){var r=__wdfLoaded(l,s,q);"
+    "['ready_state','selectors','network_idle'].forEach(function(k){"
+    "if(r[k]&&!(k in m)){m[k]=Date.now()-st;}});if(r.loaded){f(r);}};"
+    "c();if(!d){iv=setInterval(c,50);"
+    "to=setTimeout(function(){f(__wdfLoaded(l,s,q));},t);}")
+
+# Synchronous, single check of LOADED_CONDITION_JS, used when the driver
+# can't run asynchronous scripts.
+# arguments: [locators, state, idle_ms]
+# Returns the status of __wdfLoaded.
+LOADED_CHECK_JS = (
+    LOADED_CONDITION_JS +
+    "return __wdfLoaded(arguments[0],arguments[1],arguments[2]);")
+
+# Turns CSS animations and transitions off for the current document, so that
+# nothing has to be waited on to finish moving. Adds one style element; does
+# nothing if it was already added, or there is no document element yet.
+#
+# if (!document.getElementById('__wdf-no-animations') &&
+#     document.documentElement) {
+#   var style = document.createElement('style');
+#   style.id = '__wdf-no-animations';
+#   style.textContent = '*, *::before, *::after { animation and transition
+#       durations and delays of 0s, scroll-behavior: auto, all !important }';
+#   (document.head || document.documentElement).appendChild(style);
+# }
+NO_ANIMATIONS_JS = (
+    "var d=document;if(!d.getElementById('__wdf-no-animations')&&"
+    "d.documentElement){var s=d.createElement('style');"
+    "s.id='__wdf-no-animations';"
+    "s.textContent='*,*::before,*::after{animation-duration:0s!important;"
+    "animation-delay:0s!important;transition-duration:0s!important;"
+    "transition-delay:0s!important;scroll-behavior:auto!important;}';"
+    "(d.head||d.documentElement).appendChild(s);}")
+
+# Reads the Navigation Timing, Paint Timing and Resource Timing entries of the
+# current document. Times are in milliseconds since the navigation started;
+# metrics that haven't happened yet (such as 'load' while the page is still
+# loading) are null. Falls back to the legacy performance.timing.
+# arguments: [max_resources]
+# Returns {url, metrics: {ttfb, dom_interactive, dom_content_loaded, load,
+# first_paint, first_contentful_paint, transfer_size, resource_count,
+# resource_transfer_size}, resources: [{name, initiator_type, start,
+# duration, transfer_size}, ...] (the 'max_resources' slowest)}, or null
+# without a performance API.
+#
+# var p = window.performance;
+# var v = function(x) { return x > 0 ? x : null; };
+# var n = p.getEntriesByType('navigation')[0];
+# if (n) metrics from n.responseStart, domInteractive,
+#     domContentLoadedEventEnd, loadEventEnd, transferSize;
+# else metrics from performance.timing, relative to navigationStart;
+# for each 'paint' entry: first_paint / first_contentful_paint = startTime;
+# resources = 'resource' entries, counted and their transferSize summed,
+#     sorted by duration, the slowest max_resources returned;
+NAVIGATION_TIMING_JS = (
+    "var p=window.performance,m=arguments[0];if(!p){return null;}"
+    "var v=function(x){return x>0?x:null;},"
+    "g=function(k){return p.getEntriesByType?p.getEntriesByType(k):[];},"
+    "n=g('navigation')[0],o;"
+    "if(n){o={ttfb:v(n.responseStart),dom_interactive:v(n.domInteractive),"
+    "dom_content_loaded:v(n.domContentLoadedEventEnd),"
+    "load:v(n.loadEventEnd),transfer_size:n.transferSize||0};}"
+    "else{var t=p.timing,s=t.navigationStart;"
+    "o={ttfb:v(t.responseStart-s),dom_interactive:v(t.domInteractive-s),"
+    "dom_content_loaded:v(t.domContentLoadedEventEnd-s),"
+    "load:v(t.loadEventEnd-s),transfer_size:0};}"
+    "o.first_paint=null;o.first_contentful_paint=null;"
+    "g('paint').forEach(function(e){"
+    "o[e.name.replace(/-/g,'_')]=e.startTime;});"
+    "var r=g('resource').map(function(e){return{name:e.name,"
+    "initiator_type:e.initiatorType,start:e.startTime,duration:e.duration,"
+    "transfer_size:e.transferSize||0};});"
+    "o.resource_count=r.length;o.resource_transfer_size=0;"
+    "r.forEach(function(e){o.resource_transfer_size+=e.transfer_size;});"
+    "r.sort(function(a,b){return b.duration-a.duration;});"
+    "return{url:location.href,metrics:o,resources:r.slice(0,m)};")
+
+# Opens a new, blank window (a tab, in most browsers). WebDriver stays on the
+# current window; the new one is found by comparing window handles.
+OPEN_WINDOW_JS = "window.open('about:blank','_blank');"
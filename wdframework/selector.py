@@ -1,14 +1,47 @@
-from typing import List
+from typing import Iterable, List
+import functools
 import time
 
+from . import scripts
+from .action_batch import ActionBatch
+from .element_snapshot import ElementSnapshot
 from .exceptions import TimeoutException
+from .locator import CompiledLocator, combine, compile_locator, \
+    relative_to_container
 from .session import Session
+from .tracing import SELECTOR, WAIT
+from .wait import WaitPolicy
 
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, \
+    StaleElementReferenceException
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as ExpectedCondition
 
 
+def _traced(kind: str = SELECTOR):
+    """
+    Record calls to a Selector method in the Session's Tracer, if it has one.
+    Calls made from within another traced Selector call (such as the get()
+    done by click()) are part of the outer call and not recorded separately.
+    """
+    def decorate(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def traced(self, *args, **kwargs):
+            tracer = self.get_session().get_tracer()
+            if tracer is None:
+                return method(self, *args, **kwargs)
+            current = tracer.current_span()
+            if current is not None and current.kind in (SELECTOR, WAIT):
+                return method(self, *args, **kwargs)
+            with tracer.span(name, kind, self.get_locator(),
+                             self.get_owner()):
+                return method(self, *args, **kwargs)
+        return traced
+    return decorate
+
+
 class Selector(object):
     """
     Wraps a web element's selector (CSS, XPATH, etc) for the purpose of quickly
@@ -19,28 +52,109 @@ class Selector(object):
     discarded after one use, it greatly reduces the amount of
     StaleElementReferenceExceptions that would be thrown by WebDriver due to DOM
     changes after creating an instance of a web element.
+
+    Selectors can optionally cache their web element instead ('cache=True').
+    A caching Selector reuses the last WebElement it located, saving a find
+    command per call. If WebDriver reports the cached WebElement as stale, it
+    is located again and the call is retried once, and the cached WebElement
+    is dropped whenever the browser is navigated through the DriverEnvironment.
+    Hits, misses and stale WebElements are counted in the Session's
+    ElementCacheStats.
+
+    If the Session has a Tracer, every call is recorded in it, attributed to
+    the Selector's locator and to its 'owner' (the Page or Component the
+    Selector belongs to).
+
+    A Selector with a 'container' is scoped: its locator is relative to the
+    element the container Selector locates, and elements are found with
+    'find_element(s)' on that element instead of from the document root. A
+    caching container is located once per render and shared by every Selector
+    scoped to it; if it turned out to be stale, it is located again and the
+    find is retried once. XPath locators starting with '//' are taken
+    relative to the container, like './/' (see
+    locator.relative_to_container()). Methods that locate the element with a script
+    (snapshot(), wait_for(), wait_any(), wait_all(), ActionBatch) use the
+    locator combined with the container's (see get_query()).
     """
 
     def __init__(self, session: Session, locator: str,
-                 by: str = "css_selector"):
+                 by: str = "css_selector", cache: bool = False,
+                 owner=None, container: "Selector" = None):
+        """
+        :param session: The current Session
+        :param locator: The locator
+        :param by: How to locate elements: 'css_selector', 'xpath', 'id',
+            'name', 'class_name', 'tag_name', 'link_text' or
+            'partial_link_text'
+        :param cache: Whether to cache the located WebElement
+        :param owner: The Page or Component this Selector belongs to
+        :param container: Selector of the element to search inside of,
+            instead of the whole document
+
+        :exception ValueError: If 'by' is unknown or the locator is empty
+        """
         self.__session = session
-        self.__locator = locator
-        self.__by = by.lower()
+        self.__owner = owner
+        self.__container = container
+        self.__compiled = compile_locator(by, locator)
+        self.__locator = self.__compiled.locator
+        self.__by = self.__compiled.by
+        if container is None:
+            self.__query = self.__compiled
+            self.__relative = self.__compiled
+        else:
+            self.__relative = relative_to_container(self.__compiled)
+            outer = container.get_query_or_none()
+            self.__query = None if outer is None \
+                else combine(outer, self.__compiled)
+        self.__cache = cache
+        self.__element = None
+        self.__element_epoch = None
 
     @staticmethod
-    def with_container(session: Session, container: str, css_locator: str):
+    def with_container(session: Session, container, locator: str,
+                       by: str = "css_selector") -> "Selector":
         """
-        Create a new Selector with a parent container.
+        Create a new Selector with a parent container, located with a single
+        query: CSS locators (including ids, names, class names and tag names)
+        are joined with a descendant combinator, XPath locators by appending
+        the locator's path to the container's (see locator.combine()).
 
         :param session: The current Session
         :param container: Parent container the new Selector will use as its
-        frame-of-reference
-        :param css_locator: CSS locator for the new Selector
+        frame-of-reference; a CSS locator or a Selector
+        :param locator: Locator for the new Selector, relative to the
+        container
+        :param by: How to locate elements with 'locator'
 
         :return: A new instance of a Selector inside of a parent container
+
+        :exception ValueError: If the container and locator can't be combined
+        into one query, such as a CSS container and an XPath locator
         """
-        locator = [container, css_locator]
-        return Selector(session, "".join(locator))
+        if isinstance(container, Selector):
+            container = container.get_compiled_locator()
+        else:
+            container = compile_locator("css_selector", container)
+        combined = combine(container, compile_locator(by, locator))
+        if combined is None:
+            raise ValueError("%r and %r can't be combined into one query"
+                             % (container, compile_locator(by, locator)))
+        return Selector(session, combined.locator, combined.by)
+
+    @staticmethod
+    def batch(session: Session, trusted_input: bool = False) -> ActionBatch:
+        """
+        Create an ActionBatch, which queues actions on many Selectors and
+        performs them with as few WebDriver commands as possible.
+
+        :param session: The Session the Selectors belong to
+        :param trusted_input: Send clicks and typing as real input events
+            through the W3C Actions endpoint
+
+        :return: A new, empty ActionBatch
+        """
+        return ActionBatch(session, trusted_input)
 
     def get_locator(self):
         """
@@ -58,6 +172,48 @@ class Selector(object):
         """
         return self.__by
 
+    def get_compiled_locator(self) -> CompiledLocator:
+        """
+        Get the validated locator this Selector locates elements with
+
+        :return: The CompiledLocator, shared with every Selector using the
+            same locator
+        """
+        return self.__compiled
+
+    def get_container(self):
+        """
+        Get the Selector this Selector is scoped to
+
+        :return: The container Selector, or 'None'
+        """
+        return self.__container
+
+    def get_query(self) -> CompiledLocator:
+        """
+        Get a locator that finds this Selector's elements from the document
+        root: its own locator, or for a scoped Selector its locator combined
+        with its container's (see locator.combine()). Used by everything that
+        locates elements with a script.
+
+        :return: The CompiledLocator
+
+        :exception ValueError: If this Selector is scoped and its locator
+            can't be combined with its container's, such as link text inside
+            a CSS container
+        """
+        if self.__query is None:
+            raise ValueError("%r inside of %r can only be located through its "
+                             "container" % (self.__compiled,
+                                            self.__container))
+        return self.__query
+
+    def get_query_or_none(self):
+        """
+        :return: See get_query(); 'None' instead of raising ValueError
+        """
+        return self.__query
+
     def get_session(self):
         """
         Get the Session this Selector is part of
@@ -66,11 +222,19 @@ class Selector(object):
         """
         return self.__session
 
+    def get_owner(self):
+        """
+        Get the Page or Component this Selector belongs to
+
+        :return: The owner, or 'None'
+        """
+        return self.__owner
+
     def __get_find_element_method(self, multiple: bool):
         """
-        Private method for finding the proper method to call in WebDriver to
-        locate an element based on a selector. Do not use this method directly,
-        instead use get() or get_multiple()
+        Private method for locating elements with the W3C strategy and value
+        this Selector's locator was compiled to. Do not use this method
+        directly, instead use get() or get_multiple()
 
         :param multiple: Whether we should look for multiple elements
 
@@ -78,22 +242,82 @@ class Selector(object):
 
         :exception NoSuchElementException: If no elements could be found
         """
-        method_name = ["find_elements_by_" if multiple else "find_element_by_",
-                       self.__by]
-        find_element_method = getattr(
-            self.__session.get_driver_env().get_driver(),
-            "".join(method_name),
-            lambda: "INVALID_BY")
-        return find_element_method(self.__locator)
-
+        strategy, value = self.__relative.strategy, self.__relative.value
+        if self.__container is None:
+            driver = self.__session.get_driver_env().get_driver()
+            find = driver.find_elements if multiple else driver.find_element
+            return find(strategy, value)
+        scope = self.__container.get()
+        try:
+            find = scope.find_elements if multiple else scope.find_element
+            return find(strategy, value)
+        except StaleElementReferenceException:
+            # The container was re-rendered since it was cached
+            self.__session.get_element_cache_stats().record("stale")
+            self.__container.invalidate()
+            scope = self.__container.get()
+            find = scope.find_elements if multiple else scope.find_element
+            return find(strategy, value)
+
+    @_traced()
     def get(self) -> WebElement:
         """
-        Attempt to get a WebElement from the page
+        Attempt to get a WebElement from the page. If this Selector caches its
+        WebElement, the cached one is returned if the browser hasn't navigated
+        since it was located.
 
         :return: The WebElement found if it exists
         """
-        return self.__get_find_element_method(False)
+        if not self.__cache:
+            return self.__get_find_element_method(False)
 
+        stats = self.__session.get_element_cache_stats()
+        epoch = self.__session.get_driver_env().get_navigation_epoch()
+        if self.__element is not None:
+            if self.__element_epoch == epoch:
+                stats.record("hits")
+                return self.__element
+            stats.record("invalidated")
+        stats.record("misses")
+        self.__element = None
+        self.__element = self.__get_find_element_method(False)
+        self.__element_epoch = epoch
+        return self.__element
+
+    def invalidate(self):
+        """
+        Drop the cached WebElement, if any, so that the next call locates it
+        again. Has no effect on Selectors that don't cache.
+
+        :return: This instance
+        """
+        self.__element = None
+        return self
+
+    def __on_element(self, action):
+        """
+        Private method that runs 'action' with the WebElement located by this
+        Selector. For caching Selectors, if the cached WebElement turned out to
+        be stale, it is located again and 'action' is retried once.
+
+        :param action: Function taking the WebElement
+
+        :return: What 'action' returned
+        """
+        element = self.get()
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            if not self.__cache:
+                raise
+            self.__session.get_element_cache_stats().record("stale")
+            tracer = self.__session.get_tracer()
+            if tracer is not None and tracer.current_span() is not None:
+                tracer.current_span().retries += 1
+            self.__element = None
+            return action(self.get())
+
+    @_traced()
     def get_multiple(self):
         """
         Attempt to get multiple WebElements from the page
@@ -104,50 +328,60 @@ class Selector(object):
 
     # Web Element Information #
 
+    @_traced()
     def is_present(self) -> bool:
         """
         Whether the WebElement located by this Selector is present.
 
         :return: True if the element is present, False otherwise
         """
+        # A cached WebElement says nothing about whether the element is still
+        # there, so always look
+        self.invalidate()
         try:
             self.get()
             return True
         except NoSuchElementException:
             return False
 
+    @_traced()
     def get_css_classes(self) -> List[str]:
         """
         Get the CSS classes present on the WebElement located by this Selector.
 
         :return: A list of CSS classes present on the WebElement
         """
-        return self.get().get_attribute("class").split(" ")
+        return self.__on_element(
+            lambda e: e.get_attribute("class").split(" "))
 
+    @_traced()
     def is_displayed(self) -> bool:
         """
         Whether the WebElement located by this Selector is displayed.
 
         :return: True if the element is displayed, False otherwise
         """
-        return self.get().is_displayed()
+        return self.__on_element(lambda e: e.is_displayed())
 
+    @_traced()
     def is_enabled(self) -> bool:
         """
         Whether the WebElement located by this Selector is enabled.
 
         :return: True if the element is enabled, False otherwise
         """
-        return self.get().is_enabled()
+        return self.__on_element(lambda e: e.is_enabled())
 
+    @_traced()
     def is_selected(self) -> bool:
         """
         Whether the WebElement located by this Selector is selected.
 
         :return: True if the element is selected, False otherwise
         """
-        return self.get().is_selected()
+        return self.__on_element(lambda e: e.is_selected())
 
+    @_traced()
     def get_attribute(self, name: str) -> str:
         """
         Get an attribute from the WebElement located by this Selector.
@@ -156,8 +390,9 @@ class Selector(object):
 
         :return: The value of the attribute
         """
-        return self.get().get_attribute(name)
+        return self.__on_element(lambda e: e.get_attribute(name))
 
+    @_traced()
     def get_css_value(self, property_name: str) -> str:
         """
         Get a CSS value from the WebElement located by this Selector.
@@ -166,27 +401,33 @@ class Selector(object):
 
         :return: The value of the CSS property
         """
-        return self.get().value_of_css_property(property_name)
+        return self.__on_element(
+            lambda e: e.value_of_css_property(property_name))
 
+    @_traced()
     def get_tag_name(self) -> str:
         """
         Get the name of the tag for the WebElement located by this Selector.
 
         :return: The tag name
         """
-        return self.get().tag_name
+        return self.__on_element(lambda e: e.tag_name)
 
+    @_traced()
     def get_text(self) -> str:
         """
         Get the visible text of the WebElement located by this Selector.
 
         :return: The visible text
         """
-        text = self.get().text
-        if text is None or text is '':
-            text = self.get().get_attribute("value")
-        return text
+        def read(element):
+            text = element.text
+            if text is None or text == '':
+                text = element.get_attribute("value")
+            return text
+        return self.__on_element(read)
 
+    @_traced()
     def get_location(self):
         """
         Get the location (in the frame) of the WebElement located by this
@@ -194,8 +435,9 @@ class Selector(object):
 
         :return: The origin location as a coordinate
         """
-        return self.get().location
+        return self.__on_element(lambda e: e.location)
 
+    @_traced()
     def get_size(self):
         """
         Get the dimensions (in the frame) of the WebElement located by this
@@ -203,8 +445,9 @@ class Selector(object):
 
         :return: The dimensions of the element
         """
-        return self.get().size
+        return self.__on_element(lambda e: e.size)
 
+    @_traced()
     def get_rect(self):
         """
         Get the rectangle (size and dimensions in the frame) of the WebElement
@@ -212,28 +455,65 @@ class Selector(object):
 
         :return: The rectangle of the element
         """
-        return self.get_rect()
+        return self.__on_element(lambda e: e.rect)
+
+    @_traced()
+    def snapshot(self, fields: Iterable[str] = None) -> ElementSnapshot:
+        """
+        Read several pieces of information about the WebElement located by this
+        Selector in a single round trip. Locating the element and reading every
+        requested field is done by one script, instead of one WebDriver command
+        to find the element plus one more per accessor called.
+
+        Available fields are listed in ElementSnapshot.FIELDS: 'text', 'value',
+        'tag_name', 'attributes', 'classes', 'rect', 'displayed', 'enabled' and
+        'selected'. Note that 'text' is the element's rendered text as reported
+        by the browser, which may differ from WebDriver's text in edge cases.
+
+        :param fields: The fields to read. Defaults to all of them
+
+        :return: An immutable snapshot of the element
+
+        :exception NoSuchElementException: If no element could be found
+        :exception ValueError: If an unknown field is requested
+        """
+        fields = ElementSnapshot.FIELDS if fields is None else tuple(fields)
+        unknown = [f for f in fields if f not in ElementSnapshot.FIELDS]
+        if unknown:
+            raise ValueError("Unknown snapshot field(s): %s"
+                             % ", ".join(unknown))
+        query = self.get_query()
+        values = self.__session.get_driver_env().execute_js(
+            False, scripts.SNAPSHOT_JS, [query.by, query.locator, fields])
+        if values is None:
+            raise NoSuchElementException(
+                "Unable to locate element: {\"method\":\"%s\",\"selector\":"
+                "\"%s\"}" % (query.by, query.locator))
+        return ElementSnapshot(fields, values)
 
     # Web Element Actions #
 
+    @_traced()
     def clear(self):
         """
         Clear the WebElement located by this Selector of its current value.
 
         :return: This instance
         """
-        self.get().clear()
+        self.__on_element(lambda e: e.clear())
         return self
 
+    @_traced()
     def click(self):
         """
         Click the WebElement located by this Selector.
 
         :return: This instance
         """
-        self.get().click()
+        self.__on_element(lambda e: e.click())
         return self
 
+    @_traced()
     def send_keys(self, value):
         """
         Send keys (type into) the WebElement located by this Selector.
@@ -242,21 +522,24 @@ class Selector(object):
 
         :return: This instance
         """
-        self.get().send_keys(value)
+        self.__on_element(lambda e: e.send_keys(value))
         return self
 
+    @_traced()
     def submit(self):
         """
         Submit the WebElement located by this Selector.
 
         :return: This instance
         """
-        self.get().submit()
+        self.__on_element(lambda e: e.submit())
         return self
 
     # Waiting #
 
-    def wait_until(self, condition: ExpectedCondition, test=None):
+    @_traced(WAIT)
+    def wait_until(self, condition: ExpectedCondition, test=None,
+                   timeout: float = None, policy: WaitPolicy = None):
         """
         Wait for the WebElement identified by this Selector to match an
         expected condition. WebDriver has expected conditions are defined in
@@ -279,32 +562,202 @@ class Selector(object):
         if 'test' is not 'None', 'condition' will be executed like so:
         ``condition(self.get(), test)``
 
+        While the element is not present (or goes stale between being located
+        and being checked), the condition is treated as not yet satisfied.
+
+        How long to wait and how often to check is decided by 'policy', which
+        defaults to the Session's WaitPolicy.
+
         :param condition: Expected condition function to call
         :param test: Matcher to supply to the expected condition if performing
             matching
+        :param timeout: Seconds to wait, overriding the policy's timeout
+        :param policy: WaitPolicy to use instead of the Session's
 
         :return: This instance
 
         :raises TimeoutException: If a timeout occurred waiting for the first
             found element to match the expected condition
         """
-        now = time.time()
-        delay = now + 10
+        def check():
+            try:
+                if test is None:  # If 'None', just pass our WebElement as the
+                                  # object
+                    return condition(self.get())
+                # Otherwise, we're matching something, so we need to pass the
+                # matcher as well
+                return condition(self.get(), test)
+            except (NoSuchElementException, StaleElementReferenceException):
+                self.invalidate()
+                return False
+
+        policy = policy or self.__session.get_wait_policy()
+        policy.poll(check, "the first found element matching '%s' to match "
+                           "the expected condition" % self.__locator,
+                    timeout, self.__session.get_wait_stats())
+        return self
+
+    @_traced(WAIT)
+    def wait_for(self, state: str = "present", expected: str = None,
+                 name: str = None, timeout: float = None,
+                 policy: WaitPolicy = None):
+        """
+        Wait for the element located by this Selector to reach a state, with
+        the waiting done inside the browser. A MutationObserver re-checks the
+        state whenever the DOM changes, and the wait is a single asynchronous
+        script call, so the wait ends as soon as the state is reached instead
+        of on the next poll, and WebDriver isn't polled in the meantime.
+
+        States:
+            'present' / 'absent': the element exists / doesn't exist
+            'visible' / 'hidden': the element is displayed / isn't displayed
+                (or doesn't exist)
+            'text': the element's text contains 'expected'; if 'expected' is
+                'None', the text changes from what it was when the wait began
+            'attribute': the element's attribute 'name' equals 'expected'; if
+                'expected' is 'None', the attribute changes from what it was
+                when the wait began
+
+        If the driver can't run asynchronous scripts, the same check is polled
+        using 'policy' instead.
+
+        :param state: The state to wait for
+        :param expected: Expected text or attribute value
+        :param name: Attribute name, for the 'attribute' state
+        :param timeout: Seconds to wait, overriding the policy's timeout
+        :param policy: WaitPolicy to use instead of the Session's; its timeout
+            applies to in-browser waits too
+
+        :return: This instance
 
-        while now < delay:
-            if test is None:  # If 'None', just pass our WebElement as the
-                                # object
-                result = condition(self.get())
-            else:  # Otherwise, we're matching something, so we need to pass the
-                    # matcher as well
-                result = condition(self.get(), test)
+        :raises TimeoutException: If the state was not reached before the
+            timeout expired
+        """
+        if state not in scripts.WAIT_STATES:
+            raise ValueError("Unknown state '%s', expected one of: %s"
+                             % (state, ", ".join(scripts.WAIT_STATES)))
+        if state == "attribute" and not name:
+            raise ValueError("An attribute name is required to wait on an "
+                             "attribute")
+        query = self.get_query()
+        policy = policy or self.__session.get_wait_policy()
+        timeout = policy.get_timeout() if timeout is None else timeout
+        description = "element matching '%s' to be %s" % (query.locator,
+                                                          state)
+        if expected is not None:
+            description += " '%s'" % expected
+
+        driver_env = self.__session.get_driver_env()
+        start = time.monotonic()
+        result = driver_env.execute_async_wait(
+            scripts.WAIT_FOR_JS,
+            [query.by, query.locator, state, expected, name], timeout,
+            timed_out={"ok": False})
+        if result is not None:
+            ok = bool(result.get("ok"))
+            self.__session.get_wait_stats().record(
+                1, time.monotonic() - start, not ok)
+            if not ok:
+                raise TimeoutException(
+                    "Timed out after %.2f seconds waiting for %s"
+                    % (timeout, description))
+            return self
+
+        # Only poll for what is left of the timeout
+        timeout = max(0.0, timeout - (time.monotonic() - start))
+        initial = []
+
+        def check():
+            matched, current = driver_env.execute_js(
+                False, scripts.WAIT_CHECK_JS,
+                [query.by, query.locator, state, expected, name,
+                 initial[0] if initial else None, bool(initial)])
+            if not initial:
+                initial.append(current)
+            return matched
+
+        policy.poll(check, description, timeout,
+                    self.__session.get_wait_stats())
+        return self
 
-            if result:
-                return self
-            time.sleep(0.2)
+    @staticmethod
+    def wait_any(selectors: List["Selector"], state: str = "present",
+                 timeout: float = None,
+                 policy: WaitPolicy = None) -> "Selector":
+        """
+        Wait until at least one of several Selectors is in a given state. All
+        Selectors are checked with a single script per poll, no matter how
+        many there are.
 
-        raise TimeoutException("Timed out after %d seconds waiting for the "
-                               "first found element to match the expected"
-                               "condition" % delay)
+        :param selectors: Selectors to check; they must share a Session
+        :param state: One of 'present', 'absent', 'visible' or 'hidden'
+        :param timeout: Seconds to wait, overriding the policy's timeout
+        :param policy: WaitPolicy to use instead of the Session's
 
+        :return: The first Selector (in the order given) found in the state
 
+        :raises TimeoutException: If none of the Selectors reached the state
+            before the timeout expired
+        """
+        results = Selector.__wait_batch(selectors, state, any, timeout,
+                                        policy, "any of")
+        return selectors[results.index(True)]
+
+    @staticmethod
+    def wait_all(selectors: List["Selector"], state: str = "present",
+                 timeout: float = None,
+                 policy: WaitPolicy = None) -> List["Selector"]:
+        """
+        Wait until all of several Selectors are in a given state. All Selectors
+        are checked with a single script per poll, no matter how many there
+        are.
+
+        :param selectors: Selectors to check; they must share a Session
+        :param state: One of 'present', 'absent', 'visible' or 'hidden'
+        :param timeout: Seconds to wait, overriding the policy's timeout
+        :param policy: WaitPolicy to use instead of the Session's
+
+        :return: The Selectors, in the order given
+
+        :raises TimeoutException: If not every Selector reached the state
+            before the timeout expired
+        """
+        Selector.__wait_batch(selectors, state, all, timeout, policy,
+                              "all of")
+        return list(selectors)
+
+    @staticmethod
+    def __wait_batch(selectors, state, reduce, timeout, policy, quantifier):
+        """
+        Private method that polls the state of several Selectors in one script
+        until 'reduce' (any or all) of the results is True. Do not use this
+        method directly, instead use wait_any() or wait_all()
+
+        :return: The per-Selector results of the final, successful poll
+        """
+        if not selectors:
+            raise ValueError("At least one Selector is required")
+        if state not in scripts.STATES:
+            raise ValueError("Unknown state '%s', expected one of: %s"
+                             % (state, ", ".join(scripts.STATES)))
+        session = selectors[0].get_session()
+        if any(s.get_session() is not session for s in selectors):
+            raise ValueError("All Selectors must share the same Session")
+        queries = [s.get_query() for s in selectors]
+        locators = [[q.by, q.locator] for q in queries]
+
+        def check():
+            results = session.get_driver_env().execute_js(
+                False, scripts.STATES_JS, [locators, state])
+            return results if reduce(results) else None
+
+        policy = policy or session.get_wait_policy()
+        description = "%s [%s] to be %s" % (
+            quantifier, ", ".join(q.locator for q in queries), state)
+        tracer = session.get_tracer()
+        if tracer is None:
+            return policy.poll(check, description, timeout,
+                               session.get_wait_stats())
+        with tracer.span("wait_" + reduce.__name__, WAIT, description):
+            return policy.poll(check, description, timeout,
+                               session.get_wait_stats())
@@ -1,6 +1,16 @@
-from .driver_env import DriverEnvironment
+from .artifacts import ArtifactCollector
+from .driver_env import DriverEnvironment, LaunchStats
+from .driver_pool import DriverPool
+from .element_cache import ElementCacheStats
 from .exceptions import SessionException
+from .perf import PerformanceLog
+from .profile import BrowserProfile
+from .remote import RemoteScheduler
 from .store import Store
+from .tabs import SharedBrowser, TabEnvironment
+from .tracing import Tracer
+from .transport import TransportConfig
+from .wait import WaitPolicy, WaitStats
 
 
 class Session:
@@ -25,9 +35,68 @@ class Session:
     the results of latter tests.
     """
 
-    def __init__(self, browser: str, host: str):
-        self._store = Store()
-        self._driver_env = DriverEnvironment(browser)
+    def __init__(self, browser: str, host: str, pool: DriverPool = None,
+                 wait_policy: WaitPolicy = None,
+                 transport: TransportConfig = None, remote_url: str = None,
+                 tracer: Tracer = None, record_to: str = None,
+                 replay_from: str = None, store: Store = None,
+                 profile: BrowserProfile = None, eager: bool = False,
+                 scheduler: RemoteScheduler = None,
+                 artifacts: ArtifactCollector = None,
+                 perf_log: PerformanceLog = None,
+                 shared: SharedBrowser = None):
+        """
+        :param browser: The string matching the name of the browser
+        :param host: URL the Session navigates to when started
+        :param pool: Optional DriverPool to take an already-started browser
+            from. Each Session still gets a freshly reset browser, but without
+            paying for a browser startup
+        :param wait_policy: Default WaitPolicy for Selector waits in this
+            Session
+        :param transport: Optional TransportConfig for sending WebDriver
+            commands over pooled keep-alive connections
+        :param remote_url: Optional URL of a remote WebDriver server to start
+            the browser on
+        :param tracer: Optional Tracer to record the timing of every
+            WebDriver command and Selector call in this Session
+        :param record_to: Optional path to record this Session's WebDriver
+            traffic to
+        :param replay_from: Optional path of a recording to answer WebDriver
+            commands from instead of a browser; see DriverEnvironment
+        :param store: Optional Store to use instead of a new, empty one, such
+            as one shared between Sessions
+        :param profile: Optional BrowserProfile to launch the browser with,
+            such as BrowserProfile.fast()
+        :param eager: Start launching the browser on a background thread as
+            soon as the Session is created, so that test setup done before
+            start() (seeding the Store, API calls) overlaps with the browser
+            starting up. See get_launch_stats()
+        :param scheduler: Optional RemoteScheduler to place the browser on
+            one of several remote WebDriver servers, instead of 'remote_url'
+        :param artifacts: Optional ArtifactCollector for capture_artifacts()
+        :param perf_log: Optional PerformanceLog to record the timing of every
+            navigation in. Give several Sessions the same log (or logs with
+            the same file) to aggregate their timings
+        :param shared: Optional SharedBrowser to run this Session in a tab of,
+            instead of a browser of its own (see SharedBrowser.open_session()).
+            'pool', 'transport', 'remote_url', 'record_to', 'replay_from',
+            'profile' and 'scheduler' are ignored; they are options of the
+            SharedBrowser
+        """
+        self._store = Store() if store is None else store
+        if shared is not None:
+            self._driver_env = TabEnvironment(shared, tracer, eager, perf_log)
+        else:
+            self._driver_env = DriverEnvironment(browser, pool, transport,
+                                                 remote_url, tracer,
+                                                 record_to, replay_from,
+                                                 profile, eager, scheduler,
+                                                 perf_log)
+        self._tracer = tracer
+        self._artifacts = artifacts
+        self._wait_policy = wait_policy or WaitPolicy()
+        self._wait_stats = WaitStats()
+        self._element_cache_stats = ElementCacheStats()
         self._host = host
         self.__closed = False
 
@@ -76,6 +145,97 @@ class Session:
                                    "closed")
         return self._driver_env
 
+    def get_wait_policy(self) -> WaitPolicy:
+        """
+        Get the default WaitPolicy for Selector waits in this Session.
+
+        :return: The WaitPolicy associated with this Session
+        """
+        return self._wait_policy
+
+    def set_wait_policy(self, wait_policy: WaitPolicy):
+        """
+        Set the default WaitPolicy for Selector waits in this Session.
+
+        :param wait_policy: The new default WaitPolicy
+        """
+        if wait_policy is None:
+            raise SessionException("Wait policy cannot be None")
+        self._wait_policy = wait_policy
+
+    def get_wait_stats(self) -> WaitStats:
+        """
+        Get the counters for waits performed in this Session. These remain
+        available after the Session is closed.
+
+        :return: The WaitStats associated with this Session
+        """
+        return self._wait_stats
+
+    def get_element_cache_stats(self) -> ElementCacheStats:
+        """
+        Get the counters for WebElement caching by caching Selectors in this
+        Session. These remain available after the Session is closed.
+
+        :return: The ElementCacheStats associated with this Session
+        """
+        return self._element_cache_stats
+
+    def get_launch_stats(self) -> LaunchStats:
+        """
+        Get the timing of this Session's browser launch, including how much of
+        it overlapped with the test when the Session is eager. These remain
+        available after the Session is closed.
+
+        :return: The LaunchStats associated with this Session
+        """
+        return self._driver_env.get_launch_stats()
+
+    def get_artifacts(self) -> ArtifactCollector:
+        """
+        Get the ArtifactCollector of this Session.
+
+        :return: The ArtifactCollector, or 'None' if this Session has none
+        """
+        return self._artifacts
+
+    def capture_artifacts(self, name: str, **options) -> list:
+        """
+        Capture a screenshot, the page source and the browser log, such as
+        when the test failed. Only fetching them from the browser happens
+        here; they are compressed and written in the background, so this
+        should be called before the Session is closed but costs the test
+        little. See ArtifactCollector.capture()
+
+        :param name: Name for the artifacts' files, such as the test's name
+        :param options: Options for ArtifactCollector.capture()
+
+        :return: Paths of the files that will be written
+
+        :exception SessionException: If this Session has no ArtifactCollector
+        """
+        if self._artifacts is None:
+            raise SessionException("No ArtifactCollector for this Session")
+        return self._artifacts.capture(self.get_driver_env(), name, **options)
+
+    def get_perf_log(self) -> PerformanceLog:
+        """
+        Get the PerformanceLog this Session records navigation timings in. It
+        remains available after the Session is closed.
+
+        :return: The PerformanceLog, or 'None' if timings aren't recorded
+        """
+        return self._driver_env.get_perf_log()
+
+    def get_tracer(self) -> Tracer:
+        """
+        Get the Tracer recording this Session. It remains available after the
+        Session is closed.
+
+        :return: The Tracer, or 'None' if this Session isn't traced
+        """
+        return self._tracer
+
     def close(self):
         """
         Close this Session. (Closes the DriverEnvironment and quits WebDriver.)
@@ -0,0 +1,19 @@
+# Statistics shared by the parts of the framework that summarize the timings
+# they record: command latencies (tracing, transport) and navigation timings
+# (perf).
+
+
+def percentile(ordered: list, fraction: float):
+    """
+    Get a percentile of sorted values, without interpolating: the value at
+    index 'fraction * (count - 1)', rounded down. p0 is the smallest value
+    and p100 the largest.
+
+    :param ordered: The values, sorted in ascending order
+    :param fraction: The percentile as a fraction, such as 0.99 for p99
+
+    :return: The value, or 0.0 if there are no values
+    """
+    if not ordered:
+        return 0.0
+    return ordered[int(fraction * (len(ordered) - 1))]
@@ -1,13 +1,235 @@
+import os
+import pickle
+import sqlite3
+import threading
+import uuid
+from typing import Callable
+
 from .exceptions import StoreException
+from .wait import WaitPolicy
 
+# Marker stored while get_or_compute() computes a value:
+# (_PENDING, pid of the computing process, unique token)
+_PENDING = "wdframework-store-pending"
 
-class Store:
+
+def _is_pending(value) -> bool:
+    return isinstance(value, tuple) and len(value) == 3 and \
+        value[0] == _PENDING
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class StoreBackend:
+    """
+    Where a Store keeps its data. Every operation must be atomic with respect
+    to every other user of the same backend, which for a backend shared
+    between processes means every other process.
+    """
+
+    def get(self, key: str):
+        """
+        :param key: The key
+
+        :return: The value, or 'None' if the key isn't set
+        """
+        raise NotImplementedError()
+
+    def put_if_absent(self, key: str, value) -> bool:
+        """
+        Set a key, unless it is already set.
+
+        :param key: The key
+        :param value: The value
+
+        :return: True if the key was set, False if it was already set
+        """
+        raise NotImplementedError()
+
+    def replace(self, key: str, expected, value) -> bool:
+        """
+        Change the value of a key, if it currently is 'expected'.
+
+        :return: True if the value was changed
+        """
+        raise NotImplementedError()
+
+    def delete(self, key: str, expected) -> bool:
+        """
+        Remove a key, if its value currently is 'expected'.
+
+        :return: True if the key was removed
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class MemoryBackend(StoreBackend):
     """
-    Base class for storing data from test runs (or storing data to pass to tests). It is recommended that you subclass
-    this to fit your needs.
+    Keeps values in a dict, guarded by a lock so that Sessions on several
+    threads can share it. It is not shared between processes; a copy sent to
+    another process is independent of the original.
     """
+
     def __init__(self):
-        self.__internal_store = {}
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def get(self, key: str):
+        with self._lock:
+            return self._values.get(key)
+
+    def put_if_absent(self, key: str, value) -> bool:
+        with self._lock:
+            if key in self._values:
+                return False
+            self._values[key] = value
+            return True
+
+    def replace(self, key: str, expected, value) -> bool:
+        with self._lock:
+            if key not in self._values or self._values[key] != expected:
+                return False
+            self._values[key] = value
+            return True
+
+    def delete(self, key: str, expected) -> bool:
+        with self._lock:
+            if key not in self._values or self._values[key] != expected:
+                return False
+            del self._values[key]
+            return True
+
+    def __getstate__(self):
+        with self._lock:
+            return dict(self._values)
+
+    def __setstate__(self, state):
+        self._lock = threading.Lock()
+        self._values = state
+
+
+class SQLiteBackend(StoreBackend):
+    """
+    Keeps values, pickled, in an SQLite database file, so that every process
+    on the machine that opens the same file shares them; pass the backend (or
+    a Store using it) to a ParallelRunner to share seeded data between its
+    workers. Each thread and process opens its own connection, and SQLite
+    makes every operation atomic across all of them.
+
+    Values must be picklable.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        :param path: Path of the database file; created if it doesn't exist
+        :param timeout: Seconds to wait for another process's write to finish
+            before giving up
+        """
+        self._path = path
+        self._timeout = timeout
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS store "
+                               "(key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+
+    def get_path(self) -> str:
+        """
+        :return: Path of the database file
+        """
+        return self._path
+
+    def get(self, key: str):
+        row = self._connect().execute(
+            "SELECT value FROM store WHERE key = ?", (key,)).fetchone()
+        return None if row is None else pickle.loads(row[0])
+
+    def put_if_absent(self, key: str, value) -> bool:
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO store (key, value) VALUES (?, ?)",
+                (key, _dumps(value)))
+        return cursor.rowcount == 1
+
+    def replace(self, key: str, expected, value) -> bool:
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE store SET value = ? WHERE key = ? AND value = ?",
+                (_dumps(value), key, _dumps(expected)))
+        return cursor.rowcount == 1
+
+    def delete(self, key: str, expected) -> bool:
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "DELETE FROM store WHERE key = ? AND value = ?",
+                (key, _dumps(expected)))
+        return cursor.rowcount == 1
+
+    def close(self):
+        """
+        Close this thread's connection. The database file is left in place.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections can't be used from another thread, or across a fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self._path, timeout=self._timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def __getstate__(self):
+        return {"path": self._path, "timeout": self._timeout}
+
+    def __setstate__(self, state):
+        self._path = state["path"]
+        self._timeout = state["timeout"]
+        self._local = threading.local()
+
+
+def _dumps(value) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class Store:
+    """
+    Base class for storing data from test runs (or storing data to pass to
+    tests). It is recommended that you subclass this to fit your needs.
+
+    Values are kept by a StoreBackend. The default MemoryBackend is private
+    to the process; a Store with an SQLiteBackend can be shared by every
+    worker of a ParallelRunner, so that seeded data (accounts, fixtures) is
+    created once instead of by every worker. Keys are write-once: put() and
+    get_or_compute() never overwrite a value, even when several processes
+    race to set the same key.
+    """
+    def __init__(self, backend: StoreBackend = None):
+        """
+        :param backend: Where to keep values; a new MemoryBackend by default
+        """
+        self.__backend = MemoryBackend() if backend is None else backend
+
+    def get_backend(self) -> StoreBackend:
+        """
+        :return: The StoreBackend this Store keeps its values in
+        """
+        return self.__backend
 
     def get(self, key: str):
         """
@@ -15,13 +237,14 @@ class Store:
 
         :param key: The key for the value to get
 
-        :return: The value identified by the key
+        :return: The value identified by the key, or 'None' if it isn't set
+            (or is still being computed by get_or_compute())
 
         :exception StoreException: If the key is None or empty
         """
-        if key is None or key is "":
-            raise StoreException("Key cannot be None or empty")
-        return self.__internal_store.get(key)
+        _check_key(key)
+        value = self.__backend.get(key)
+        return None if _is_pending(value) else value
 
     def put(self, key: str, item: object):
         """
@@ -30,15 +253,87 @@ class Store:
         :param key: The key
         :param item: The value
 
-        :exception StoreException: If the key is None or empty, the item is None, or the key is already set in this
-        store
+        :exception StoreException: If the key is None or empty, the item is
+        None, or the key is already set in this store
+        """
+        if not self.put_if_absent(key, item):
+            raise StoreException("Key already set in this Store")
+
+    def put_if_absent(self, key: str, item: object) -> bool:
+        """
+        Put a key-value pair in this Store, unless the key is already set.
+
+        :param key: The key
+        :param item: The value
+
+        :return: True if the item was stored, False if the key was already set
+
+        :exception StoreException: If the key is None or empty, or the item is
+        None
         """
-        if key is None or key is "":
-            raise StoreException("Key cannot be None or empty")
+        _check_key(key)
         if item is None:
             raise StoreException("Item cannot be None")
-        if self.get(key) is not None:
-            raise StoreException("Key already set in this Store")
-        self.__internal_store[key] = item
+        return self.__backend.put_if_absent(key, item)
+
+    def get_or_compute(self, key: str, loader: Callable[[], object],
+                       timeout: float = 300.0, policy: WaitPolicy = None):
+        """
+        Get a value, computing and storing it first if the key isn't set.
+
+        Only one caller computes the value, no matter how many threads or
+        processes (sharing the backend) ask for it at the same time; the rest
+        wait for it to be stored. If the loader raises, the exception is
+        raised to its caller and the next waiting caller computes the value
+        instead. A computation left behind by a process that died is taken
+        over as well.
+
+        :param key: The key
+        :param loader: Function taking no arguments that returns the value
+        :param timeout: Seconds to wait for another caller to compute the
+            value
+        :param policy: WaitPolicy for polling while another caller computes
+            the value
+
+        :return: The value identified by the key
+
+        :exception StoreException: If the key is None or empty, or the loader
+        returned None
+        :exception TimeoutException: If another caller didn't finish
+            computing the value before the timeout expired
+        """
+        _check_key(key)
+        claim = (_PENDING, os.getpid(), uuid.uuid4().hex)
+        claimed = []
+
+        def check():
+            value = self.__backend.get(key)
+            if value is not None and not _is_pending(value):
+                return [value]
+            if value is not None and not _process_alive(value[1]):
+                self.__backend.delete(key, value)
+            if self.__backend.put_if_absent(key, claim):
+                claimed.append(True)
+                return [None]
+            return None
+
+        value = (policy or WaitPolicy()).poll(
+            check, "'%s' to be computed" % key, timeout)[0]
+        if not claimed:
+            return value
+        try:
+            value = loader()
+            if value is None:
+                raise StoreException("Loader for '%s' returned None" % key)
+        except BaseException:
+            self.__backend.delete(key, claim)
+            raise
+        self.__backend.replace(key, claim, value)
+        return value
 
     # TODO: Add interpolation method
+
+
+def _check_key(key: str):
+    if key is None or key == "":
+        raise StoreException("Key cannot be None or empty")
@@ -0,0 +1,368 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.file_detector import LocalFileDetector
+from selenium.webdriver.remote.mobile import Mobile
+from selenium.webdriver.remote.switch_to import SwitchTo
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from . import scripts
+from .driver_env import DriverEnvironment
+from .exceptions import DriverEnvironmentException
+from .perf import PerformanceLog
+from .tracing import Tracer
+
+
+class TabConnection:
+    """
+    The command executor of a tab's WebDriver. Every command is sent over
+    the shared browser's own command executor while holding the browser's
+    lock, after switching the browser to the tab's window if another tab
+    used it last. Quitting a tab's driver closes its window instead of the
+    browser. Switching windows through the tab's driver rebinds the tab; the
+    windows it switched to besides its own are its popups.
+    """
+
+    def __init__(self, browser: "SharedBrowser", handle: str):
+        """
+        :param browser: The SharedBrowser the tab belongs to
+        :param handle: Handle of the tab's window
+        """
+        self._browser = browser
+        self._window = handle
+        self._handle = handle
+        self._popups = []
+        self._closed = False
+
+    def get_window(self) -> str:
+        """
+        :return: Handle of the window the tab was opened in
+        """
+        return self._window
+
+    def get_handle(self) -> str:
+        """
+        :return: Handle of the window the tab is bound to. Switching windows
+            through the tab's driver (such as to a popup) rebinds it
+        """
+        return self._handle
+
+    def get_popups(self) -> list:
+        """
+        :return: Handles of the other windows the tab switched to and didn't
+            close
+        """
+        return list(self._popups)
+
+    def bind(self, handle: str):
+        """
+        Bind the tab to a window without sending a command.
+
+        :param handle: Handle of the window
+        """
+        self._handle = handle
+
+    def close(self):
+        """
+        Refuse any further commands.
+        """
+        self._closed = True
+
+    def execute(self, command, params):
+        """
+        Switch to the tab's window if needed, and send a command.
+        """
+        if self._closed:
+            raise DriverEnvironmentException("The tab is closed")
+        if command == Command.QUIT:
+            command = Command.CLOSE
+        # noinspection PyProtectedMember
+        with self._browser._locked():
+            self._browser._stats["commands"] += 1
+            self._browser._switch(self._handle, params.get("sessionId"))
+            response = self._browser._get_executor().execute(command, params)
+            if _succeeded(response):
+                if command == Command.SWITCH_TO_WINDOW:
+                    self._handle = params.get("handle") or params["name"]
+                    self._browser._current = self._handle
+                    if self._handle != self._window and \
+                            self._handle not in self._popups:
+                        self._popups.append(self._handle)
+                elif command == Command.CLOSE:
+                    self._browser._current = None
+                    if self._handle in self._popups:
+                        self._popups.remove(self._handle)
+        return response
+
+
+def _succeeded(response) -> bool:
+    try:
+        ErrorHandler().check_response(response)
+    except WebDriverException:
+        return False
+    return True
+
+
+class SharedBrowser:
+    """
+    One browser shared by several Sessions, each in its own window (a tab,
+    in most browsers), so that many more independent test contexts fit in
+    the memory of a CI node than with a browser per Session.
+
+    Every Session gets a WebDriver of its own that is bound to its window:
+    before each command, the browser is switched to that window if another
+    Session used it last, and a lock makes every command (with its switch)
+    run on its own, so Selectors, Pages and DriverEnvironment calls work as
+    usual. The browser only runs one command at a time, so Sessions on
+    several threads take turns rather than running in parallel; what is
+    saved is memory, not time.
+
+    Tabs share what the browser shares between windows: cookies, storage and
+    the cache. Windows of closed Sessions are kept, blank, for the next
+    Session instead of being closed. Popups a Session switched to are closed
+    with it; popups it never switched to are left open.
+    """
+
+    def __init__(self, browser_string: str, **options):
+        """
+        :param browser_string: The string matching the name of the browser
+        :param options: Options for the DriverEnvironment of the browser,
+            such as 'remote_url', 'pool', 'transport', 'profile' or
+            'scheduler'
+        """
+        self._env = DriverEnvironment(browser_string, **options)
+        self._lock = threading.RLock()
+        self._current = None
+        self._initial = None
+        self._free = []
+        self._tabs = set()
+        self._open = 0
+        self._closed = False
+        self._stats = {"tabs_opened": 0, "windows_opened": 0, "switches": 0,
+                       "commands": 0, "lock_wait": 0.0, "lock_wait_max": 0.0}
+
+    def get_browser_string(self) -> str:
+        """
+        :return: The string matching the name of the browser
+        """
+        return self._env._browser_string
+
+    def get_driver_env(self) -> DriverEnvironment:
+        """
+        :return: The DriverEnvironment of the shared browser itself
+        """
+        return self._env
+
+    def open_session(self, host: str, **options):
+        """
+        Create a Session in a tab of this browser.
+
+        :param host: URL the Session navigates to when started
+        :param options: Other options for the Session, see Session
+
+        :return: The Session
+        """
+        # Imported here; session imports this module
+        from .session import Session
+        return Session(self.get_browser_string(), host, shared=self,
+                       **options)
+
+    def get_stats(self) -> dict:
+        """
+        :return: A dict with the number of tabs open and ever opened, windows
+            opened, window switches, commands sent by tabs, and the total and
+            longest time in seconds a command waited for the lock
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["tabs_open"] = self._open
+            return stats
+
+    def close(self):
+        """
+        Close the browser, and with it every tab. Commands of tabs still open
+        raise DriverEnvironmentException.
+        """
+        with self._lock:
+            self._closed = True
+            for connection in self._tabs:
+                connection.close()
+            self._tabs.clear()
+            self._env.close()
+
+    def _open_tab(self) -> WebDriver:
+        """
+        :return: A WebDriver bound to a new (or reused) window
+        """
+        with self._locked():
+            if self._closed:
+                raise DriverEnvironmentException("The SharedBrowser is closed")
+            driver = self._env.get_driver()
+            if self._initial is None:
+                self._initial = self._current = driver.current_window_handle
+                handle = self._initial
+            elif self._free:
+                handle = self._free.pop()
+            else:
+                before = set(driver.window_handles)
+                self._switch(self._initial, driver.session_id)
+                driver.execute_script(scripts.OPEN_WINDOW_JS)
+                opened = [h for h in driver.window_handles if h not in before]
+                if not opened:
+                    raise DriverEnvironmentException(
+                        "The browser didn't open a new window")
+                handle = opened[0]
+                self._stats["windows_opened"] += 1
+            connection = TabConnection(self, handle)
+            self._tabs.add(connection)
+            self._open += 1
+            self._stats["tabs_opened"] += 1
+            return self._tab_driver(driver, connection)
+
+    def _close_tab(self, tab: WebDriver):
+        """
+        Close a tab's popups, and blank its window and keep it for the next
+        tab.
+        """
+        with self._locked():
+            self._open -= 1
+            executor = tab.command_executor
+            if not self._closed:
+                for handle in executor.get_popups():
+                    executor.bind(handle)
+                    try:
+                        tab.close()
+                    except WebDriverException:
+                        # The popup was closed already
+                        pass
+                # The tab may be bound to a popup; its own window is reused
+                executor.bind(executor.get_window())
+                try:
+                    tab.get("about:blank")
+                    self._free.append(executor.get_window())
+                except WebDriverException:
+                    # The window was closed
+                    pass
+            self._tabs.discard(executor)
+            executor.close()
+
+    @staticmethod
+    def _tab_driver(driver: WebDriver,
+                    connection: TabConnection) -> WebDriver:
+        # A plain remote WebDriver on the shared session; it mustn't inherit
+        # anything wrapped on the browser's own driver (such as by a Tracer)
+        tab = WebDriver.__new__(WebDriver)
+        tab.command_executor = connection
+        tab._is_remote = True
+        tab.session_id = driver.session_id
+        tab.capabilities = driver.capabilities
+        tab.w3c = driver.w3c
+        tab.error_handler = ErrorHandler()
+        tab._switch_to = SwitchTo(tab)
+        tab._mobile = Mobile(tab)
+        tab.file_detector = LocalFileDetector()
+        return tab
+
+    def _get_executor(self):
+        return self._env.get_driver().command_executor
+
+    def _switch(self, handle: str, session_id: str):
+        """
+        Switch the browser to a window, unless it already is on it. Must be
+        called with the lock held.
+        """
+        if handle == self._current:
+            return
+        response = self._get_executor().execute(
+            Command.SWITCH_TO_WINDOW,
+            {"sessionId": session_id, "handle": handle, "name": handle})
+        ErrorHandler().check_response(response)
+        self._current = handle
+        self._stats["switches"] += 1
+
+    @contextmanager
+    def _locked(self):
+        start = time.perf_counter()
+        with self._lock:
+            waited = time.perf_counter() - start
+            self._stats["lock_wait"] += waited
+            self._stats["lock_wait_max"] = max(self._stats["lock_wait_max"],
+                                               waited)
+            yield
+
+
+class TabEnvironment(DriverEnvironment):
+    """
+    The DriverEnvironment of a Session in a tab of a SharedBrowser. Its
+    driver is bound to the tab's window; closing it frees the tab instead of
+    quitting the browser.
+    """
+
+    def __init__(self, shared: SharedBrowser, tracer: Tracer = None,
+                 eager: bool = False, perf_log: PerformanceLog = None):
+        """
+        :param shared: The SharedBrowser to open the tab in
+        :param tracer: Optional Tracer to record the tab's commands in
+        :param eager: Open the tab on a background thread right away
+        :param perf_log: Optional PerformanceLog to record the tab's
+            navigation timings in
+        """
+        # Set first; an eager launch starts in DriverEnvironment.__init__
+        self._shared = shared
+        self._tab_script_timeout = None
+        super().__init__(shared.get_browser_string(), tracer=tracer,
+                         eager=eager, perf_log=perf_log)
+
+    def get_shared_browser(self) -> SharedBrowser:
+        """
+        :return: The SharedBrowser this tab is in
+        """
+        return self._shared
+
+    def set_script_timeout(self, seconds: float):
+        # The timeout belongs to the whole browser; it is set for this tab's
+        # asynchronous scripts only, with the lock held (see execute_js())
+        self._tab_script_timeout = seconds
+
+    def execute_js(self, asynchronous: bool, js: str, args=None):
+        if not asynchronous or self._tab_script_timeout is None:
+            return super().execute_js(asynchronous, js, args)
+        # noinspection PyProtectedMember
+        with self._shared._locked():
+            env = self._shared.get_driver_env()
+            if self._tab_script_timeout != env._script_timeout:
+                env.set_script_timeout(self._tab_script_timeout)
+            return super().execute_js(asynchronous, js, args)
+
+    def _launch(self):
+        try:
+            # noinspection PyProtectedMember
+            self._driver = self._shared._open_tab()
+            if self._tracer is not None:
+                self._tracer.attach(self._driver)
+        finally:
+            self._launch_stats.record_finish()
+
+    def close(self):
+        """
+        Close this environment. The tab's window is blanked and kept for the
+        next tab; the browser keeps running until the SharedBrowser is closed.
+        """
+        if not self._closed:
+            self._record_timing()
+        self._closed = True
+        try:
+            self._join_launch()
+        except Exception:
+            # Opening the tab failed; there is nothing to close
+            pass
+        if self._driver is None:
+            return
+        if self._tracer is not None:
+            self._tracer.detach(self._driver)
+        # noinspection PyProtectedMember
+        self._shared._close_tab(self._driver)
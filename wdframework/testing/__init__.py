@@ -0,0 +1 @@
+from .webdriver_server import FakeWebDriverServer
@@ -0,0 +1,1101 @@
+import base64
+import json
+import re
+import socket
+import struct
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urljoin
+
+from .. import scripts
+from ..dom import Comment, Element, parse_html
+from ..dom_snapshot import is_displayed
+
+# The W3C WebDriver element reference key
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+BLANK_PAGE = "<html><head><title></title></head><body></body></html>"
+
+# Browsing state every window of a session has its own copy of
+_WINDOW_STATE = ("history", "position", "url", "dom", "refs", "ids",
+                 "focused")
+
+# W3C error code -> HTTP status
+_ERROR_STATUS = {
+    "invalid argument": 400,
+    "invalid selector": 400,
+    "no such element": 404,
+    "no such window": 404,
+    "invalid session id": 404,
+    "move target out of bounds": 500,
+    "unknown command": 404,
+    "stale element reference": 404,
+    "script timeout": 500,
+    "session not created": 500,
+    "unknown error": 500,
+}
+
+
+def _tiny_png() -> bytes:
+    """
+    A valid 1x1 white PNG, returned as the screenshot of every page.
+    """
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + \
+            struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+    return b"\x89PNG\r\n\x1a\n" + \
+        chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)) + \
+        chunk(b"IDAT", zlib.compress(b"\x00\xff\xff\xff")) + \
+        chunk(b"IEND", b"")
+
+
+class WebDriverError(Exception):
+    """
+    Raised by command handlers to send a W3C error response.
+    """
+
+    def __init__(self, error: str, message: str = ""):
+        super().__init__(message or error)
+        self.error = error
+        self.message = message or error
+
+
+class _FakeSession:
+    """
+    State of one WebDriver session on a FakeWebDriverServer.
+    """
+
+    def __init__(self, server, capabilities):
+        self.id = uuid.uuid4().hex
+        self.server = server
+        self.capabilities = capabilities
+        self.windows = ["window-1"]
+        self.window = "window-1"
+        self.cookies = []
+        self.timeouts = {"script": 30000, "pageLoad": 300000, "implicit": 0}
+        self.history = []
+        self.position = -1
+        self.url = "about:blank"
+        self.dom = parse_html(BLANK_PAGE)
+        self.refs = {}
+        self.ids = {}
+        self.focused = None
+        self.rect = {"x": 0, "y": 0, "width": 1024, "height": 768}
+        # Handle -> browsing state of the windows not switched to
+        self.window_states = {}
+        self.next_ref = 1
+
+    def load(self, url: str, push: bool = True):
+        if push:
+            del self.history[self.position + 1:]
+            self.history.append(url)
+            self.position = len(self.history) - 1
+        self.url = url
+        self.dom = parse_html(self.server.get_page(url))
+        # Elements of the previous document are now stale
+        self.refs = {}
+        self.ids = {}
+        self.focused = None
+
+    def switch(self, handle: str):
+        """
+        Make 'handle' the current window, keeping the browsing state of the
+        window that was current.
+        """
+        if handle == self.window:
+            return
+        if self.window in self.windows:
+            self.window_states[self.window] = {
+                name: getattr(self, name) for name in _WINDOW_STATE}
+        state = self.window_states.pop(handle, None) or {
+            "history": [], "position": -1, "url": "about:blank",
+            "dom": parse_html(BLANK_PAGE), "refs": {}, "ids": {},
+            "focused": None}
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.window = handle
+
+    def open_window(self) -> str:
+        handle = "window-%s" % uuid.uuid4().hex[:8]
+        self.windows.append(handle)
+        return handle
+
+    def ref(self, element: Element) -> dict:
+        ref = self.ids.get(id(element))
+        if ref is None:
+            # Unique in the session, so that a reference to an element of
+            # another document or window is never mistaken for a current one
+            ref = "element-%d" % self.next_ref
+            self.next_ref += 1
+            self.refs[ref] = element
+            self.ids[id(element)] = ref
+        return {ELEMENT_KEY: ref}
+
+    def element(self, ref: str) -> Element:
+        element = self.refs.get(ref)
+        if element is None:
+            raise WebDriverError("stale element reference",
+                                 "Element %s is not attached to the page "
+                                 "document" % ref)
+        return element
+
+    def unwrap(self, value):
+        """
+        Replace element references in script arguments with Elements.
+        """
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return self.element(value[ELEMENT_KEY])
+            return {k: self.unwrap(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.unwrap(v) for v in value]
+        return value
+
+    def wrap(self, value):
+        """
+        Replace Elements in script results with element references.
+        """
+        if isinstance(value, Element):
+            return self.ref(value)
+        if isinstance(value, dict):
+            return {k: self.wrap(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.wrap(v) for v in value]
+        return value
+
+
+# Locating and reading elements #
+
+def _attr_quote(value: str) -> str:
+    return '"%s"' % value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def find(root: Element, using: str, value: str, multiple: bool):
+    """
+    Locate elements below 'root' with either a W3C strategy ('css selector',
+    'link text', ...) or a Selector 'by' string ('css_selector', 'id', ...).
+    XPath is limited to what wdframework.dom.compile_xpath() supports.
+    """
+    using = using.replace(" ", "_")
+    if using in ("css_selector", "tag_name"):
+        css = value
+    elif using == "id":
+        css = "[id=%s]" % _attr_quote(value)
+    elif using == "name":
+        css = "[name=%s]" % _attr_quote(value)
+    elif using == "class_name":
+        css = "[class~=%s]" % _attr_quote(value)
+    elif using in ("link_text", "partial_link_text"):
+        links = [a for a in root.iter() if a.tag == "a" and (
+            a.text_content().strip() == value if using == "link_text"
+            else value in a.text_content())]
+        return links if multiple else (links[0] if links else None)
+    elif using == "xpath":
+        try:
+            found = root.xpath(value)
+        except ValueError as e:
+            raise WebDriverError("invalid selector", str(e))
+        return found if multiple else (found[0] if found else None)
+    else:
+        raise WebDriverError("invalid selector",
+                             "Unsupported locator strategy '%s'" % using)
+    try:
+        if multiple:
+            return root.select(css)
+        return root.select_one(css)
+    except ValueError as e:
+        raise WebDriverError("invalid selector", str(e))
+
+
+def read(element: Element, fields) -> dict:
+    """
+    Python equivalent of scripts.READ_JS.
+    """
+    out = {}
+    for field in fields:
+        if field == "text":
+            out["text"] = element.text_content().strip() \
+                if is_displayed(element) else ""
+        elif field == "value":
+            out["value"] = element.attrs.get("value")
+        elif field == "tag_name":
+            out["tag_name"] = element.tag
+        elif field == "attributes":
+            out["attributes"] = dict(element.attrs)
+        elif field == "classes":
+            out["classes"] = element.get_classes()
+        elif field == "rect":
+            out["rect"] = _rect(element)
+        elif field == "displayed":
+            out["displayed"] = is_displayed(element)
+        elif field == "enabled":
+            out["enabled"] = "disabled" not in element.attrs
+        elif field == "selected":
+            out["selected"] = "selected" in element.attrs or \
+                "checked" in element.attrs
+    return out
+
+
+def _rect(element: Element) -> dict:
+    # Synthetic layout: every element is a 100x20 box, stacked in document
+    # order
+    index = 0
+    root = element
+    while root.parent is not None:
+        root = root.parent
+    for index, other in enumerate(root.iter()):
+        if other is element:
+            break
+    return {"x": 0, "y": index * 20, "width": 100, "height": 20}
+
+
+# Framework scripts, evaluated in Python against the synthetic DOM #
+
+def _observe(session, by, value, state, name):
+    element = find(session.dom, by, value, False)
+    if state == "text":
+        return read(element, ["text"])["text"] if element is not None \
+            else None
+    if state == "attribute":
+        return element.attrs.get(name) if element is not None else None
+    if state in ("visible", "hidden"):
+        return element is not None and is_displayed(element)
+    return element is not None
+
+
+def _match(state, current, expected, initial):
+    if state in ("present", "visible"):
+        return bool(current)
+    if state in ("absent", "hidden"):
+        return not current
+    if state == "text":
+        return current is not None and (
+            current != initial if expected is None else expected in current)
+    if state == "attribute":
+        return current != initial if expected is None else current == expected
+    return False
+
+
+def _snapshot(session, args):
+    element = find(session.dom, args[0], args[1], False)
+    return read(element, args[2]) if element is not None else None
+
+
+def _iter_comments(root: Element):
+    # (comment, XPath) pairs in document order
+    stack = [(root, "")]
+    while stack:
+        node, path = stack.pop()
+        if isinstance(node, Comment):
+            yield node, path
+            continue
+        counts = {}
+        children = []
+        for child in node.children:
+            if isinstance(child, Comment):
+                step = "comment()"
+            elif isinstance(child, Element):
+                step = child.tag
+            else:
+                continue
+            counts[step] = counts.get(step, 0) + 1
+            children.append((child, "%s/%s[%d]" % (path, step, counts[step])))
+        stack.extend(reversed(children))
+
+
+_TEXT_INPUT_TYPES = ("text", "search", "email", "url", "tel", "password",
+                     "number", "")
+
+
+def _batch(session, args):
+    # Python equivalent of scripts.BATCH_JS
+    actions = args[0]
+    for index, (kind, by, value, text) in enumerate(actions):
+        element = find(session.dom, by, value, False)
+        if element is None:
+            return {"done": index, "status": "missing"}
+        if kind in ("clear", "send_keys"):
+            editable = (element.tag == "textarea" or (
+                element.tag == "input" and element.attrs.get(
+                    "type", "").lower() in _TEXT_INPUT_TYPES)) and \
+                "disabled" not in element.attrs and \
+                "readonly" not in element.attrs
+            if not editable or (kind == "send_keys" and any(
+                    "\ue000" <= c <= "\uf8ff" for c in text)):
+                return {"done": index, "status": "fallback"}
+            session.focused = element
+            element.attrs["value"] = "" if kind == "clear" else \
+                element.attrs.get("value", "") + text
+        elif kind == "click":
+            if not is_displayed(element):
+                return {"done": index, "status": "fallback"}
+            _click(session, element)
+        elif kind == "submit":
+            form = element
+            while form is not None and form.tag != "form":
+                form = form.parent
+            if form is None:
+                return {"done": index, "status": "fallback"}
+            return {"done": index + 1, "status": "ok"}
+    return {"done": len(actions), "status": "ok"}
+
+
+def _find_each(session, args):
+    return [find(session.dom, by, value, False) for by, value in args[0]]
+
+
+def _outer_html(session, args):
+    element = find(session.dom, args[0], args[1], False)
+    return element.outer_html() if element is not None else None
+
+
+def _comments(session, args):
+    offset, count, with_paths = args
+    comments = []
+    for index, (comment, path) in enumerate(_iter_comments(session.dom)):
+        if index < offset:
+            continue
+        if len(comments) == count:
+            break
+        comments.append([str(comment), path] if with_paths else str(comment))
+    return {"comments": comments, "done": len(comments) < count}
+
+
+def _states(session, args):
+    results = []
+    for by, value in args[0]:
+        element = find(session.dom, by, value, False)
+        visible = element is not None and is_displayed(element)
+        results.append({"present": element is not None,
+                        "absent": element is None,
+                        "visible": visible,
+                        "hidden": not visible}.get(args[1], False))
+    return results
+
+
+def _wait_check(session, args):
+    current = _observe(session, args[0], args[1], args[2], args[4])
+    initial = args[5] if args[6] else current
+    return [_match(args[2], current, args[3], initial), current]
+
+
+def _wait_for(session, args):
+    state = args[2]
+    initial = _observe(session, args[0], args[1], state, args[4])
+    ok = _match(state, initial, args[3], initial)
+    if not ok:
+        # The synthetic DOM never changes by itself
+        time.sleep(args[5] / 1000.0)
+    return {"ok": ok, "elapsed": 0 if ok else args[5]}
+
+
+def _loaded(session, args):
+    # The synthetic page is always complete and never uses the network
+    selectors = all(_states(session, [args[0], args[1]]))
+    return {"ready_state": True, "selectors": selectors, "pending": 0,
+            "now": 0, "network_idle": True, "loaded": selectors}
+
+
+def _loaded_async(session, args):
+    status = _loaded(session, args)
+    if not status["loaded"]:
+        # The synthetic DOM never changes by itself
+        time.sleep(args[3] / 1000.0)
+    first = {"ready_state": 0, "network_idle": 0}
+    if status["selectors"]:
+        first["selectors"] = 0
+    status.update(ok=status["loaded"],
+                  elapsed=0 if status["loaded"] else args[3], first=first)
+    return status
+
+
+def _navigation_timing(session, args):
+    timing = session.server.get_timing(session.url)
+    timing["resources"] = sorted(timing["resources"],
+                                 key=lambda r: -r["duration"])[:args[0]]
+    return timing
+
+
+def _get_attribute_atom(session, args):
+    element, name = args[0], args[1]
+    if name in ("checked", "selected", "disabled"):
+        return "true" if name in element.attrs else None
+    return element.attrs.get(name)
+
+
+class FakeWebDriverServer:
+    """
+    A stand-in W3C WebDriver server for testing and benchmarking the framework
+    without a browser.
+
+    Pages are served from a dict of URL -> HTML and parsed into a synthetic
+    DOM (see wdframework.dom). Elements can be located with CSS selectors,
+    the link text and tag name strategies, and a subset of XPath, read,
+    clicked (links navigate, checkboxes toggle), typed into and cleared. The
+    framework's own scripts (wdframework.scripts) are evaluated in Python
+    against the DOM; other scripts return 'null' unless a handler is
+    registered for them with register_script().
+
+    Every command can be delayed by a fixed 'latency' to simulate a real
+    driver, and every command received is counted.
+    """
+
+    def __init__(self, pages: dict = None, latency: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0,
+                 capabilities: dict = None, max_sessions: int = None):
+        """
+        :param pages: Dict of URL -> HTML. Unknown URLs serve a blank page
+        :param latency: Seconds to delay every command by
+        :param host: Interface to listen on
+        :param port: Port to listen on; 0 picks a free port
+        :param capabilities: Capabilities reported for new sessions
+        :param max_sessions: Refuse new sessions beyond this many open ones
+        """
+        self._pages = dict(pages or {})
+        self._latency = latency
+        self._address = (host, port)
+        self._capabilities = capabilities or {"browserName": "fake"}
+        self._max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._commands = []
+        self._requested = []
+        self._connections = set()
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._timings = {}
+        self._scripts = {
+            scripts.SNAPSHOT_JS: _snapshot,
+            scripts.STATES_JS: _states,
+            scripts.WAIT_CHECK_JS: _wait_check,
+            scripts.WAIT_FOR_JS: _wait_for,
+            scripts.COMMENTS_JS: _comments,
+            scripts.OUTER_HTML_JS: _outer_html,
+            scripts.BATCH_JS: _batch,
+            scripts.FIND_EACH_JS: _find_each,
+            scripts.LOADED_JS: _loaded_async,
+            scripts.LOADED_CHECK_JS: _loaded,
+            scripts.NAVIGATION_TIMING_JS: _navigation_timing,
+            scripts.OPEN_WINDOW_JS: _open_window,
+        }
+        self._httpd = None
+        self._thread = None
+        self._healthy = True
+
+    # Lifecycle #
+
+    def start(self) -> "FakeWebDriverServer":
+        """
+        Start serving on a background thread.
+
+        :return: This instance
+        """
+        server = self
+
+        class Handler(_RequestHandler):
+            fake = server
+
+        self._httpd = _ThreadingHTTPServer(self._address, Handler)
+        # A short poll interval keeps stop() from taking up to half a second
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the listening socket.
+        """
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def get_url(self) -> str:
+        """
+        :return: The base URL of this server, to use as a command executor
+        """
+        host, port = self._httpd.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    # Configuration #
+
+    def set_page(self, url: str, html: str):
+        """
+        Serve 'html' for 'url' from now on.
+        """
+        self._pages[url] = html
+
+    def get_page(self, url: str) -> str:
+        """
+        :return: The HTML served for 'url'
+        """
+        return self._pages.get(url, BLANK_PAGE)
+
+    def set_timing(self, url: str, metrics: dict, resources: list = None):
+        """
+        Report these Navigation Timing metrics for 'url' from now on (see
+        scripts.NAVIGATION_TIMING_JS). Metrics that aren't given keep their
+        defaults: a page that loads in 30 ms.
+
+        :param url: The page
+        :param metrics: Dict of metric -> value, times in milliseconds
+        :param resources: Resource entries to report
+        """
+        self._timings[url] = (dict(metrics), list(resources or []))
+
+    def get_timing(self, url: str) -> dict:
+        """
+        :return: The result of scripts.NAVIGATION_TIMING_JS for 'url'
+        """
+        metrics, resources = self._timings.get(url, ({}, []))
+        timing = {"ttfb": 10, "dom_interactive": 20, "dom_content_loaded": 25,
+                  "load": 30, "first_paint": 22, "first_contentful_paint": 23,
+                  "transfer_size": len(self.get_page(url)),
+                  "resource_count": len(resources),
+                  "resource_transfer_size":
+                      sum(r.get("transfer_size", 0) for r in resources)}
+        timing.update(metrics)
+        return {"url": url, "metrics": timing, "resources": resources}
+
+    def set_latency(self, latency: float):
+        """
+        :param latency: Seconds to delay every command by
+        """
+        self._latency = latency
+
+    def set_healthy(self, healthy: bool):
+        """
+        :param healthy: When False, every command fails with 'unknown error',
+            as if the browser had crashed
+        """
+        self._healthy = healthy
+
+    def drop_connections(self):
+        """
+        Close every open client connection, as servers do with keep-alive
+        connections that were idle for too long.
+        """
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                # Closed by the client meanwhile
+                pass
+
+    def register_script(self, script: str, handler):
+        """
+        Evaluate 'script' with 'handler' instead of returning 'null'.
+
+        :param script: The exact script text
+        :param handler: Function taking (session, args) where args have
+            element references replaced by wdframework.dom Elements; element
+            results are turned back into references
+        """
+        self._scripts[script] = handler
+
+    # Introspection #
+
+    def get_commands(self) -> list:
+        """
+        :return: A (method, path) pair for every command received, in order
+        """
+        with self._lock:
+            return list(self._commands)
+
+    def get_requested_capabilities(self) -> list:
+        """
+        :return: The body of every new session request, in order
+        """
+        with self._lock:
+            return list(self._requested)
+
+    def get_command_count(self) -> int:
+        """
+        :return: The number of commands received
+        """
+        with self._lock:
+            return len(self._commands)
+
+    def get_max_in_flight(self) -> int:
+        """
+        :return: The most commands that were being handled at the same time
+        """
+        with self._lock:
+            return self._max_in_flight
+
+    def reset_commands(self):
+        """
+        Forget the commands received so far, and the most commands handled at
+        the same time.
+        """
+        with self._lock:
+            del self._commands[:]
+            self._max_in_flight = self._in_flight
+
+    def get_session_count(self) -> int:
+        """
+        :return: The number of open sessions
+        """
+        with self._lock:
+            return len(self._sessions)
+
+    def get_session(self, session_id: str) -> _FakeSession:
+        """
+        :return: The state of an open session
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise WebDriverError("invalid session id",
+                                 "No active session with ID %s" % session_id)
+        return session
+
+    # Command dispatch #
+
+    def handle(self, method: str, path: str, body: dict):
+        """
+        Handle one WebDriver command.
+
+        :return: The 'value' of the response
+
+        :exception WebDriverError: To send an error response
+        """
+        with self._lock:
+            self._commands.append((method, path))
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+        try:
+            if self._latency:
+                time.sleep(self._latency)
+            return self._route(method, path, body)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _route(self, method: str, path: str, body: dict):
+        for route_method, pattern, handler in _ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if not self._healthy and handler is not _new_session \
+                    and handler is not _status:
+                raise WebDriverError("unknown error",
+                                     "session deleted because of page crash")
+            params = match.groupdict()
+            session = None
+            if "sid" in params:
+                session = self.get_session(params.pop("sid"))
+            return handler(self, session, body, **params)
+        raise WebDriverError("unknown command",
+                             "Unknown command: %s %s" % (method, path))
+
+    def _create_session(self, body):
+        with self._lock:
+            if self._max_sessions is not None and \
+                    len(self._sessions) >= self._max_sessions:
+                raise WebDriverError("session not created",
+                                     "Maximum number of sessions reached")
+            session = _FakeSession(self, dict(self._capabilities))
+            self._sessions[session.id] = session
+            self._requested.append(body)
+        return session
+
+    def _delete_session(self, session):
+        with self._lock:
+            self._sessions.pop(session.id, None)
+
+    def run_script(self, session: _FakeSession, script: str, args: list):
+        handler = self._scripts.get(script)
+        if handler is None:
+            if "getAttribute" in script and len(args) == 2 and \
+                    isinstance(args[0], Element):
+                # Selenium's getAttribute atom
+                handler = _get_attribute_atom
+            else:
+                return None
+        return session.wrap(handler(session, args))
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 overflows when many clients connect at once,
+    # and each dropped SYN costs the client a second before it retries
+    request_queue_size = 64
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle's
+    # algorithm delays every response on a kept-alive connection
+    disable_nagle_algorithm = True
+    fake = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.fake._lock:
+            self.fake._connections.add(self.connection)
+
+    def finish(self):
+        with self.fake._lock:
+            self.fake._connections.discard(self.connection)
+        super().finish()
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw.decode("utf-8")) if raw else {}
+        except ValueError:
+            body = {}
+        path = self.path.split("?")[0].rstrip("/")
+        # Accept the commonly used '/wd/hub' prefix
+        if path.startswith("/wd/hub"):
+            path = path[len("/wd/hub"):]
+        try:
+            status, value = 200, self.fake.handle(self.command, path, body)
+        except WebDriverError as e:
+            status = _ERROR_STATUS.get(e.error, 500)
+            value = {"error": e.error, "message": e.message, "stacktrace": ""}
+        payload = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_DELETE = _dispatch
+
+
+# Routes #
+
+def _status(server, session, body):
+    return {"ready": True, "message": "fake WebDriver server"}
+
+
+def _new_session(server, session, body):
+    session = server._create_session(body)
+    return {"sessionId": session.id, "capabilities": session.capabilities}
+
+
+def _delete_session(server, session, body):
+    server._delete_session(session)
+    return None
+
+
+def _navigate(server, session, body):
+    url = body.get("url")
+    if not url:
+        raise WebDriverError("invalid argument", "Missing 'url'")
+    session.load(url)
+    return None
+
+
+def _get_url(server, session, body):
+    return session.url
+
+
+def _back(server, session, body):
+    if session.position > 0:
+        session.position -= 1
+        session.load(session.history[session.position], push=False)
+    return None
+
+
+def _forward(server, session, body):
+    if session.position < len(session.history) - 1:
+        session.position += 1
+        session.load(session.history[session.position], push=False)
+    return None
+
+
+def _refresh(server, session, body):
+    session.load(session.url, push=False)
+    return None
+
+
+def _title(server, session, body):
+    title = session.dom.select_one("title")
+    return title.text_content() if title is not None else ""
+
+
+def _source(server, session, body):
+    return session.dom.outer_html()
+
+
+def _find(server, session, body, eid=None, multiple=False):
+    root = session.element(eid) if eid else session.dom
+    using, value = body.get("using"), body.get("value")
+    if using is None or value is None:
+        raise WebDriverError("invalid argument", "Missing 'using' or 'value'")
+    result = find(root, using, value, multiple)
+    if multiple:
+        return [session.ref(e) for e in result]
+    if result is None:
+        raise WebDriverError("no such element",
+                             "Unable to locate element: {\"method\":\"%s\","
+                             "\"selector\":\"%s\"}" % (using, value))
+    return session.ref(result)
+
+
+def _find_many(server, session, body, eid=None):
+    return _find(server, session, body, eid, True)
+
+
+def _element_text(server, session, body, eid):
+    return read(session.element(eid), ["text"])["text"]
+
+
+def _element_attribute(server, session, body, eid, name):
+    return session.element(eid).attrs.get(name)
+
+
+def _element_property(server, session, body, eid, name):
+    element = session.element(eid)
+    if name in ("checked", "selected", "disabled"):
+        return name in element.attrs
+    if name == "value":
+        return element.attrs.get("value", "")
+    return element.attrs.get(name)
+
+
+def _element_css(server, session, body, eid, name):
+    style = session.element(eid).attrs.get("style", "")
+    for declaration in style.split(";"):
+        if ":" in declaration:
+            key, value = declaration.split(":", 1)
+            if key.strip() == name:
+                return value.strip()
+    return ""
+
+
+def _element_name(server, session, body, eid):
+    return session.element(eid).tag
+
+
+def _element_rect(server, session, body, eid):
+    return _rect(session.element(eid))
+
+
+def _element_flag(field):
+    def handler(server, session, body, eid):
+        return read(session.element(eid), [field])[field]
+    return handler
+
+
+def _click(session, element):
+    session.focused = element
+    if element.tag == "a" and "href" in element.attrs:
+        session.load(urljoin(session.url, element.attrs["href"]))
+    elif element.tag == "input" and \
+            element.attrs.get("type") in ("checkbox", "radio"):
+        if "checked" in element.attrs and \
+                element.attrs.get("type") == "checkbox":
+            del element.attrs["checked"]
+        else:
+            element.attrs["checked"] = ""
+
+
+def _element_click(server, session, body, eid):
+    _click(session, session.element(eid))
+    return None
+
+
+def _element_clear(server, session, body, eid):
+    session.element(eid).attrs["value"] = ""
+    return None
+
+
+def _element_send_keys(server, session, body, eid):
+    element = session.element(eid)
+    text = body.get("text")
+    if text is None:
+        text = "".join(body.get("value") or [])
+    element.attrs["value"] = element.attrs.get("value", "") + text
+    return None
+
+
+def _perform_actions(server, session, body):
+    sources = [source.get("actions") or [] for source in body["actions"]]
+    pointer_target = None
+    for tick in range(max([len(actions) for actions in sources] or [0])):
+        for actions in sources:
+            if tick >= len(actions):
+                continue
+            action = actions[tick]
+            if action["type"] == "pointerMove":
+                origin = session.unwrap(action.get("origin"))
+                if isinstance(origin, Element):
+                    pointer_target = origin
+            elif action["type"] == "pointerUp" and pointer_target is not None:
+                _click(session, pointer_target)
+            elif action["type"] == "keyDown" and session.focused is not None:
+                char = action["value"]
+                if not "\ue000" <= char <= "\uf8ff":
+                    focused = session.focused
+                    focused.attrs["value"] = focused.attrs.get("value", "") + \
+                        char
+    return None
+
+
+def _release_actions(server, session, body):
+    return None
+
+
+def _element_submit(server, session, body, eid):
+    session.element(eid)
+    return None
+
+
+def _execute(server, session, body):
+    return server.run_script(session, body.get("script", ""),
+                             session.unwrap(body.get("args") or []))
+
+
+def _timeouts(server, session, body):
+    for key in ("script", "pageLoad", "implicit"):
+        if key in body:
+            session.timeouts[key] = body[key]
+    return None
+
+
+def _window_handle(server, session, body):
+    return session.window
+
+
+def _window_rect(server, session, body):
+    return dict(session.rect)
+
+
+def _set_window_rect(server, session, body):
+    for key in ("x", "y", "width", "height"):
+        if body.get(key) is not None:
+            session.rect[key] = body[key]
+    return dict(session.rect)
+
+
+def _window_handles(server, session, body):
+    return list(session.windows)
+
+
+def _switch_window(server, session, body):
+    handle = body.get("handle") or body.get("name")
+    if handle not in session.windows:
+        raise WebDriverError("no such window", "No window %s" % handle)
+    session.switch(handle)
+    return None
+
+
+def _close_window(server, session, body):
+    if session.window not in session.windows:
+        raise WebDriverError("no such window",
+                             "Window %s is closed" % session.window)
+    session.windows.remove(session.window)
+    return list(session.windows)
+
+
+def _new_window(server, session, body):
+    return {"handle": session.open_window(), "type": "tab"}
+
+
+def _open_window(session, args):
+    # window.open() opens a window without switching to it
+    session.open_window()
+    return None
+
+
+def _get_cookies(server, session, body):
+    return list(session.cookies)
+
+
+def _add_cookie(server, session, body):
+    session.cookies.append(body.get("cookie", {}))
+    return None
+
+
+def _delete_cookies(server, session, body):
+    del session.cookies[:]
+    return None
+
+
+def _screenshot(server, session, body):
+    return base64.b64encode(_tiny_png()).decode("ascii")
+
+
+def _log(server, session, body):
+    return []
+
+
+_S = r"/session/(?P<sid>[^/]+)"
+_E = _S + r"/element/(?P<eid>[^/]+)"
+
+_ROUTES = [(method, re.compile("^" + pattern + "$"), handler)
+           for method, pattern, handler in [
+    ("GET", r"/status", _status),
+    ("POST", r"/session", _new_session),
+    ("DELETE", _S, _delete_session),
+    ("POST", _S + r"/url", _navigate),
+    ("GET", _S + r"/url", _get_url),
+    ("POST", _S + r"/back", _back),
+    ("POST", _S + r"/forward", _forward),
+    ("POST", _S + r"/refresh", _refresh),
+    ("GET", _S + r"/title", _title),
+    ("GET", _S + r"/source", _source),
+    ("POST", _S + r"/element", _find),
+    ("POST", _S + r"/elements", _find_many),
+    ("POST", _E + r"/element", _find),
+    ("POST", _E + r"/elements", _find_many),
+    ("GET", _E + r"/text", _element_text),
+    ("GET", _E + r"/attribute/(?P<name>[^/]+)", _element_attribute),
+    ("GET", _E + r"/property/(?P<name>[^/]+)", _element_property),
+    ("GET", _E + r"/css/(?P<name>[^/]+)", _element_css),
+    ("GET", _E + r"/name", _element_name),
+    ("GET", _E + r"/rect", _element_rect),
+    ("GET", _E + r"/displayed", _element_flag("displayed")),
+    ("GET", _E + r"/enabled", _element_flag("enabled")),
+    ("GET", _E + r"/selected", _element_flag("selected")),
+    ("POST", _E + r"/click", _element_click),
+    ("POST", _E + r"/clear", _element_clear),
+    ("POST", _E + r"/value", _element_send_keys),
+    ("POST", _E + r"/submit", _element_submit),
+    ("POST", _S + r"/actions", _perform_actions),
+    ("DELETE", _S + r"/actions", _release_actions),
+    ("POST", _S + r"/execute/sync", _execute),
+    ("POST", _S + r"/execute/async", _execute),
+    ("POST", _S + r"/timeouts", _timeouts),
+    ("GET", _S + r"/window", _window_handle),
+    ("GET", _S + r"/window/handles", _window_handles),
+    ("POST", _S + r"/window", _switch_window),
+    ("DELETE", _S + r"/window", _close_window),
+    ("POST", _S + r"/window/new", _new_window),
+    ("GET", _S + r"/window/rect", _window_rect),
+    ("POST", _S + r"/window/rect", _set_window_rect),
+    # Older clients size the window through /window/size
+    ("GET", _S + r"/window/size", _window_rect),
+    ("POST", _S + r"/window/size", _set_window_rect),
+    ("GET", _S + r"/cookie", _get_cookies),
+    ("POST", _S + r"/cookie", _add_cookie),
+    ("DELETE", _S + r"/cookie", _delete_cookies),
+    ("GET", _S + r"/screenshot", _screenshot),
+    ("POST", _S + r"/log", _log),
+]]
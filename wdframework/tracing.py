@@ -0,0 +1,311 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import List
+
+from .stats import percentile
+
+# Upper bounds (in milliseconds) of the latency histogram buckets; the last
+# bucket holds everything slower
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000,
+                    10000, 30000)
+
+# Kinds of TraceRecord
+COMMAND = "command"
+SELECTOR = "selector"
+WAIT = "wait"
+
+
+class TraceRecord:
+    """
+    One timed operation: a WebDriver command, or a Selector call (which
+    usually contains several commands).
+
+    name: the WebDriver command (such as 'findElement') or Selector method
+    kind: 'command', 'selector' or 'wait'
+    locator: the locator of the Selector the operation was done for, if any
+    owner: the class name of the Page or Component that owns that Selector,
+        if any
+    start: seconds since the Tracer was created
+    duration: seconds the operation took
+    retries: how many times the operation was retried (commands resent after
+        a connection reset, or Selector calls repeated after a stale element)
+    wait_time: seconds spent waiting for a condition
+    thread: identifier of the thread the operation ran on
+    """
+    __slots__ = ("name", "kind", "locator", "owner", "start", "duration",
+                 "retries", "wait_time", "thread")
+
+    def __init__(self, name: str, kind: str, locator: str, owner: str,
+                 start: float, duration: float, retries: int,
+                 wait_time: float, thread: int):
+        self.name = name
+        self.kind = kind
+        self.locator = locator
+        self.owner = owner
+        self.start = start
+        self.duration = duration
+        self.retries = retries
+        self.wait_time = wait_time
+        self.thread = thread
+
+    def __repr__(self):
+        return "TraceRecord(%s %s, %.1f ms)" % (self.kind, self.name,
+                                               self.duration * 1000)
+
+
+class _Span:
+    """
+    Context manager timing one operation. Spans nest; commands sent while a
+    span is open are attributed to its locator and owner.
+    """
+    __slots__ = ("_tracer", "name", "kind", "locator", "owner", "retries",
+                 "_start")
+
+    def __init__(self, tracer, name, kind, locator, owner):
+        self._tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.locator = locator
+        self.owner = owner
+        self.retries = 0
+
+    def __enter__(self):
+        # noinspection PyProtectedMember
+        self._tracer._stack().append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        duration = time.perf_counter() - self._start
+        # noinspection PyProtectedMember
+        self._tracer._stack().pop()
+        self._tracer.record(
+            self.name, self.kind, self.locator, self.owner, self._start,
+            duration, self.retries, duration if self.kind == WAIT else 0.0)
+        return False
+
+
+class Tracer:
+    """
+    Records the timing of every WebDriver command and Selector call made in a
+    Session, so that slow selectors and waits can be found.
+
+    Tracing is off unless a Tracer is given to the Session; when it is off,
+    WebDriver commands are not intercepted at all and Selector calls only pay
+    for one check.
+
+    Records can be summarized as latency histograms (get_histograms()) or
+    exported as Chrome trace-event JSON (get_chrome_trace() and
+    write_chrome_trace()), which can be opened in chrome://tracing or
+    Perfetto.
+    """
+
+    def __init__(self, name: str = "session", max_records: int = 100000):
+        """
+        :param name: Name of the traced Session, shown in exported traces
+        :param max_records: Records kept before the oldest are dropped
+        """
+        self._name = name
+        self._records = deque(maxlen=max_records)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def get_name(self) -> str:
+        """
+        :return: Name of the traced Session
+        """
+        return self._name
+
+    def span(self, name: str, kind: str = SELECTOR, locator: str = None,
+             owner=None) -> _Span:
+        """
+        Time an operation, for use in a 'with' statement. The span's
+        'retries' attribute can be incremented while it's open.
+
+        :param name: Name of the operation
+        :param kind: 'command', 'selector' or 'wait'
+        :param locator: Locator the operation is done for, if any
+        :param owner: The Page or Component the operation is done for, if any
+
+        :return: The span
+        """
+        if owner is not None and not isinstance(owner, str):
+            owner = type(owner).__name__
+        return _Span(self, name, kind, locator, owner)
+
+    def current_span(self):
+        """
+        :return: The innermost span open on the calling thread, or 'None'
+        """
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def record(self, name: str, kind: str, locator: str, owner: str,
+               start: float, duration: float, retries: int = 0,
+               wait_time: float = 0.0):
+        """
+        Add a record.
+
+        :param name: Name of the operation
+        :param kind: 'command', 'selector' or 'wait'
+        :param locator: Locator the operation was done for, if any
+        :param owner: Class name of the Page or Component the operation was
+            done for, if any
+        :param start: time.perf_counter() when the operation started
+        :param duration: Seconds the operation took
+        :param retries: How many times the operation was retried
+        :param wait_time: Seconds spent waiting for a condition
+        """
+        record = TraceRecord(name, kind, locator, owner, start - self._origin,
+                             duration, retries, wait_time,
+                             threading.get_ident())
+        with self._lock:
+            if len(self._records) == self._records.maxlen:
+                self._dropped += 1
+            self._records.append(record)
+
+    def attach(self, driver):
+        """
+        Start recording every command sent by a WebDriver. The driver's
+        'execute' method is wrapped on the instance, so other drivers are not
+        affected.
+
+        :param driver: The WebDriver
+        """
+        if "execute" in vars(driver):
+            return
+        execute = driver.execute
+        tracer = self
+
+        def traced_execute(driver_command, params=None):
+            span = tracer.current_span()
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                duration = time.perf_counter() - start
+                executor = getattr(driver, "command_executor", None)
+                retries = executor.get_last_retries() \
+                    if hasattr(executor, "get_last_retries") else 0
+                tracer.record(driver_command, COMMAND,
+                              span.locator if span else None,
+                              span.owner if span else None,
+                              start, duration, retries)
+
+        driver.execute = traced_execute
+
+    @staticmethod
+    def detach(driver):
+        """
+        Stop recording the commands sent by a WebDriver.
+
+        :param driver: The WebDriver
+        """
+        vars(driver).pop("execute", None)
+
+    def get_records(self) -> List[TraceRecord]:
+        """
+        :return: Every record, in the order the operations finished
+        """
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        """
+        Drop every record.
+        """
+        with self._lock:
+            self._records.clear()
+            self._dropped = 0
+
+    def get_histograms(self, by: str = "name", kind: str = None) -> dict:
+        """
+        Summarize the records as latency histograms.
+
+        :param by: Record attribute to group by: 'name', 'locator' or 'owner'
+        :param kind: Only include records of this kind
+
+        :return: A dict of group -> dict with the count, total, mean, p50,
+            p99 and max latency in milliseconds, the number of retries, and
+            'buckets', a list of (upper bound in milliseconds, count) pairs
+            matching HISTOGRAM_BOUNDS, followed by (None, count) for slower
+            operations
+        """
+        if by not in ("name", "locator", "owner"):
+            raise ValueError("Can't group by '%s'" % by)
+        groups = {}
+        for record in self.get_records():
+            if kind is not None and record.kind != kind:
+                continue
+            groups.setdefault(getattr(record, by), []).append(record)
+        histograms = {}
+        for key, records in groups.items():
+            latencies = sorted(r.duration * 1000 for r in records)
+            counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+            for latency in latencies:
+                counts[bisect_left(HISTOGRAM_BOUNDS, latency)] += 1
+            total = sum(latencies)
+            histograms[key] = {
+                "count": len(latencies),
+                "total": total,
+                "mean": total / len(latencies),
+                "p50": percentile(latencies, 0.50),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1],
+                "retries": sum(r.retries for r in records),
+                "buckets": list(zip(HISTOGRAM_BOUNDS + (None,), counts)),
+            }
+        return histograms
+
+    def get_chrome_trace(self) -> dict:
+        """
+        Export the records in the Chrome trace-event format.
+
+        :return: A JSON-serializable dict
+        """
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid,
+                   "args": {"name": self._name}}]
+        for record in self.get_records():
+            args = {"retries": record.retries}
+            if record.locator is not None:
+                args["locator"] = record.locator
+            if record.owner is not None:
+                args["owner"] = record.owner
+            if record.wait_time:
+                args["wait_time_ms"] = record.wait_time * 1000
+            events.append({
+                "name": record.name if record.locator is None
+                else "%s %s" % (record.name, record.locator),
+                "cat": record.kind,
+                "ph": "X",
+                "ts": record.start * 1e6,
+                "dur": record.duration * 1e6,
+                "pid": pid,
+                "tid": record.thread,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"session": self._name,
+                              "dropped_records": self._dropped}}
+
+    def write_chrome_trace(self, path: str):
+        """
+        Write the records to a file in the Chrome trace-event format.
+
+        :param path: Path of the file to write
+        """
+        with open(path, "w") as f:
+            json.dump(self.get_chrome_trace(), f)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
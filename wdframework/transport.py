@@ -0,0 +1,312 @@
+import http.client
+import queue
+import socket
+import string
+import threading
+import time
+from collections import deque
+from urllib import parse
+
+from selenium.webdriver.remote import utils
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorCode
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from selenium.webdriver.remote.webdriver import WebDriver  # For type hinting
+
+from .stats import percentile
+
+# Commands sent with POST that only read state, and so are safe to send again
+# if the connection broke before a response arrived
+_IDEMPOTENT_POSTS = frozenset((
+    Command.FIND_ELEMENT, Command.FIND_ELEMENTS, Command.FIND_CHILD_ELEMENT,
+    Command.FIND_CHILD_ELEMENTS, Command.GET_ACTIVE_ELEMENT,
+    Command.SET_TIMEOUTS, Command.SET_SCRIPT_TIMEOUT, Command.IMPLICIT_WAIT,
+    Command.W3C_GET_ACTIVE_ELEMENT))
+
+# Failures that mean the request may not have reached the driver at all
+_CONNECTION_ERRORS = (ConnectionError, http.client.RemoteDisconnected,
+                      http.client.BadStatusLine, http.client.CannotSendRequest)
+
+
+class TransportConfig:
+    """
+    Settings for how DriverEnvironment talks to the WebDriver server.
+    """
+
+    def __init__(self, pool_size: int = 4, timeout: float = 60.0,
+                 retries: int = 2, latency_samples: int = 1000):
+        """
+        :param pool_size: Maximum number of kept-alive connections to the
+            WebDriver server. Requests beyond this wait for a free connection
+        :param timeout: Seconds to wait for a response from the server
+        :param retries: How many times an idempotent command is resent after
+            the connection was reset before a response arrived
+        :param latency_samples: How many recent latencies are kept per
+            command for percentiles
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.latency_samples = latency_samples
+
+
+class CommandStats:
+    """
+    Per-command latency statistics for a PooledRemoteConnection.
+    """
+
+    def __init__(self, samples: int = 1000):
+        self._lock = threading.Lock()
+        self._samples = samples
+        self._commands = {}
+
+    def record(self, command: str, elapsed: float, retries: int,
+               failed: bool):
+        """
+        Record one command.
+
+        :param command: The WebDriver command name
+        :param elapsed: Seconds from sending the command to parsing the
+            response, including retries
+        :param retries: How many times the command was resent
+        :param failed: Whether the command failed at the transport level
+        """
+        with self._lock:
+            entry = self._commands.get(command)
+            if entry is None:
+                entry = self._commands[command] = {
+                    "count": 0, "total": 0.0, "max": 0.0, "retries": 0,
+                    "failures": 0, "samples": deque(maxlen=self._samples)}
+            entry["count"] += 1
+            entry["total"] += elapsed
+            entry["max"] = max(entry["max"], elapsed)
+            entry["retries"] += retries
+            entry["failures"] += 1 if failed else 0
+            entry["samples"].append(elapsed)
+
+    def get_stats(self) -> dict:
+        """
+        :return: A dict of command name -> dict with the count, number of
+            retries and transport failures, and the mean, p50, p99 and max
+            latency in seconds
+        """
+        with self._lock:
+            stats = {}
+            for command, entry in self._commands.items():
+                samples = sorted(entry["samples"])
+                stats[command] = {
+                    "count": entry["count"],
+                    "retries": entry["retries"],
+                    "failures": entry["failures"],
+                    "mean": entry["total"] / entry["count"],
+                    "p50": percentile(samples, 0.50),
+                    "p99": percentile(samples, 0.99),
+                    "max": entry["max"],
+                }
+            return stats
+
+
+class PooledRemoteConnection(RemoteConnection):
+    """
+    A Selenium RemoteConnection that sends commands over a pool of persistent
+    (keep-alive) HTTP connections instead of opening a new connection per
+    command, which removes a TCP handshake from every command and stops
+    TIME_WAIT sockets from piling up against busy WebDriver servers.
+
+    Any command is resent once on a fresh connection when an idle connection
+    taken from the pool turns out to have been closed by the server before it
+    answered, as servers do with keep-alive connections idle for too long.
+    Idempotent commands are also retried (up to the configured number of
+    times) when any other connection fails. Latency of every command is
+    recorded in a CommandStats.
+    """
+
+    def __init__(self, remote_server_addr: str,
+                 config: TransportConfig = None, commands: dict = None,
+                 resolve_ip: bool = True):
+        """
+        :param remote_server_addr: Base URL of the WebDriver server
+        :param config: Transport settings
+        :param commands: Command table to use instead of the default one, for
+            drivers that add their own commands
+        :param resolve_ip: Whether to resolve the host name to a connectable
+            IP address up front (which opens a probe connection)
+        """
+        super().__init__(remote_server_addr, keep_alive=False,
+                         resolve_ip=resolve_ip)
+        if commands is not None:
+            self._commands = dict(commands)
+        self._config = config or TransportConfig()
+        parsed = parse.urlparse(self._url)
+        self._https = parsed.scheme == "https"
+        self._host = parsed.hostname
+        self._port = parsed.port or (443 if self._https else 80)
+        self._base_path = parsed.path.rstrip("/")
+        self._headers = self.get_remote_connection_headers(parsed, True)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self._config.pool_size)
+        self._stats = CommandStats(self._config.latency_samples)
+        self._local = threading.local()
+
+    def get_stats(self) -> CommandStats:
+        """
+        :return: The latency statistics of this connection
+        """
+        return self._stats
+
+    def get_last_retries(self) -> int:
+        """
+        :return: How many times the last command sent from the calling thread
+            was resent
+        """
+        return getattr(self._local, "retries", 0)
+
+    def get_config(self) -> TransportConfig:
+        """
+        :return: The transport settings of this connection
+        """
+        return self._config
+
+    def execute(self, command, params):
+        """
+        Send a command to the WebDriver server over a pooled connection.
+
+        :param command: A string specifying the command to execute
+        :param params: A dictionary of named parameters to send with the
+            command as its JSON payload
+        """
+        command_info = self._commands[command]
+        assert command_info is not None, 'Unrecognised command %s' % command
+        method = command_info[0]
+        path = self._base_path + \
+            string.Template(command_info[1]).substitute(params)
+        body = utils.dump_json(params)
+        if method not in ("POST", "PUT"):
+            body = None
+        idempotent = method in ("GET", "DELETE", "HEAD") or \
+            command in _IDEMPOTENT_POSTS
+
+        start = time.perf_counter()
+        retries = self._local.retries = 0
+        try:
+            while True:
+                try:
+                    result = self._send(method, path, body)
+                    self._stats.record(command, time.perf_counter() - start,
+                                       retries, False)
+                    return result
+                except _CONNECTION_ERRORS:
+                    if not idempotent or retries >= self._config.retries:
+                        raise
+                    retries = self._local.retries = retries + 1
+        except (OSError, http.client.HTTPException):
+            self._stats.record(command, time.perf_counter() - start, retries,
+                               True)
+            raise
+
+    def close(self):
+        """
+        Close every idle connection.
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _send(self, method, path, body):
+        with self._slots:
+            try:
+                connection = self._idle.get_nowait()
+                reused = True
+            except queue.Empty:
+                connection = self._connect()
+                reused = False
+            try:
+                try:
+                    connection.request(method, path, body, self._headers)
+                    response = connection.getresponse()
+                except ConnectionError:
+                    if not reused:
+                        raise
+                    # The server closed the idle keep-alive connection; no
+                    # response arrived, so resend once on a fresh one
+                    connection.close()
+                    connection = self._connect()
+                    connection.request(method, path, body, self._headers)
+                    response = connection.getresponse()
+                status = response.status
+                content_type = response.getheader("Content-Type") or ""
+                location = response.getheader("Location")
+                data = response.read()
+            except BaseException:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._idle.put(connection)
+        if 300 <= status < 304 and location:
+            location = parse.urlparse(location)
+            return self._send("GET", location.path, None)
+        return self._parse(status, content_type, data)
+
+    def _connect(self):
+        connection = (http.client.HTTPSConnection if self._https else
+                      http.client.HTTPConnection)(
+            self._host, self._port, timeout=self._config.timeout)
+        connection.connect()
+        # Requests are small and latency-bound; don't let Nagle batch them
+        connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection
+
+    @staticmethod
+    def _parse(status, content_type, data):
+        """
+        Turn a response into the dict Selenium expects, the same way
+        RemoteConnection._request does.
+        """
+        body = data.decode("utf-8").replace("\x00", "").strip()
+        if 399 < status <= 500:
+            return {"status": status, "value": body}
+        if any(x.strip().startswith("image/png")
+               for x in content_type.split(";")):
+            return {"status": 0, "value": body}
+        try:
+            parsed = utils.load_json(body)
+        except ValueError:
+            return {"status": ErrorCode.SUCCESS if 199 < status < 300
+                    else ErrorCode.UNKNOWN_ERROR, "value": body}
+        assert type(parsed) is dict, "Invalid server response body: %s" % body
+        if "value" not in parsed:
+            parsed["value"] = None
+        return parsed
+
+
+def install(driver: WebDriver, config: TransportConfig = None):
+    """
+    Switch an already-started driver over to a PooledRemoteConnection, keeping
+    its command table (drivers such as Chrome add their own commands). Does
+    nothing if the driver already uses one, or doesn't talk to its server
+    through a RemoteConnection at all.
+
+    :param driver: The driver
+    :param config: Transport settings
+
+    :return: The driver's PooledRemoteConnection, or 'None'
+    """
+    current = getattr(driver, "command_executor", None)
+    if isinstance(current, PooledRemoteConnection):
+        return current
+    if not isinstance(current, RemoteConnection):
+        return None
+    # noinspection PyProtectedMember
+    pooled = PooledRemoteConnection(current._url, config, current._commands,
+                                    resolve_ip=False)
+    conn = getattr(current, "_conn", None)
+    if conn is not None:
+        conn.close()
+    driver.command_executor = pooled
+    return pooled
@@ -0,0 +1,194 @@
+import asyncio
+import inspect
+import random
+import threading
+import time
+
+from .exceptions import TimeoutException
+
+
+class WaitStats:
+    """
+    Counts how often, and for how long, a Session waited on conditions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = 0
+        self._timeouts = 0
+        self._polls = 0
+        self._time_waited = 0.0
+
+    def record(self, polls: int, elapsed: float, timed_out: bool):
+        """
+        Record a finished wait.
+
+        :param polls: How many times the condition was checked
+        :param elapsed: How long the wait took, in seconds
+        :param timed_out: Whether the wait ended in a timeout
+        """
+        with self._lock:
+            self._waits += 1
+            self._polls += polls
+            self._time_waited += elapsed
+            if timed_out:
+                self._timeouts += 1
+
+    def get_stats(self) -> dict:
+        """
+        :return: A dict with the number of waits, timeouts and polls, and the
+            total time spent waiting in seconds
+        """
+        with self._lock:
+            return {
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "polls": self._polls,
+                "time_waited": self._time_waited,
+            }
+
+
+class WaitPolicy:
+    """
+    Describes how long to wait for a condition and how often to check it.
+
+    The condition is checked immediately, then again after 'interval' seconds.
+    After each unsuccessful check the interval is multiplied by 'backoff', up
+    to 'max_interval', so that conditions that become true quickly are noticed
+    quickly, while long waits don't hammer WebDriver. Each sleep is randomly
+    scaled by up to +/- 'jitter' (a fraction) so that many browsers waiting on
+    the same thing don't poll in lock-step.
+
+    Policies are immutable; use with_timeout() to derive a policy with a
+    different timeout.
+    """
+
+    def __init__(self, timeout: float = 10.0, interval: float = 0.05,
+                 backoff: float = 1.5, max_interval: float = 1.0,
+                 jitter: float = 0.1):
+        """
+        :param timeout: Seconds to wait before giving up
+        :param interval: Seconds to sleep after the first unsuccessful check
+        :param backoff: Factor the interval grows by after each check
+        :param max_interval: Upper bound for the interval, in seconds
+        :param jitter: Fraction by which each sleep is randomly scaled
+        """
+        if timeout < 0 or interval <= 0 or max_interval <= 0:
+            raise ValueError("timeout must be >= 0, interval and max_interval "
+                             "must be > 0")
+        if backoff < 1:
+            raise ValueError("backoff must be >= 1")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be >= 0 and < 1")
+        self._timeout = timeout
+        self._interval = interval
+        self._backoff = backoff
+        self._max_interval = max_interval
+        self._jitter = jitter
+
+    def get_timeout(self) -> float:
+        """
+        :return: Seconds to wait before giving up
+        """
+        return self._timeout
+
+    def with_timeout(self, timeout: float) -> "WaitPolicy":
+        """
+        :param timeout: Seconds to wait before giving up
+
+        :return: A copy of this policy with a different timeout
+        """
+        return WaitPolicy(timeout, self._interval, self._backoff,
+                          self._max_interval, self._jitter)
+
+    def intervals(self):
+        """
+        Generate the (jittered) sleep durations between checks, forever.
+        """
+        interval = self._interval
+        while True:
+            if self._jitter:
+                yield interval * random.uniform(1 - self._jitter,
+                                                1 + self._jitter)
+            else:
+                yield interval
+            interval = min(interval * self._backoff, self._max_interval)
+
+    def poll(self, check, description: str, timeout: float = None,
+             stats: WaitStats = None):
+        """
+        Call 'check' until it returns something truthy or the timeout expires.
+
+        :param check: Function taking no arguments
+        :param description: What is being waited for, used in the timeout
+            message
+        :param timeout: Overrides this policy's timeout for this call
+        :param stats: WaitStats to record this wait in
+
+        :return: The first truthy value returned by 'check'
+
+        :raises TimeoutException: If 'check' did not return something truthy
+            before the timeout expired
+        """
+        timeout = self._timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        polls = 0
+        timed_out = False
+        try:
+            for interval in self.intervals():
+                polls += 1
+                result = check()
+                if result:
+                    return result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    raise TimeoutException(
+                        "Timed out after %.2f seconds waiting for %s"
+                        % (timeout, description))
+                time.sleep(min(interval, remaining))
+        finally:
+            if stats is not None:
+                stats.record(polls, time.monotonic() - start, timed_out)
+
+    async def poll_async(self, check, description: str,
+                         timeout: float = None, stats: WaitStats = None):
+        """
+        Asynchronous version of poll(). 'check' may be a plain function or a
+        coroutine function; sleeping between checks yields to the event loop.
+
+        :param check: Function taking no arguments
+        :param description: What is being waited for, used in the timeout
+            message
+        :param timeout: Overrides this policy's timeout for this call
+        :param stats: WaitStats to record this wait in
+
+        :return: The first truthy value returned by 'check'
+
+        :raises TimeoutException: If 'check' did not return something truthy
+            before the timeout expired
+        """
+        timeout = self._timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        polls = 0
+        timed_out = False
+        try:
+            for interval in self.intervals():
+                polls += 1
+                result = check()
+                if inspect.isawaitable(result):
+                    result = await result
+                if result:
+                    return result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    raise TimeoutException(
+                        "Timed out after %.2f seconds waiting for %s"
+                        % (timeout, description))
+                await asyncio.sleep(min(interval, remaining))
+        finally:
+            if stats is not None:
+                stats.record(polls, time.monotonic() - start, timed_out)